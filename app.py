@@ -19,10 +19,11 @@ except ImportError:
 # Set DEBUG_MODE from environment variable, default to False
 DEBUG_MODE = os.environ.get("DEBUG_MODE", "False").lower() in ("true", "1", "yes")
 
-from dash import dash, html, dcc, Output, Input, State, ctx
+from dash import dash, html, dcc, Output, Input, State, ctx, set_props
 import dash_bootstrap_components as dbc
 from tools.navbar import Navbar
-from assets.storage import TODAY, SESSION_TYPE, get_new_session_id, STORAGE
+from tools.session_store import SessionDataExpired
+from assets.storage import TODAY, SESSION_TYPE, get_new_session_id, STORAGE, EMPTY_STORAGE
 from assets.skt_storage import SKT_STORAGE
 from assets.alerts import (
     R_errors_data,
@@ -31,10 +32,45 @@ from assets.alerts import (
     R_errors_league,
     R_errors_funnel,
     dataupload_error,
+    session_expired_error,
 )
 from assets.modal_values import modal_checks  # Data analysis progress modal
 
-app = dash.Dash(__name__, use_pages=True, suppress_callback_exceptions=True)
+# Stores whose tables may live in the session store (tools/session_store.py)
+RESULT_STORES = [
+    "league_table_data_STORAGE",
+    "consistency_data_STORAGE",
+    "forest_data_STORAGE",
+    "forest_data_prws_STORAGE",
+    "ranking_data_STORAGE",
+    "funnel_data_STORAGE",
+    "net_split_data_STORAGE",
+    "net_split_ALL_data_STORAGE",
+    "cinema_net_data_STORAGE",
+    "cinema_net_data_STORAGE2",
+]
+
+
+def on_callback_error(err):
+    """
+    Results evicted from the session store: clear the stale result stores and
+    ask for a new run instead of failing the callback. Other errors are raised.
+    """
+    if not isinstance(err, SessionDataExpired):
+        raise err
+    for store_id in RESULT_STORES:
+        set_props(store_id, {"data": EMPTY_STORAGE[store_id]})
+    set_props("results_ready_STORAGE", {"data": False})
+    set_props("session-expired-message", {"children": err.args[0]})
+    set_props("Alert-session-expired", {"is_open": True})
+
+
+app = dash.Dash(
+    __name__,
+    use_pages=True,
+    suppress_callback_exceptions=True,
+    on_error=on_callback_error,
+)
 
 NMASTUDIO_art = "/assets/logos/nmastudio_art2.gif"
 LOAD = "/assets/logos/small.gif"
@@ -66,6 +102,7 @@ def get_new_layout():
                     R_errors_league,
                     R_errors_funnel,
                     dataupload_error,
+                    session_expired_error,
                 ],
                 style={"display": "none"},
             ),
@@ -83,9 +120,17 @@ def get_new_layout():
                     dcc.Store(id="para-pairwise-data"),
                     dcc.Store(id="para-LT-data"),
                     dcc.Store(id="para-FA-data"),
+                    # Analysis pipeline job handle, polled by nma-task-poller
+                    dcc.Store(id="nma-task-store"),
+                    # Id of the joined task, set once: fills the result stores
+                    dcc.Store(id="nma-task-completed"),
+                    dcc.Interval(id="nma-task-poller", interval=1000, disabled=True),
                 ],
                 style={"display": "none"},
             ),
+            # Fills net_split_data_STORAGE once the background node-splitting jobs finish
+            dcc.Store(id="netsplit-task-store", storage_type="session"),
+            dcc.Interval(id="netsplit-poller", interval=2000, disabled=True),
             dash.page_container,
         ]
     )
@@ -8,8 +8,12 @@ from assets.storage import (
     STORAGEOUTPUT,
     __load_project,
     __storage_to_dict,
+    __storage_delta,
 )
 from assets.skt_storage import SKT_EMPTY_STORAGE
+from tools.session_store import resolve_all
+from tools.storage_codec import compact_all
+from tools.project_file import write_project, load_project
 
 saveload_modal = html.Div(
     [
@@ -229,14 +233,18 @@ def func(n_clicks, prjname):
     prevent_initial_call=True,
 )
 def export_json(n_clicks, storagium, prjname):
-    project_dict = __storage_to_dict(storagium)
-    json_string = json.dumps(project_dict, indent=4)
+    # results kept in the server-side session store are embedded in the file,
+    # tables still held as JSON are written in the compact encoding
+    project_dict = compact_all(resolve_all(__storage_to_dict(storagium)))
     if prjname:
         flnm = prjname
     else:
         flnma = "project"
-    return dict(
-        content=json_string, filename=f"{prjname}.nmastudio", type="application/json"
+    # v3 container: one compressed section per store (see tools/project_file.py)
+    return dcc.send_bytes(
+        lambda buffer: write_project(buffer, project_dict),
+        f"{prjname}.nmastudio",
+        type="application/zip",
     )
 
 
@@ -250,9 +258,10 @@ def export_json(n_clicks, storagium, prjname):
     Input("upload-json", "contents"),
     State("upload-json", "filename"),
     [STORAGESTATE],
+    State("consts_STORAGE", "data"),
     prevent_initial_call=True,
 )
-def update_output(contents, filename, storagium):
+def update_output(contents, filename, storagium, consts):
     # Guard: only proceed if there's actual file content (not on initial page load)
     if contents is None:
         from dash import no_update
@@ -266,8 +275,8 @@ def update_output(contents, filename, storagium):
     decoded = base64.b64decode(content_string)
 
     try:
-        # Parse JSON data
-        prjdata = json.loads(decoded.decode("utf-8"))
+        # Any project version; only the stores of the landing tab are sent inline
+        prjdata = load_project(decoded, (consts or {}).get("session_ID"))
         res = __load_project(storagium, prjdata)
 
         # Set results_ready to True
@@ -312,7 +321,8 @@ def update_output(contents, filename, storagium):
         # Return storage data, clear SKT storage, and trigger redirect with timestamp
         import time
 
-        return res + [
+        # only the stores that differ from the current ones are sent
+        return __storage_delta(storagium, res) + [
             SKT_EMPTY_STORAGE["treatment_fullnames_SKT"],
             time.time(),
         ]  # Clear SKT + timestamp triggers redirect
@@ -321,5 +331,7 @@ def update_output(contents, filename, storagium):
         import traceback
 
         traceback.print_exc()
-        # Return storage without changes on error, no trigger
-        return storagium + [None, None]  # No SKT update, no trigger
+        # Leave storage unchanged on error, no trigger
+        from dash import no_update
+
+        return [no_update] * len(STORAGEOUTPUT) + [None, None]  # No SKT update, no trigger
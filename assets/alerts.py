@@ -61,3 +61,10 @@ R_errors_funnel= dbc.Modal([
     size="lg",
     is_open=False)
 
+
+session_expired_error = dbc.Modal([
+    dbc.ModalHeader("Results expired"),
+    dbc.ModalBody([html.P(id="session-expired-message", style={"color": "black"})])],
+    id="Alert-session-expired",
+    size="lg",
+    is_open=False)
@@ -42,3 +42,85 @@ window.dash_clientside.clientside.logStorageChanges = function(...args) {
     // Return empty string to satisfy the Output
     return '';
 };
+
+// Network plots: stylesheet of the selected nodes / edges, built in the browser.
+// The base stylesheets of the display options come from the server
+// (__network_stylesheets in tools/functions_generate_stylesheet.py), so a tap
+// on the network no longer needs a server round trip.
+window.dash_clientside.clientside.networkStylesheet = function(selectedNodes, selectedEdges, elements, base) {
+    if (!base) {
+        return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+    }
+    if (!elements || !elements.length) {
+        return [[], []];
+    }
+    const quote = (value) => '"' + String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"') + '"';
+
+    // class colors: the network keeps its number of classes on its nodes
+    let classRules = [];
+    if (base.class_colors) {
+        const last = elements[elements.length - 1].data || {};
+        const nClass = last.n_class || 1;
+        const colors = nClass > 1 ? base.class_colors.slice(0, nClass) : [base.default_color];
+        classRules = colors.map((color) => ({
+            selector: '.' + color,
+            style: {'background-color': color},
+        }));
+    }
+
+    let stylesheet;
+    if (selectedEdges && selectedEdges.length) {
+        stylesheet = base.plain.concat(classRules, selectedEdges.map((edge) => ({
+            selector: 'edge[source = ' + quote(edge.source) + '][target = ' + quote(edge.target) + ']',
+            style: {'opacity': 1, 'line-color': 'rgb(165, 74, 97)', 'z-index': 5000},
+        })));
+    } else if (selectedNodes && selectedNodes.length) {
+        const selected = new Set(selectedNodes.map((node) => node.id));
+        const neighbours = new Set();
+        elements.forEach((el) => {
+            const data = el.data || {};
+            if (data.source !== undefined && (selected.has(data.source) || selected.has(data.target))) {
+                neighbours.add(data.source);
+                neighbours.add(data.target);
+            }
+        });
+        const rules = [];
+        selected.forEach((id) => {
+            rules.push({
+                selector: 'node[id = ' + quote(id) + ']',
+                style: {'border-color': '#751225', 'border-width': 5, 'border-opacity': 1, 'opacity': 1},
+            });
+            ['source', 'target'].forEach((end) => rules.push({
+                selector: 'edge[' + end + ' = ' + quote(id) + ']',
+                style: {'opacity': 1, 'line-color': base.edge_color, 'z-index': 5000},
+            }));
+        });
+        neighbours.forEach((id) => {
+            if (!selected.has(id)) {
+                rules.push({selector: 'node[id = ' + quote(id) + ']', style: {'opacity': 1}});
+            }
+        });
+        stylesheet = base.dimmed.concat(classRules, rules);
+    } else if (base.treat.length) {
+        stylesheet = base.dimmed.concat(classRules, base.treat);
+    } else {
+        stylesheet = base.plain.concat(classRules);
+    }
+    return [stylesheet, stylesheet];
+};
+
+// Network plot of the studies published up to the slider year. The server
+// sends every version of every element once per dataset and outcome
+// (get_network_timeline in tools/utils.py), so slider ticks stay in the browser.
+window.dash_clientside.clientside.networkUpToYear = function(timeline, year) {
+    if (!timeline || year === null || year === undefined) {
+        return window.dash_clientside.no_update;
+    }
+    const latest = new Map();
+    timeline.forEach((entry) => {
+        if (entry.year === null || entry.year <= year) {
+            latest.set(entry.rank, entry.element);
+        }
+    });
+    return Array.from(latest.keys()).sort((a, b) => a - b).map((rank) => latest.get(rank));
+};
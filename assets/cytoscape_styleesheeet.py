@@ -1,6 +1,6 @@
 from assets.COLORS import *
 # from assets.storage import N_CLASSES
-from tools.utils import CMAP
+from tools.network_summary import CMAP
 
 def get_stylesheet(node_size=False, classes=False, n_class=1, edg_col= 'grey', nd_col=DFLT_ND_CLR, edge_size=False,
                    pie=False, edg_lbl=False, nodes_opacity=1, edges_opacity=0.77,label_size=False):
@@ -1,7 +1,7 @@
 ######SESSION AND LOCALSTORAGE INITIALIZATION#######
 
 # from assets.modal_values import *
-from dash import dcc
+from dash import dcc, Patch, no_update
 from assets.psoriasisDemo import PSORIASIS_DATA
 import pandas as pd
 import json
@@ -10,7 +10,7 @@ import json
 CONSISTENCY_DATA = pd.read_csv("db/consistency/consistency.csv")
 
 # from collections import OrderedDict
-import datetime, uuid
+import datetime, uuid, hashlib
 from dash.dependencies import Output, State
 
 SESSION_PICKLE = {"wait": False}
@@ -190,5 +190,46 @@ def __storage_to_dict(storagium):
     return dict(zip(STORAGE_KEYS, storagium))
 
 
+# Delta updates: a callback writing stores only sends what changed, unchanged
+# stores keep their modified_timestamp and do not fire their dependent callbacks
+def store_version(value):
+    """Content hash of a store value (or of one entry of a list/dict store)."""
+    if isinstance(value, str):
+        payload = value
+    else:
+        payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def store_delta(old, new):
+    """
+    Output for a store going from old to new: no_update when the content is
+    the same, a Patch of the changed entries for list (same length) and dict
+    stores, else the new value.
+    """
+    if store_version(old) == store_version(new):
+        return no_update
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        patch = Patch()
+        for i, (old_item, new_item) in enumerate(zip(old, new)):
+            if store_version(old_item) != store_version(new_item):
+                patch[i] = new_item
+        return patch
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch = Patch()
+        for key in old.keys() - new.keys():
+            del patch[key]
+        for key, new_item in new.items():
+            if key not in old or store_version(old[key]) != store_version(new_item):
+                patch[key] = new_item
+        return patch
+    return new
+
+
+def __storage_delta(storagium, res):
+    """STORAGEOUTPUT values for going from storagium (STORAGESTATE) to res."""
+    return [store_delta(old, new) for old, new in zip(storagium, res)]
+
+
 # Start with empty storage
 STORAGE = __empty_project()
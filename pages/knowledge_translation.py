@@ -1222,10 +1222,14 @@ def update_skt_standard_grid_from_storage(
 
 @callback(
     Output("quickstart-grid", "rowData", allow_duplicate=True),
-    [Input("results_ready_STORAGE", "data"), Input("kt_page_location", "pathname")],
+    [
+        Input("results_ready_STORAGE", "data"),
+        Input("kt_page_location", "pathname"),
+        # node-splitting lands after the other results (see __poll_netsplit)
+        Input("net_split_data_STORAGE", "data"),
+    ],
     [
         State("forest_data_STORAGE", "data"),
-        State("net_split_data_STORAGE", "data"),
         State("ranking_data_STORAGE", "data"),
         State("cinema_net_data_STORAGE", "data"),
         State("net_data_STORAGE", "data"),
@@ -1235,8 +1239,8 @@ def update_skt_standard_grid_from_storage(
 def update_skt_advanced_grid_from_storage(
     results_ready,
     pathname,
-    forest_data_storage,
     net_split_storage,
+    forest_data_storage,
     ranking_storage,
     cinema_storage,
     net_data_storage,
@@ -46,15 +46,14 @@ from assets.alerts import (
     dataupload_error,
 )
 from assets.COLORS import *
-from assets.storage import STORAGE, STORAGE_SCHEMA
+from assets.storage import STORAGE, STORAGE_SCHEMA, store_delta
 
 # from dash_extensions import Download
 from assets.Tabs.saveload_modal_button import saveload_modal
 import dash
 import time
-import itertools
 import json
-from dash import clientside_callback
+from dash import clientside_callback, ClientsideFunction
 from dash_extensions.snippets import send_file
 from dash_extensions import Download
 from tools.utils import *
@@ -65,10 +64,6 @@ from tools.functions_modal_SUBMIT_data import (
 )
 from tools.functions_NMA_runs import (
     __modal_submit_checks_DATACHECKS,
-    __modal_submit_checks_NMA_new,
-    __modal_submit_checks_PAIRWISE_new,
-    __modal_submit_checks_LT_new,
-    __modal_submit_checks_FUNNEL_new,
 )
 
 # from tools.functions_ranking_plots import __ranking_plot  # TODO: requires sklearn
@@ -85,12 +80,16 @@ from tools.functions_project_setup import (
     __variable_selection,
     __primaryout_selection,
 )
-from tools.functions_netsplit import __netsplit
+from tools.functions_netsplit import (
+    __netsplit,
+    __netsplit_poller_disabled,
+    __poll_netsplit,
+)
 from tools.functions_build_league_data_table import (
     __update_output_new,
     __update_output_bothout,
 )
-from tools.functions_generate_stylesheet import __generate_stylesheet
+from tools.functions_generate_stylesheet import __network_stylesheets
 from tools.functions_export import (
     __generate_xlsx_netsplit,
     __generate_xlsx_league,
@@ -524,6 +523,10 @@ layout = html.Div(
                             layout={"name": "grid", "animate": False, "fit": True},
                             stylesheet=get_stylesheet(),
                         ),
+                        # base stylesheets of the display options (see generate_stylesheet)
+                        dcc.Store(id="network_stylesheet_base"),
+                        # network of every study year, filtered by the year slider in the browser
+                        dcc.Store(id="network_timeline"),
                     ],
                     className="one-half column",
                     id="one-half-1",
@@ -1352,31 +1355,27 @@ def update_outcome2_selectors(stored_num, stored_names):
     [Output("cytoscape", "layout"), Output("modal-cytoscape", "layout")],
     [
         Input("graph-layout-dropdown", "children"),
+        Input("net_data_STORAGE", "data"),
     ],
     prevent_initial_call=False,
 )
-def update_cytoscape_layout(layout):
-    ctx = dash.callback_context
+def update_cytoscape_layout(layout, net_data):
     if layout:
         return {"name": layout.lower(), "fit": True}, {
             "name": layout.lower(),
             "fit": True,
         }
+    # large networks open with the positions computed on the server
+    if net_data and get_network_layout(net_data):
+        return {"name": "preset", "fit": True}, {"name": "preset", "fit": True}
 
     return {"name": "circle", "fit": True}, {"name": "circle", "fit": True}
 
 
-### ----- update graph layout on node click ------ ###
+### ----- network stylesheet: display options on the server, taps in the browser ------ ###
 @callback(
+    Output("network_stylesheet_base", "data"),
     [
-        Output("cytoscape", "stylesheet"),
-        Output("modal-cytoscape", "stylesheet"),
-    ],
-    [
-        Input("cytoscape", "tapNode"),
-        Input("cytoscape", "selectedNodeData"),
-        Input("cytoscape", "elements"),
-        Input("cytoscape", "selectedEdgeData"),
         Input("dd_nclr", "children"),
         Input("dd_eclr", "children"),
         Input("node_color_input", "value"),
@@ -1386,14 +1385,10 @@ def update_cytoscape_layout(layout):
         Input("dd_nds", "children"),
         Input("dd_egs", "children"),
     ],
-    prevent_initial_call=True,
+    prevent_initial_call=False,
     suppress_callback_exceptions=True,
 )
 def generate_stylesheet(
-    node,
-    slct_nodesdata,
-    elements,
-    slct_edgedata,
     dd_nclr,
     dd_eclr,
     custom_nd_clr,
@@ -1403,11 +1398,7 @@ def generate_stylesheet(
     dd_nds,
     dd_egs,
 ):
-    stylesheet, stylesheet_modal, _ = __generate_stylesheet(
-        node,
-        slct_nodesdata,
-        elements,
-        slct_edgedata,
+    return __network_stylesheets(
         dd_nclr,
         dd_eclr,
         custom_nd_clr,
@@ -1416,11 +1407,22 @@ def generate_stylesheet(
         treat_name,
         dd_nds,
         dd_egs,
-        None,  # dwld_button - not used anymore
-        None,  # dwld_button2 - not used anymore
-        False,  # net_download_activation - not used anymore
     )
-    return stylesheet, stylesheet_modal
+
+
+clientside_callback(
+    ClientsideFunction(namespace="clientside", function_name="networkStylesheet"),
+    [
+        Output("cytoscape", "stylesheet"),
+        Output("modal-cytoscape", "stylesheet"),
+    ],
+    [
+        Input("cytoscape", "selectedNodeData"),
+        Input("cytoscape", "selectedEdgeData"),
+        Input("cytoscape", "elements"),
+        Input("network_stylesheet_base", "data"),
+    ],
+)
 
 
 ### ----- save network plot as png ------ ###
@@ -1455,81 +1457,53 @@ def get_image(btn_clicks, btn_modal_clicks, export):
 
 
 @callback(
-    [
-        Output("cytoscape", "elements"),
-        Output("modal-cytoscape", "elements"),
-    ],
+    Output("network_timeline", "data"),
     [
         Input("net_data_STORAGE", "data"),
-        Input("slider-year", "value"),
         Input("_outcome_select", "value"),
         # Reset button removed from results page
         #    Input('node_size_input', 'value'),
     ],
     prevent_initial_call=False,  # Must run on initial load to show network graph
 )
-def update_layout_year_slider(net_data, slider_year, out_fun):
+def update_network_timeline(net_data, out_fun):
     # Guard: Don't execute if data is not ready
-    if not net_data or slider_year is None:
-        return no_update, no_update
-
-    YEARS_DEFAULT = np.array(
-        [
-            1963,
-            1990,
-            1997,
-            2001,
-            2003,
-            2004,
-            2005,
-            2006,
-            2007,
-            2008,
-            2010,
-            2011,
-            2012,
-            2013,
-            2014,
-            2015,
-            2016,
-            2017,
-            2018,
-            2019,
-            2020,
-            2021,
-        ]
-    )
-    # Handle both dict format (from demo) and list format (from upload)
-    from tools.utils import get_net_data_json
+    if not net_data:
+        return no_update
 
-    net_data_json = get_net_data_json(net_data)
-
-    try:
-        net_datajs = pd.read_json(net_data_json, orient="split")
-    except:
-        net_datajs = pd.read_json(net_data_json, orient="split", encoding="utf-8")
-
-    outcome = out_fun
-    if outcome:
+    outcome = 0
+    if out_fun:
         try:
-            outcome = int(outcome)
+            outcome = int(out_fun)
         except (ValueError, TypeError):
             outcome = 0
         # Clamp outcome to valid range based on available TE columns
+        net_datajs = get_net_data_frame(net_data)
         max_outcome = 0
         for col in net_datajs.columns:
             if col.startswith("TE") and col[2:].isdigit():
                 max_outcome = max(max_outcome, int(col[2:]) - 1)
         outcome = min(outcome, max_outcome)
 
-        net_data_df = pd.read_json(net_data_json, orient="split")
-        net_datajs2 = net_data_df[net_data_df.year <= slider_year]
-        elements = get_network_new(df=net_datajs2, i=outcome)
-    else:
-        net_datajs = net_datajs[net_datajs.year <= slider_year]
-        elements = get_network_new(df=net_datajs, i=0)
+    # the cumulative network of every study year is sent once per dataset and
+    # outcome; slider ticks are filtered in the browser
+    return get_network_timeline(net_data, outcome)
 
-    return elements, elements
+
+clientside_callback(
+    ClientsideFunction(namespace="clientside", function_name="networkUpToYear"),
+    Output("cytoscape", "elements"),
+    Input("network_timeline", "data"),
+    Input("slider-year", "value"),
+)
+
+
+# the expanded network shows the same elements: copied in the browser
+clientside_callback(
+    """(elements) => elements""",
+    Output("modal-cytoscape", "elements"),
+    Input("cytoscape", "elements"),
+)
 
 
 ### ---------------------------------- FOREST PLOTS CALLBACKS ---------------------------------- ###
@@ -1804,13 +1778,12 @@ def update_league_table(
 
     try:
         # Get net_data for treatments list
-        net_data_json = get_net_data_json(net_data)
-        net_data_df = pd.read_json(net_data_json, orient="split").round(3)
+        net_data_df = get_net_data_frame(net_data).round(3)
 
         # Get league table data for selected outcome
         # League table is stored with treatments as index, so we need to add Treatment column
         league_data_list = get_league_table_data_list(league_table_data)
-        leaguetable = pd.read_json(league_data_list[outcome_idx], orient="split")
+        leaguetable = read_storage_frame(league_data_list[outcome_idx])
         treatments = np.unique(
             net_data_df[["treat1", "treat2"]].dropna().values.flatten()
         )
@@ -1855,7 +1828,7 @@ def update_league_table(
             and cinema_net_data[outcome_idx]
         ):
             try:
-                cinema_df = pd.read_json(cinema_net_data[outcome_idx], orient="split")
+                cinema_df = read_storage_frame(cinema_net_data[outcome_idx])
                 confidence_map = {
                     k: n for n, k in enumerate(["very low", "low", "moderate", "high"])
                 }
@@ -2188,6 +2161,32 @@ def netsplit(edges, outcome_idx, net_split_data, consistency_data):
     return __netsplit(edges, outcome_idx, net_split_data, consistency_data)
 
 
+@callback(
+    Output("netsplit-poller", "disabled"),
+    Input("net_split_data_STORAGE", "data"),
+)
+def toggle_netsplit_poller(net_split_data):
+    return __netsplit_poller_disabled(net_split_data)
+
+
+@callback(
+    [
+        Output("net_split_data_STORAGE", "data", allow_duplicate=True),
+        Output("net_split_ALL_data_STORAGE", "data", allow_duplicate=True),
+    ],
+    Input("netsplit-poller", "n_intervals"),
+    [
+        State("net_split_data_STORAGE", "data"),
+        State("net_split_ALL_data_STORAGE", "data"),
+        State("netsplit-task-store", "data"),
+        State("consts_STORAGE", "data"),
+    ],
+    prevent_initial_call=True,
+)
+def poll_netsplit_results(n_intervals, net_split_data, netsplit_all, netsplit_tasks, consts):
+    return __poll_netsplit(n_intervals, net_split_data, netsplit_all, netsplit_tasks, consts)
+
+
 ### ----- upload CINeMA data file 1 ------ ###
 # @callback([Output("cinema_net_data_STORAGE", "data"),
 #                Output("file2-list", "children"),
@@ -3048,27 +3047,16 @@ def generate_xlsx_league_modal(n_clicks, leaguedata):
     Input("net_data_STORAGE", "data"),
 )
 def infor_overall(data):
-    from tools.utils import get_net_data_json
-
-    net_data = pd.read_json(get_net_data_json(data), orient="split").round(3)
-    n_studies = len(net_data.studlab.unique())
-    num_study = f"Number of studies: {n_studies}"
-
-    combined_treats = pd.concat([net_data["treat1"], net_data["treat2"]])
-    n_treat = combined_treats.nunique()
-    num_treat = f"Number of treatments: {n_treat}"
-
-    unique_combinations = list(itertools.combinations(combined_treats.unique(), 2))
-    num_unique_combinations = len(unique_combinations)
-
-    net_data["treat_combine"] = list(zip(net_data["treat1"], net_data["treat2"]))
-    unique_combinations = set(net_data["treat_combine"])
-    n_com = len(unique_combinations)
-
-    num_com = f"Number of comparisons with direct evidence: {n_com}"
-
-    n_com_without = num_unique_combinations - n_com
-    num_com_without = f"Number of comparisons without direct evidence: {n_com_without}"
+    # counted on the sparse network of all comparisons, cached per dataset
+    stats = get_network_statistics(data)
+    num_study = f"Number of studies: {stats['n_studies']}"
+    num_treat = f"Number of treatments: {stats['n_treatments']}"
+    if len(stats["components"]) > 1:
+        num_treat += f" (in {len(stats['components'])} disconnected networks)"
+    num_com = f"Number of comparisons with direct evidence: {stats['n_direct']}"
+    num_com_without = (
+        f"Number of comparisons without direct evidence: {stats['n_indirect']}"
+    )
 
     return [num_study], [num_treat], [num_com], [num_com_without]
 
@@ -3449,6 +3437,7 @@ def upload_cinema_single_outcome(
 
     if contents is None:
         raise PreventUpdate
+    previous = cinema_net_data
 
     # Default outcome index
     if outcome_idx is None:
@@ -3467,7 +3456,7 @@ def upload_cinema_single_outcome(
         if not is_valid:
             print(f"CINeMA validation failed for {filename}: {error_msg}")
             # Return existing data unchanged, show error message
-            return cinema_net_data if cinema_net_data else [], html.Span(
+            return store_delta(previous, cinema_net_data or []), html.Span(
                 f"Invalid file: {error_msg}", style={"color": "red", "fontSize": "12px"}
             )
 
@@ -3485,14 +3474,15 @@ def upload_cinema_single_outcome(
         # Store at correct outcome index
         cinema_net_data[outcome_idx] = cinema_df.to_json(orient="split")
 
-        return cinema_net_data, html.Span(
+        # only the uploaded outcome is sent
+        return store_delta(previous, cinema_net_data), html.Span(
             f"Loaded: {filename}",
             style={"color": "green", "fontSize": "12px"},
         )
 
     except Exception as e:
         print(f"Error uploading CINeMA file: {e}")
-        return cinema_net_data if cinema_net_data else [], html.Span(
+        return store_delta(previous, cinema_net_data or []), html.Span(
             f"Error: {str(e)}", style={"color": "red", "fontSize": "12px"}
         )
 
@@ -3529,6 +3519,7 @@ def upload_cinema_both_outcomes(
 
     # Determine which input triggered the callback
     triggered = [tr["prop_id"] for tr in dash.callback_context.triggered]
+    previous = cinema_net_data2
 
     # Initialize storage list if empty [outcome1, outcome2]
     if cinema_net_data2 is None or not isinstance(cinema_net_data2, list):
@@ -3583,12 +3574,12 @@ def upload_cinema_both_outcomes(
                     f"Invalid: {error_msg}", style={"color": "red", "fontSize": "12px"}
                 )
 
-        return cinema_net_data2, file1_msg, file2_msg
+        return store_delta(previous, cinema_net_data2), file1_msg, file2_msg
 
     except Exception as e:
         print(f"Error uploading CINeMA files: {e}")
         return (
-            cinema_net_data2,
+            store_delta(previous, cinema_net_data2),
             html.Span(f"Error: {str(e)}", style={"color": "red", "fontSize": "12px"}),
             html.Span(f"Error: {str(e)}", style={"color": "red", "fontSize": "12px"}),
         )
@@ -3621,7 +3612,7 @@ def disable_cinema_toggle(cinema_net_data, outcome_idx):
 
     # Validate the stored CINeMA data has required columns
     try:
-        cinema_df = pd.read_json(cinema_net_data[outcome_idx], orient="split")
+        cinema_df = read_storage_frame(cinema_net_data[outcome_idx])
         is_valid, _ = validate_cinema_csv(cinema_df)
         if not is_valid:
             return True
@@ -3656,8 +3647,8 @@ def disable_cinema_toggle_both(cinema_net_data2):
 
     # Validate both CINeMA datasets have required columns
     try:
-        cinema_df1 = pd.read_json(cinema_net_data2[0], orient="split")
-        cinema_df2 = pd.read_json(cinema_net_data2[1], orient="split")
+        cinema_df1 = read_storage_frame(cinema_net_data2[0])
+        cinema_df2 = read_storage_frame(cinema_net_data2[1])
         is_valid1, _ = validate_cinema_csv(cinema_df1)
         is_valid2, _ = validate_cinema_csv(cinema_df2)
         if not is_valid1 or not is_valid2:
@@ -22,6 +22,7 @@ from assets.storage import (  # type: ignore
     STORAGESTATE,
     EMPTY_STORAGE,
     __load_project,
+    __storage_delta,
     __get_state_of,
 )
 from assets.skt_storage import SKT_EMPTY_STORAGE  # type: ignore
@@ -41,12 +42,11 @@ from tools.functions_project_setup import (
 from tools.functions_modal_SUBMIT_data import (
     __data_trans,
 )  # type: ignore
-from tools.functions_NMA_runs import (
-    __modal_submit_checks_DATACHECKS,
-    __modal_submit_checks_NMA_new,
-    __modal_submit_checks_PAIRWISE_new,
-    __modal_submit_checks_LT_new,
-    __modal_submit_checks_FUNNEL_new,
+from tools.functions_handle_nma_processing import (
+    __start_nma_processing__,
+    __poll_nma_processing__,
+    __apply_nma_results__,
+    STORE_IDS,
 )  # type: ignore
 
 
@@ -675,8 +675,8 @@ def empty_stt(_nclicks, storagium):
     res = __load_project(storagium, EMPTY_STORAGE)
     idx = __get_state_of("results_ready_STORAGE")
     print(f"[DEBUG] empty_stt (reset): results_ready at index {idx} = {res[idx]}")
-    # Also clear SKT storage
-    return res + [SKT_EMPTY_STORAGE["treatment_fullnames_SKT"]]
+    # Also clear SKT storage; stores that are already empty are left alone
+    return __storage_delta(storagium, res) + [SKT_EMPTY_STORAGE["treatment_fullnames_SKT"]]
 
 
 # Load psoriasis CHECKED
@@ -714,8 +714,11 @@ def load_psr(_nclicks, storagium):
     print(f"[DEBUG] load_psr: res[{idx}] = {res[idx]}")
     # Redirect to results page by setting pathname (with refresh=True, causes page reload)
     print(f"[DEBUG] load_psr: Redirecting to /results")
-    # Clear SKT storage and redirect
-    return res + [SKT_EMPTY_STORAGE["treatment_fullnames_SKT"], "/results"]
+    # Clear SKT storage and redirect; only the stores that differ from the demo are sent
+    return __storage_delta(storagium, res) + [
+        SKT_EMPTY_STORAGE["treatment_fullnames_SKT"],
+        "/results",
+    ]
 
 
 # Auto-redirect to results when project is uploaded (triggered by upload, not by results_ready)
@@ -1316,231 +1319,120 @@ def data_trans(
         )
 
 
-# Analysis callbacks that chain together sequentially using modified_timestamp
-# This matches the pattern from NMAstudio-app-main
-
-
-# Step 1: Data checks - triggered when modal opens
-# Outputs to both global Store (.data for submit button) and modal display (.children)
+# Analysis pipeline: the data checks, then one server-side subtask per outcome (NMA,
+# pairwise, league table, funnel) runs in parallel and a join step builds the stores
+# (tools/functions_run_nma_task.py); opening the modal starts it, the nma-task-poller
+# interval reports the progress of every stage and finally sets nma-task-completed,
+# on which apply_nma_results fills every store with handles to the server-side
+# session store (tools/session_store.py).
 @callback(
-    [
-        Output("para-check-data", "data"),
-        Output("para-check-data-modal", "children"),
-    ],
-    Input("modal_data_checks", "is_open"),
-    [State("number-outcomes", "value"), State("net_data_STORAGE", "data")],
-    prevent_initial_call=True,
-)
-def modal_submit_checks_DATACHECKS(
-    modal_data_checks_is_open, num_outcomes, net_data_STORAGE
-):
-    # Guard: Only run when modal is open (prevents errors when on results page)
-    if not modal_data_checks_is_open:
-        return [dash.no_update, dash.no_update]
-
-    result = __modal_submit_checks_DATACHECKS(
-        modal_data_checks_is_open, num_outcomes, net_data_STORAGE
-    )
-    # result[0] = html.P element for display, result[1] = "__Para_Done__" marker
-    return [result[1], result[0]]
-
-
-# Step 2: NMA analysis - triggered when modal opens (runs in parallel with data checks)
-# Outputs to both global Store (.data for submit button) and modal display (.children)
-@callback(
-    [
-        Output("R-alert-nma", "is_open"),
-        Output("Rconsole-error-nma", "children"),
-        Output("para-anls-data", "data"),
-        Output("para-anls-data-modal", "children"),
-        Output("forest_data_STORAGE", "data"),
-    ],
-    Input("modal_data_checks", "is_open"),
-    [
-        State("number-outcomes", "value"),
-        State("net_data_STORAGE", "data"),
-        State("forest_data_STORAGE", "data"),
-    ],
-    prevent_initial_call=True,
-)
-def modal_submit_checks_NMA_new(
-    modal_data_checks_is_open, num_outcome, net_data_STORAGE, forest_data_STORAGE
-):
-    # Guard: Only run when modal is open (prevents errors when on results page)
-    if not modal_data_checks_is_open:
-        return [dash.no_update] * 5
-
-    result = __modal_submit_checks_NMA_new(
-        modal_data_checks_is_open, num_outcome, net_data_STORAGE, forest_data_STORAGE
-    )
-    # result is (alert_open, error_msg, children, data_marker, forest_data)
-    # Output: alert, error_msg, marker to Store, children to modal, forest_data
-    return [result[0], result[1], result[3], result[2], result[4]]
-
-
-# Step 3: Pairwise analysis - triggered when NMA completes (forest_data_STORAGE updates)
-# Outputs to both global Store (.data for submit button) and modal display (.children)
-@callback(
-    [
-        Output("R-alert-pair", "is_open"),
-        Output("Rconsole-error-pw", "children"),
-        Output("para-pairwise-data", "data"),
-        Output("para-pairwise-data-modal", "children"),
-        Output("forest_data_prws_STORAGE", "data"),
-    ],
-    Input("forest_data_STORAGE", "modified_timestamp"),
-    [
-        State("number_outcomes_STORAGE", "data"),
-        State("modal_data_checks", "is_open"),
-        State("net_data_STORAGE", "data"),
-        State("forest_data_prws_STORAGE", "data"),
-    ],
+    output=dict(
+        nma_alert=Output("R-alert-nma", "is_open"),
+        nma_error=Output("Rconsole-error-nma", "children"),
+        pw_alert=Output("R-alert-pair", "is_open"),
+        pw_error=Output("Rconsole-error-pw", "children"),
+        lt_alert=Output("R-alert-league", "is_open"),
+        lt_error=Output("Rconsole-error-league", "children"),
+        funnel_alert=Output("R-alert-funnel", "is_open"),
+        funnel_error=Output("Rconsole-error-funnel", "children"),
+        checks_done=Output("para-check-data", "data"),
+        checks_msg=Output("para-check-data-modal", "children"),
+        nma_done=Output("para-anls-data", "data"),
+        nma_msg=Output("para-anls-data-modal", "children"),
+        pw_done=Output("para-pairwise-data", "data"),
+        pw_msg=Output("para-pairwise-data-modal", "children"),
+        lt_done=Output("para-LT-data", "data"),
+        lt_msg=Output("para-LT-data-modal", "children"),
+        funnel_done=Output("para-FA-data", "data"),
+        funnel_msg=Output("para-FA-data-modal", "children"),
+        task=Output("nma-task-store", "data"),
+        completed=Output("nma-task-completed", "data"),
+        poller_disabled=Output("nma-task-poller", "disabled"),
+    ),
+    inputs=dict(modal_open=Input("modal_data_checks", "is_open")),
+    state=dict(
+        num_outcome=State("number_outcomes_STORAGE", "data"),
+        net_data_STORAGE=State("net_data_STORAGE", "data"),
+        outcome_idx=State({"type": "outcomeprimary", "index": ALL}, "value"),
+        outcome_names=State("outcome_names_STORAGE", "data"),
+        consts=State("consts_STORAGE", "data"),
+    ),
     prevent_initial_call=True,
 )
-def modal_submit_checks_PAIRWISE(
-    nma_data_ts,
-    num_outcome_storage,
-    modal_data_checks_is_open,
+def start_nma_processing(
+    modal_open,
+    num_outcome,
     net_data_STORAGE,
-    forest_data_prws_STORAGE,
+    outcome_idx,
+    outcome_names,
+    consts,
 ):
-    # Use stored number of outcomes (fallback to 1)
-    num_outcome = num_outcome_storage if num_outcome_storage else 1
-    # Guard: Only run when modal is open (prevents errors when on results page)
-    if not modal_data_checks_is_open:
-        return [dash.no_update] * 5
-
-    result = __modal_submit_checks_PAIRWISE_new(
-        nma_data_ts,
+    return __start_nma_processing__(
+        modal_open,
         num_outcome,
-        modal_data_checks_is_open,
         net_data_STORAGE,
-        forest_data_prws_STORAGE,
+        outcome_idx,
+        outcome_names,
+        consts,
     )
-    # result is (alert_open, error_msg, children, data_marker, forest_prws_data)
-    # Output: alert, error_msg, marker to Store, children to modal, forest_prws_data
-    return [result[0], result[1], result[3], result[2], result[4]]
 
 
-# Step 4: League table - triggered when Pairwise completes (forest_data_prws_STORAGE updates)
-# Outputs to both global Store (.data for submit button) and modal display (.children)
+# Every second while the analysis runs: only the task ids travel
 @callback(
-    [
-        Output("R-alert-league", "is_open"),
-        Output("Rconsole-error-league", "children"),
-        Output("para-LT-data", "data"),
-        Output("para-LT-data-modal", "children"),
-        Output("league_table_data_STORAGE", "data"),
-        Output("ranking_data_STORAGE", "data"),
-        Output("consistency_data_STORAGE", "data"),
-        Output("net_split_data_STORAGE", "data"),
-        Output("net_split_ALL_data_STORAGE", "data"),
-    ],
-    Input("forest_data_prws_STORAGE", "modified_timestamp"),
-    [
-        State("number_outcomes_STORAGE", "data"),
-        State("modal_data_checks", "is_open"),
-        State("net_data_STORAGE", "data"),
-        State("league_table_data_STORAGE", "data"),
-        State("ranking_data_STORAGE", "data"),
-        State("consistency_data_STORAGE", "data"),
-        State("net_split_data_STORAGE", "data"),
-        State("net_split_ALL_data_STORAGE", "data"),
-        State({"type": "outcomeprimary", "index": ALL}, "value"),
-        State("outcome_names_STORAGE", "data"),
-    ],
+    output=dict(
+        nma_alert=Output("R-alert-nma", "is_open", allow_duplicate=True),
+        nma_error=Output("Rconsole-error-nma", "children", allow_duplicate=True),
+        pw_alert=Output("R-alert-pair", "is_open", allow_duplicate=True),
+        pw_error=Output("Rconsole-error-pw", "children", allow_duplicate=True),
+        lt_alert=Output("R-alert-league", "is_open", allow_duplicate=True),
+        lt_error=Output("Rconsole-error-league", "children", allow_duplicate=True),
+        funnel_alert=Output("R-alert-funnel", "is_open", allow_duplicate=True),
+        funnel_error=Output("Rconsole-error-funnel", "children", allow_duplicate=True),
+        checks_done=Output("para-check-data", "data", allow_duplicate=True),
+        checks_msg=Output("para-check-data-modal", "children", allow_duplicate=True),
+        nma_done=Output("para-anls-data", "data", allow_duplicate=True),
+        nma_msg=Output("para-anls-data-modal", "children", allow_duplicate=True),
+        pw_done=Output("para-pairwise-data", "data", allow_duplicate=True),
+        pw_msg=Output("para-pairwise-data-modal", "children", allow_duplicate=True),
+        lt_done=Output("para-LT-data", "data", allow_duplicate=True),
+        lt_msg=Output("para-LT-data-modal", "children", allow_duplicate=True),
+        funnel_done=Output("para-FA-data", "data", allow_duplicate=True),
+        funnel_msg=Output("para-FA-data-modal", "children", allow_duplicate=True),
+        task=Output("nma-task-store", "data", allow_duplicate=True),
+        completed=Output("nma-task-completed", "data", allow_duplicate=True),
+        poller_disabled=Output("nma-task-poller", "disabled", allow_duplicate=True),
+    ),
+    inputs=dict(n_intervals=Input("nma-task-poller", "n_intervals")),
+    state=dict(
+        num_outcome=State("number_outcomes_STORAGE", "data"),
+        task=State("nma-task-store", "data"),
+    ),
     prevent_initial_call=True,
 )
-def modal_submit_checks_LT(
-    pw_data_ts,
-    num_outcome_storage,
-    modal_data_checks_is_open,
-    net_data_STORAGE,
-    league_table_data,
-    ranking_data,
-    consistency_data,
-    net_split_data,
-    netsplit_all,
-    outcome_index,
-    outcome_names,
-):
-    # Use stored number of outcomes (fallback to 1)
-    num_outcome = num_outcome_storage if num_outcome_storage else 1
-    # Guard: Only run when modal is open (prevents errors when on results page)
-    if not modal_data_checks_is_open:
-        return [dash.no_update] * 9
-
-    result = __modal_submit_checks_LT_new(
-        pw_data_ts,
-        num_outcome,
-        modal_data_checks_is_open,
-        net_data_STORAGE,
-        league_table_data,
-        ranking_data,
-        consistency_data,
-        net_split_data,
-        netsplit_all,
-        outcome_index,
-        outcome_names,
-    )
-    # result is (alert, error, children, data_marker, league, ranking, consistency, netsplit, netsplit_all)
-    # Output: alert, error, marker to Store, children to modal, league, ranking, consistency, netsplit, netsplit_all
-    return [
-        result[0],
-        result[1],
-        result[3],
-        result[2],
-        result[4],
-        result[5],
-        result[6],
-        result[7],
-        result[8],
-    ]
+def poll_nma_processing(n_intervals, num_outcome, task):
+    return __poll_nma_processing__(n_intervals, num_outcome, task)
 
 
-# Step 5: Funnel plot - triggered when League table completes (league_table_data_STORAGE updates)
-# Outputs to both global Store (.data for submit button) and modal display (.children)
+# Once per analysis: the current stores are only sent here, to skip unchanged ones
 @callback(
-    [
-        Output("R-alert-funnel", "is_open"),
-        Output("Rconsole-error-funnel", "children"),
-        Output("para-FA-data", "data"),
-        Output("para-FA-data-modal", "children"),
-        Output("funnel_data_STORAGE", "data"),
-    ],
-    Input("league_table_data_STORAGE", "modified_timestamp"),
-    [
-        State("number_outcomes_STORAGE", "data"),
-        State("modal_data_checks", "is_open"),
-        State("net_data_STORAGE", "data"),
-        State("funnel_data_STORAGE", "data"),
-    ],
+    output=dict(
+        **{store_id: Output(store_id, "data") for store_id in STORE_IDS},
+        checks_done=Output("para-check-data", "data", allow_duplicate=True),
+        nma_done=Output("para-anls-data", "data", allow_duplicate=True),
+        pw_done=Output("para-pairwise-data", "data", allow_duplicate=True),
+        lt_done=Output("para-LT-data", "data", allow_duplicate=True),
+        funnel_done=Output("para-FA-data", "data", allow_duplicate=True),
+        netsplit_tasks=Output("netsplit-task-store", "data"),
+    ),
+    inputs=dict(completed=Input("nma-task-completed", "data")),
+    state=dict(
+        consts=State("consts_STORAGE", "data"),
+        previous_stores=[State(store_id, "data") for store_id in STORE_IDS],
+    ),
     prevent_initial_call=True,
 )
-def modal_submit_checks_FUNNEL(
-    lt_data_ts,
-    num_outcome_storage,
-    modal_data_checks_is_open,
-    net_data_STORAGE,
-    funnel_data,
-):
-    # Guard: Only run when modal is open (prevents errors when on results page)
-    if not modal_data_checks_is_open:
-        return [dash.no_update] * 5
-
-    # Use stored number of outcomes (fallback to 1)
-    num_outcome = num_outcome_storage if num_outcome_storage else 1
-
-    result = __modal_submit_checks_FUNNEL_new(
-        lt_data_ts,
-        num_outcome,
-        modal_data_checks_is_open,
-        net_data_STORAGE,
-        funnel_data,
-    )
-    # result is (alert, error, children, data_marker, funnel_data)
-    # Output: alert, error, marker to Store, children to modal, funnel_data
-    return [result[0], result[1], result[3], result[2], result[4]]
+def apply_nma_results(completed, consts, previous_stores):
+    return __apply_nma_results__(completed, consts, previous_stores)
 
 
 # Collect R errors from all analysis steps and store them
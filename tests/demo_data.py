@@ -0,0 +1,20 @@
+"""
+Data shared by the tests: the psoriasis demo project (db/psoriasis demo.nmastudio).
+
+Imported by the test scripts as ``from demo_data import ...``: the tests
+directory is on sys.path whether a test runs as a script or under pytest.
+"""
+
+import io
+import json
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def demo_net_data():
+    """net_data of the psoriasis demo project: pairwise data of 3 outcomes."""
+    project = json.loads((ROOT / "db" / "psoriasis demo.nmastudio").read_text())
+    return pd.read_json(io.StringIO(project["net_data_STORAGE"]["data"]), orient="split")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test of the network topology statistics (tools/graph_stats.py)
+
+This test performs the following steps:
+1. Computes the statistics of the psoriasis demo network (all comparisons)
+2. Computes them on a small network with a multi-arm study, a comparison
+   stored in both directions and a disconnected pair of treatments
+3. Computes them on a network of 500 treatments
+4. Computes the closeness of the treatments on demand
+
+Expected behavior:
+- Study, treatment and comparison counts match the overview panel of the demo
+- A-B and B-A are one direct comparison; disconnected parts are listed, the
+  largest first; degree and density match hand-computed values
+- 500 treatments take well under a second
+- Closeness matches hand-computed values; PBO is the most central treatment
+  of the demo network
+"""
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from tools.graph_stats import network_statistics, network_closeness
+from tools.network_summary import summarize_network
+from demo_data import demo_net_data
+
+
+def test_network_statistics():
+    demo = demo_net_data()
+    stats = network_statistics(summarize_network(demo, None))
+    assert (stats["n_studies"], stats["n_treatments"], stats["n_direct"]) == (104, 20, 41)
+    assert stats["n_indirect"] == 20 * 19 // 2 - 41
+    assert len(stats["components"]) == 1 and stats["n_multiarm"] == 15
+    assert json.loads(json.dumps(stats)) == stats
+    print("   ✅ demo network statistics")
+
+    df = pd.DataFrame({
+        "studlab": [1, 1, 1, 2, 3, 4],
+        "treat1": ["A", "A", "B", "C", "B", "X"],
+        "treat2": ["B", "C", "C", "D", "A", "Y"],
+        "TE1": [0.1] * 6,
+        "seTE1": [0.1] * 6,
+    })
+    stats = network_statistics(summarize_network(df, 0))
+    assert stats["n_direct"] == 5 and stats["n_indirect"] == 15 - 5
+    assert np.isclose(stats["density"], 5 / 15)
+    assert (stats["n_studies"], stats["n_multiarm"]) == (4, 1)
+    assert stats["components"] == [["A", "B", "C", "D"], ["X", "Y"]]
+    assert stats["degree"] == {"A": 2, "B": 2, "C": 3, "D": 1, "X": 1, "Y": 1}
+    print("   ✅ components, degree and density")
+
+    rng = np.random.default_rng(0)
+    T = 500
+    t1, t2 = rng.integers(0, T, 20000), rng.integers(0, T, 20000)
+    keep = t1 != t2
+    big = pd.DataFrame({
+        "studlab": np.arange(keep.sum()),
+        "treat1": [f"T{k}" for k in t1[keep]],
+        "treat2": [f"T{k}" for k in t2[keep]],
+        "TE1": 0.1, "seTE1": 0.1,
+    })
+    start = time.time()
+    stats = network_statistics(summarize_network(big, 0))
+    elapsed = time.time() - start
+    assert stats["n_treatments"] == T and elapsed < 1.0, elapsed
+    print(f"   ✅ {T} treatments, {stats['n_direct']} direct comparisons in {elapsed * 1000:.0f} ms")
+    return True
+
+
+def test_network_closeness():
+    closeness = network_closeness(summarize_network(demo_net_data(), None))
+    assert max(closeness, key=closeness.get) == "PBO"
+
+    df = pd.DataFrame({
+        "studlab": [1, 1, 1, 2, 3, 4],
+        "treat1": ["A", "A", "B", "C", "B", "X"],
+        "treat2": ["B", "C", "C", "D", "A", "Y"],
+        "TE1": [0.1] * 6,
+        "seTE1": [0.1] * 6,
+    })
+    closeness = network_closeness(summarize_network(df, 0))
+    # C reaches A, B, D in one step: 3 / 3 * 3 / 5
+    assert np.isclose(closeness["C"], 3 / 5)
+    assert np.isclose(closeness["X"], 1 / 5)
+    print("   ✅ closeness on demand")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running network statistics test...")
+    print("=" * 50)
+    test_network_statistics()
+    test_network_closeness()
+    print("\n✅ Network statistics work")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test of the local job backend (tools/job_backend.py)
+
+This test performs the following steps:
+1. Points the job database at a temporary file
+2. Starts a job on the process pool and polls it until it finishes
+3. Starts a job that raises
+4. Runs a chord of parallel jobs joined by a final job, started by polling
+5. Lets the parallel jobs of a chord finish before anyone polls it
+
+Expected behavior:
+- A job goes from PENDING/STARTED to SUCCESS and returns its value
+- Progress published with update_state is visible while it runs
+- A failing job ends in FAILURE with the exception message
+- The join receives the results of the parallel jobs in their order
+- A chord join does not depend on the process that started it: the first
+  poll after the parallel jobs finished starts it, exactly once
+- JOB_WORKERS=0 is refused, and the refused jobs end in FAILURE, not PENDING
+- Jobs and chords not updated for JOB_TTL_HOURS are purged, finished or not
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from tools import job_backend
+
+
+def _add(self, a, b, pause=0.0):
+    self.update_state(state="STARTED", meta={"status": "adding"})
+    time.sleep(pause)
+    return {"sum": a + b}
+
+
+def _fail(self):
+    raise ValueError("no network")
+
+
+def _square(self, x):
+    time.sleep(0.2 * (3 - x))  # later items finish first
+    return x * x
+
+
+def _join(self, results, offset):
+    return [r + offset for r in results]
+
+
+def _wait(result, timeout=60):
+    deadline = time.time() + timeout
+    while not result.ready():
+        job_backend.join_chord(result.id)  # what the analysis poller does
+        assert time.time() < deadline, f"job still {result.state}"
+        time.sleep(0.05)
+    return result
+
+
+def test_local_jobs():
+    with tempfile.TemporaryDirectory() as tmp:
+        job_backend.JOB_DB = os.path.join(tmp, "jobs.sqlite3")
+        os.environ["JOB_DB"] = job_backend.JOB_DB  # seen by the spawned workers
+        try:
+            add = job_backend.task(_add)
+            result = add.delay(1, 2, pause=1.0)
+            seen = set()
+            while not result.ready():
+                seen.add(result.state)
+                if result.state == "STARTED" and result.info:
+                    assert result.info["status"] == "adding"
+                time.sleep(0.05)
+            assert result.state == "SUCCESS" and result.result == {"sum": 3}
+            assert seen <= {"PENDING", "STARTED"}
+            print("   ✅ job succeeded:", result.result)
+
+            state = job_backend.AsyncResult(result.id).state
+            assert state == "SUCCESS", state
+            print("   ✅ state readable from a new handle")
+
+            failed = _wait(job_backend.task(_fail).delay())
+            assert failed.failed()
+            assert failed.info["exc_type"] == "ValueError"
+            assert failed.info["exc_message"] == "no network"
+            print("   ✅ failure recorded")
+
+            assert job_backend.AsyncResult("unknown").state == "PENDING"
+        finally:
+            job_backend.reset_executor()
+            os.environ.pop("JOB_DB", None)
+    return True
+
+
+def test_local_chord():
+    with tempfile.TemporaryDirectory() as tmp:
+        job_backend.JOB_DB = os.path.join(tmp, "jobs.sqlite3")
+        os.environ["JOB_DB"] = job_backend.JOB_DB
+        try:
+            square, join = job_backend.task(_square), job_backend.task(_join)
+            result = job_backend.chord([square.s(x) for x in range(4)])(join.s(1))
+            assert len(result.parent.results) == 4
+            _wait(result)
+            assert result.result == [1, 2, 5, 10], result.info
+            assert result.parent.completed_count() == 4
+            print("   ✅ chord joined in order:", result.result)
+
+            failing = job_backend.chord([square.s(1), job_backend.task(_fail).s()])(join.s(0))
+            assert _wait(failing).failed()
+            assert "no network" in failing.info["exc_message"]
+            print("   ✅ failing subtask fails the join")
+
+            unpolled = job_backend.chord([square.s(x) for x in (2, 3)])(join.s(0))
+            deadline = time.time() + 60
+            while unpolled.parent.completed_count() < 2:
+                assert time.time() < deadline
+                time.sleep(0.05)
+            time.sleep(0.2)
+            assert unpolled.state == "PENDING"  # no thread of this process joins it
+            poll = job_backend.AsyncResult(unpolled.id)  # e.g. after a restart
+            job_backend.join_chord(poll.id)
+            job_backend.join_chord(poll.id)
+            assert _wait(poll).result == [4, 9]
+            print("   ✅ chord joined from the poll, once")
+
+            job_backend.reset_executor()
+            workers, job_backend.JOB_WORKERS = job_backend.JOB_WORKERS, 0
+            try:
+                job_backend.task(_square).delay(1)
+                raise AssertionError("JOB_WORKERS=0 accepted")
+            except ValueError:
+                print("   ✅ JOB_WORKERS=0 refused")
+            try:
+                job_backend.chord([square.s(1)])(join.s(0))
+                raise AssertionError("JOB_WORKERS=0 accepted")
+            except ValueError:
+                pass
+            finally:
+                job_backend.JOB_WORKERS = workers
+            conn = job_backend._connect()
+            try:
+                states = [s for (s,) in conn.execute("SELECT state FROM jobs")]
+                assert "PENDING" not in states and "STARTED" not in states, states
+                assert states.count("FAILURE") == 3, states  # _fail, its chord, the refused job
+            finally:
+                conn.close()
+            print("   ✅ refused jobs recorded as failed")
+
+            lost = "lost-job"
+            job_backend._write(lost, "STARTED", name="_square")
+            job_backend.purge(max_age_hours=1)
+            assert job_backend.AsyncResult(lost).state == "STARTED"
+            job_backend.purge(max_age_hours=0)
+            conn = job_backend._connect()
+            try:
+                assert conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 0
+                assert conn.execute("SELECT COUNT(*) FROM chords").fetchone()[0] == 0
+            finally:
+                conn.close()
+            print("   ✅ stale unfinished jobs purged")
+        finally:
+            job_backend.reset_executor()
+            os.environ.pop("JOB_DB", None)
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running local job backend test...")
+    print("=" * 50)
+    test_local_jobs()
+    test_local_chord()
+    print("\n✅ Local job backend works")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test of the two-outcome league table (tools/league_tables.py)
+
+This test performs the following steps:
+1. Composes the league tables of the two psoriasis outcomes
+   (db/league_table_data/league_1.csv and league_2.csv, netmeta output)
+   and compares it with the table of the R function it replaces
+   (db/league_table_data/league_table.csv)
+2. Composes the tables again with a treatment missing from outcome 1
+
+Expected behavior:
+- Identical to the R output: lower triangle and diagonal from outcome 1,
+  upper triangle from the transposed outcome 2
+- Treatments of only one outcome (CICLO has no second outcome) are kept,
+  with empty cells on the side of the outcome without them
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from tools.league_tables import compose_league_table_both
+
+DATA = ROOT / "db" / "league_table_data"
+
+
+def _read(name):
+    return pd.read_csv(DATA / name, index_col=0)
+
+
+def test_league_table_both_matches_r():
+    league1, league2 = _read("league_1.csv"), _read("league_2.csv")
+    assert set(league1.index) - set(league2.index) == {"CICLO"}
+
+    both = compose_league_table_both(league1, league2)
+    expected = _read("league_table.csv").fillna("")
+    assert list(both.index) == list(expected.index)
+    assert list(both.columns) == list(expected.columns)
+    assert (both.astype(str).values == expected.astype(str).values).all()
+    print(f"   ✅ {len(both)} x {len(both)} table identical to the R output")
+
+    k = list(both.index).index("CICLO")
+    assert (both.iloc[k, k + 1:] == "").all() and (both.iloc[k + 1:, k] != "").any()
+    print("   ✅ treatment of outcome 1 only: no cells of outcome 2")
+    return True
+
+
+def test_treatment_missing_from_outcome_1():
+    league1, league2 = _read("league_1.csv"), _read("league_2.csv")
+    league1 = league1.drop(index="ADA", columns="ADA")
+
+    both = compose_league_table_both(league1, league2)
+    assert list(both.index) == sorted(set(league1.index) | {"ADA"})
+    assert both.loc["ADA", "ADA"] == "ADA"
+    others = [t for t in both.index if t != "ADA"]  # ADA sorts first
+    assert (both.loc[others, "ADA"] == "").all()  # lower triangle: outcome 1
+    from_outcome2 = league2["ADA"].reindex(others).fillna("")
+    assert (both.loc["ADA", others] == from_outcome2).all()  # upper: outcome 2
+    print("   ✅ treatment of outcome 2 only: no cells of outcome 1")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running two-outcome league table test...")
+    print("=" * 50)
+    test_league_table_both_matches_r()
+    test_treatment_missing_from_outcome_1()
+    print("\n✅ Two-outcome league table works")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test of the server-side network layout (tools/network_layout.py)
+
+This test performs the following steps:
+1. Lays out a path, a disconnected network and the psoriasis demo network
+2. Builds the elements of each outcome of the demo with the positions
+3. Lays out a network of 300 treatments
+
+Expected behavior:
+- Layout distances follow graph distances (a path is laid out straight);
+  disconnected parts do not overlap
+- Layouts are deterministic, and a treatment has the same position in every
+  outcome network
+- 300 treatments are laid out in well under two seconds
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from tools.network_layout import graph_distances, layout_positions, stress_layout
+from tools.network_summary import summarize_network
+from demo_data import demo_net_data
+
+
+def _layout_distances(X):
+    return np.sqrt(((X[:, None, :] - X[None, :, :]) ** 2).sum(axis=-1))
+
+
+def test_network_layout():
+    X = stress_layout(np.arange(9), np.arange(1, 10), 10)
+    assert np.isclose(_layout_distances(X)[0, 9], 9, atol=1e-3)
+    print("   ✅ path laid out straight")
+
+    X = stress_layout(np.array([0, 1, 3]), np.array([1, 2, 4]), 5)
+    assert _layout_distances(X)[:3, 3:].min() > 0.5
+    assert np.isclose(graph_distances(np.array([0]), np.array([1]), 3)[0, 2], 2)
+    print("   ✅ disconnected parts kept apart")
+
+    demo = demo_net_data()
+    summary = summarize_network(demo, None)
+    positions = layout_positions(summary)
+    assert positions == layout_positions(summarize_network(demo, None))
+    X = np.array([[p["x"], p["y"]] for p in positions.values()])
+    D = graph_distances(summary.source, summary.target, len(X))
+    upper = np.triu_indices(len(X), 1)
+    assert np.corrcoef(_layout_distances(X)[upper], D[upper])[0, 1] > 0.3
+    print("   ✅ demo layout deterministic and follows graph distances")
+
+    for i in range(3):
+        elements = summarize_network(demo, i).elements(positions)
+        nodes = [e for e in elements if "id" in e["data"]]
+        assert all(node["position"] == positions[node["data"]["id"]] for node in nodes)
+        assert not any("position" in e for e in elements if "source" in e["data"])
+    print("   ✅ positions shared by the outcome networks")
+
+    rng = np.random.default_rng(1)
+    T = 300
+    t1, t2 = rng.integers(0, T, 900), rng.integers(0, T, 900)
+    keep = t1 != t2
+    start = time.time()
+    X = stress_layout(np.minimum(t1, t2)[keep], np.maximum(t1, t2)[keep], T)
+    elapsed = time.time() - start
+    assert np.isfinite(X).all() and elapsed < 2.0, elapsed
+    print(f"   ✅ {T} treatments laid out in {elapsed * 1000:.0f} ms")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running network layout test...")
+    print("=" * 50)
+    test_network_layout()
+    print("\n✅ Network layouts work")
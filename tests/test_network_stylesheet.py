@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test of the base stylesheets of the network plots
+(tools/functions_generate_stylesheet.py, used by networkStylesheet in
+assets/clientside.js)
+
+This test performs the following steps:
+1. Builds the base stylesheets of the default display options
+2. Builds them with every option set, twice
+3. Modifies a returned stylesheet
+
+Expected behavior:
+- Default options give the default get_stylesheet, no treatment highlight
+  and no class colors
+- Options reach the plain and dimmed stylesheets; the typed treatment gets
+  its highlight rules; classes send the class colors to the browser
+- Option combinations are computed once; callers get independent copies
+"""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from assets.cytoscape_styleesheeet import get_stylesheet
+from tools import functions_generate_stylesheet as stylesheets
+from tools.network_summary import CMAP
+
+network_stylesheets = getattr(stylesheets, "__network_stylesheets")
+
+
+def test_network_stylesheets():
+    base = network_stylesheets("Default", "Default", None, None, None, None, None, None)
+    assert base["plain"] == get_stylesheet(label_size=None)
+    assert base["dimmed"] == get_stylesheet(nodes_opacity=0.2, edges_opacity=0.1, label_size=None)
+    assert base["treat"] == [] and base["class_colors"] is None
+    print("   ✅ default options")
+
+    options = ("By class", "Add label", "red", "blue", 14, "ETA", "Tot randomized", "No size")
+    stylesheets._network_stylesheets.cache_clear()
+    base = network_stylesheets(*options)
+    node, edge = base["plain"][0]["style"], base["plain"][1]["style"]
+    assert node["width"] == "data(size)" and node["font-size"] == 14
+    assert edge["line-color"] == "blue" and edge["label"] == "data(weight_lab)"
+    assert edge["width"] is None and base["dimmed"][1]["style"]["opacity"] == 0.1
+    assert base["treat"][-1]["selector"] == 'node[label = "ETA"]'
+    assert base["class_colors"] == CMAP and base["edge_color"] == "blue"
+    print("   ✅ display options applied")
+
+    base["plain"][0]["style"]["color"] = "white"
+    again = network_stylesheets(*options)
+    assert again["plain"][0]["style"]["color"] == "black"
+    assert stylesheets._network_stylesheets.cache_info().hits == 1
+    print("   ✅ memoized per option combination")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running network stylesheet test...")
+    print("=" * 50)
+    test_network_stylesheets()
+    print("\n✅ Network stylesheets work")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test of the network summary behind the network plots (tools/network_summary.py)
+
+This test performs the following steps:
+1. Summarizes a small network with a multi-arm study, risk of bias and classes
+2. Builds its Cytoscape elements
+3. Summarizes the psoriasis demo network and a large network
+
+Expected behavior:
+- Node sizes sum the arms of each treatment, whichever side of the comparison
+  it is on; edges count the comparisons of each pair of treatments
+- Nodes carry the low/medium/high risk of bias fractions and their class color
+- Comparisons without TE/seTE of the outcome, or without a treatment, are
+  left out
+- 60k+ comparisons are summarized in well under a second
+"""
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from tools.graph_stats import network_statistics
+from tools.network_summary import CMAP, summarize_network
+from demo_data import demo_net_data
+
+
+def test_network_summary():
+    df = pd.DataFrame({
+        "studlab": [1, 1, 1, 2, 3],
+        "treat1": ["B", "A", "B", "PBO", "A"],
+        "treat2": ["A", "C", "C", "A", "PBO"],
+        "TE1": [0.1, 0.2, 0.3, 0.4, np.nan],
+        "seTE1": [0.1, 0.1, 0.1, 0.2, 0.2],
+        "n11": [10, 20, 10, 30, 50],
+        "n21": [20, 15, 15, 40, 60],
+        "rob": [1, 1, 1, 3, 2],
+        "treat_class1": ["bio", "bio", "bio", "placebo", "bio"],
+        "treat_class2": ["bio", "small", "small", "bio", "placebo"],
+    })
+    summary = summarize_network(df, 0)
+    assert summary.treatments.tolist() == ["A", "B", "C", "PBO"]
+    assert summary.n.tolist() == [20 + 20 + 40, 10 + 10, 15 + 15, 30]
+    edges = [(summary.treatments[s], summary.treatments[t], c)
+             for s, t, c in zip(summary.source, summary.target, summary.count)]
+    assert edges == [("A", "B", 1), ("A", "C", 1), ("A", "PBO", 1), ("B", "C", 1)]
+    assert summary.rob.tolist() == [[2, 0, 1], [2, 0, 0], [2, 0, 0], [0, 0, 1]]
+    assert summary.classes.tolist() == [0, 0, 2, 1] and summary.n_classes == 3
+    print("   ✅ nodes, edges, risk of bias and classes summarized")
+
+    elements = summary.elements()
+    nodes = {e["data"]["id"]: e for e in elements if "id" in e["data"]}
+    assert len(elements) == 8 and list(nodes) == ["A", "B", "C", "PBO"]
+    assert nodes["A"]["data"]["size"] == 80 and nodes["PBO"]["data"]["size"] == 30
+    assert np.isclose(nodes["A"]["data"]["pie3"], 1 / 3)
+    assert nodes["C"]["classes"] == CMAP[2] and nodes["C"]["data"]["n_class"] == 3
+    assert elements[0]["data"] == {"source": "A", "target": "B", "weight": 0.75, "weight_lab": 1}
+    assert json.loads(json.dumps(elements)) == elements
+    print("   ✅ Cytoscape elements built")
+
+    plain = summarize_network(df.drop(columns=["rob", "treat_class1", "treat_class2"]), 0)
+    node = plain.elements()[-1]
+    assert node == {"data": {"id": "PBO", "label": "PBO", "size": 30, "classes": "genesis"}}
+    print("   ✅ networks without risk of bias or classes")
+
+    missing = pd.concat([df, df.iloc[[0, 3]]], ignore_index=True)
+    missing.loc[5, "treat2"], missing.loc[6, "treat1"] = None, np.nan
+    for i in (0, None):
+        summary = summarize_network(missing, i)
+        expected = summarize_network(df, i)
+        assert summary.treatments.tolist() == expected.treatments.tolist()
+        assert summary.n.tolist() == expected.n.tolist()
+        assert summary.count.tolist() == expected.count.tolist()
+        assert network_statistics(summary) == network_statistics(expected)
+    print("   ✅ comparisons without a treatment left out")
+
+    demo = demo_net_data()
+    for i in range(3):
+        summary = summarize_network(demo, i)
+        kept = demo.dropna(subset=[f"TE{i + 1}", f"seTE{i + 1}"])
+        assert summary.count.sum() == len(kept)
+        assert set(summary.treatments) == set(kept.treat1) | set(kept.treat2)
+        assert summary.n.sum() == kept[f"n1{i + 1}"].sum() + kept[f"n2{i + 1}"].sum()
+    print("   ✅ demo network summarized")
+
+    big = pd.concat([demo] * 500, ignore_index=True)
+    big["treat1"] = big["treat1"] + (big.index % 20).astype(str)
+    start = time.time()
+    elements = summarize_network(big, 0).elements()
+    elapsed = time.time() - start
+    assert elapsed < 1.0, elapsed
+    print(f"   ✅ {len(big)} comparisons -> {len(elements)} elements in {elapsed * 1000:.0f} ms")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running network summary test...")
+    print("=" * 50)
+    test_network_summary()
+    print("\n✅ Network summaries work")
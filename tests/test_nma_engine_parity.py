@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Parity test of the NumPy engine (tools/meta_engine.py) against R netmeta/meta
+
+This test performs the following steps:
+1. Loads db/psoriasis_wide_complete.csv (2 outcomes, RR)
+2. Runs run_NetMeta_py, run_pairwise_py and run_funnel_py for each outcome
+3. Runs run_NetMeta_new / pairwise_forest_new / funnel_funct_new in R through tools.utils when
+   rpy2/R are available, otherwise uses the stored R output in db/forest_data/
+4. Compares every column of the tables row by row
+
+Expected behavior:
+- Same (Treatment, Reference) pairs and same pairwise rows in the same order
+- NMA effects, confidence/prediction intervals, weights and tau2 equal up to 1e-6
+- Pairwise results equal up to the REML convergence tolerance (1e-3 relative)
+- Same funnel rows (study, treatment, reference) with effects equal up to 1e-6
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)  # R_Codes/ and db/ are resolved relative to the project root
+
+from tools.meta_engine import run_NetMeta_py, run_pairwise_py, run_funnel_py
+
+TOLERANCE = 1e-6
+PAIRWISE_TOLERANCE = 1e-3
+KEYS = ["Treatment", "Reference"]
+VALUE_COLUMNS = ["CI_lower", "CI_upper", "pre_lower", "pre_upper", "WEIGHT", "tau2"]
+PAIRWISE_KEYS = ["studlab", "treat1", "treat2"]
+PAIRWISE_STORED = [
+    "db/forest_data/forest_data_pairwise.csv",
+    "db/forest_data/forest_data_pairwise_out2.csv",
+]
+FUNNEL_KEYS = ["studlab", "treat1", "treat2"]
+FUNNEL_STORED = ["db/funnel/funnel_data.csv", "db/funnel/funnel_data_out2.csv"]
+
+
+def r_reference(net_data, i):
+    """R output of run_NetMeta_new, live if possible, stored otherwise."""
+    try:
+        from tools.utils import run_network_meta_analysis
+
+        print(f"   Using live R netmeta for outcome {i + 1}")
+        return run_network_meta_analysis(net_data.copy(), i, backend="r")
+    except Exception as e:  # rpy2 or R not installed
+        print(f"   R unavailable ({type(e).__name__}), using stored R output")
+        return pd.read_csv(f"db/forest_data/forest_data_out{i + 1}.csv")
+
+
+def r_pairwise_reference(net_data, i):
+    """R output of pairwise_forest_new, live if possible, stored otherwise."""
+    try:
+        from tools.utils import run_pairwise_MA
+
+        print(f"   Using live R metagen for outcome {i + 1}")
+        return run_pairwise_MA(net_data.copy(), i, backend="r")
+    except Exception as e:  # rpy2 or R not installed
+        print(f"   R unavailable ({type(e).__name__}), using stored R output")
+        return pd.read_csv(PAIRWISE_STORED[i])
+
+
+def r_funnel_reference(net_data, i):
+    """R output of funnel_funct_new, live if possible, stored otherwise."""
+    try:
+        from tools.utils import generate_funnel_data
+
+        print(f"   Using live R netmeta for outcome {i + 1}")
+        return generate_funnel_data(net_data.copy(), i, backend="r")
+    except Exception as e:  # rpy2 or R not installed
+        print(f"   R unavailable ({type(e).__name__}), using stored R output")
+        return pd.read_csv(FUNNEL_STORED[i])
+
+
+def test_nma_engine_parity():
+    net_data = pd.read_csv("db/psoriasis_wide_complete.csv", encoding="iso-8859-1")
+    for i in range(2):
+        sm = net_data[f"effect_size{i + 1}"].iloc[0]
+        print(f"📊 Outcome {i + 1} ({sm})")
+        py_out = run_NetMeta_py(net_data.copy(), i)
+        r_out = r_reference(net_data, i)
+
+        merged = py_out.merge(r_out, on=KEYS, how="outer", suffixes=("", "_R"))
+        assert len(merged) == len(py_out) == len(r_out), (
+            f"Treatment/reference pairs differ: python={len(py_out)}, R={len(r_out)}"
+        )
+        for col in [sm] + VALUE_COLUMNS:
+            diff = np.nanmax(np.abs(merged[col] - merged[f"{col}_R"]))
+            assert diff < TOLERANCE, f"Column {col} differs from R by {diff}"
+            print(f"   ✅ {col}: max abs diff {diff:.2e}")
+    return True
+
+
+def test_pairwise_engine_parity():
+    net_data = pd.read_csv("db/psoriasis_wide_complete.csv")
+    for i in range(2):
+        sm = net_data[f"effect_size{i + 1}"].iloc[0]
+        print(f"📊 Pairwise outcome {i + 1} ({sm})")
+        py_out = run_pairwise_py(net_data.copy(), i)
+        r_out = r_pairwise_reference(net_data, i)
+
+        assert (
+            py_out[PAIRWISE_KEYS].values == r_out[PAIRWISE_KEYS].values
+        ).all(), "Pairwise rows are not in the same order as in R"
+        for col in r_out.columns.difference(PAIRWISE_KEYS):
+            py_col, r_col = py_out[col].astype(float), r_out[col].astype(float)
+            assert (py_col.isna() == r_col.isna()).all(), f"Missing values differ in {col}"
+            diff = np.nanmax(np.abs(py_col - r_col) / np.maximum(1, np.abs(r_col)))
+            assert diff < PAIRWISE_TOLERANCE, f"Column {col} differs from R by {diff}"
+            print(f"   ✅ {col}: max rel diff {diff:.2e}")
+    return True
+
+
+def test_funnel_engine_parity():
+    net_data = pd.read_csv("db/psoriasis_wide_complete.csv")
+    for i in range(2):
+        sm = net_data[f"effect_size{i + 1}"].iloc[0]
+        print(f"📊 Funnel outcome {i + 1} ({sm})")
+        py_out = run_funnel_py(net_data.copy(), i)
+        r_out = r_funnel_reference(net_data, i)
+
+        merged = py_out.merge(r_out, on=FUNNEL_KEYS, suffixes=("", "_R"))
+        assert len(merged) == len(py_out) == len(r_out), (
+            f"Funnel rows differ: python={len(py_out)}, R={len(r_out)}"
+        )
+        for col in [sm, "TE_direct", "TE_adj", "seTE"]:
+            diff = np.nanmax(np.abs(merged[col] - merged[f"{col}_R"]))
+            assert diff < TOLERANCE, f"Column {col} differs from R by {diff}"
+            print(f"   ✅ {col}: max abs diff {diff:.2e}")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running NMA engine parity test...")
+    print("=" * 50)
+    test_nma_engine_parity()
+    test_pairwise_engine_parity()
+    test_funnel_engine_parity()
+    print("\n✅ NumPy engine matches R netmeta/meta")
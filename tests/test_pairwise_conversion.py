@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test of the conversion of long and contrast uploads to pairwise data
+(tools/pairwise_conversion.py)
+
+This test performs the following steps:
+1. Converts the arm-level psoriasis data (db/psoriasis_long_complete.csv,
+   3 binary outcomes, OR) and compares it with the net_data of the demo
+   project, converted in R by meta::pairwise
+2. Converts a small continuous dataset (MD and SMD) in long format
+3. Converts the same comparisons given in contrast format
+4. Converts long data where no study has two arms
+
+Expected behavior:
+- Same comparisons, in the same order, and same TE/seTE as meta::pairwise,
+  including the continuity correction of studies with a zero cell
+- Study-level variables are kept once, arm-level variables per arm
+- MD and SMD match hand-computed values; contrast and long data agree
+- Long data without any comparison is refused with a readable message
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from tools.pairwise_conversion import long_to_pairwise, contrast_to_pairwise
+from demo_data import demo_net_data
+
+
+def _demo_long_data():
+    df = pd.read_csv(ROOT / "db" / "psoriasis_long_complete.csv")
+    df = df.rename(columns={
+        "unique_id": "studlab",
+        "rPASI90": "r1", "nPASI90": "n1",
+        "rSAE": "r2", "nSAE": "n2",
+        "rAE": "r3", "nAE": "n3",
+    })
+    for i in (1, 2, 3):
+        df[f"effect_size{i}"] = "OR"
+    return df
+
+
+def test_long_binary_matches_meta_pairwise():
+    pairwise = long_to_pairwise(_demo_long_data(), 3)
+    expected = demo_net_data()
+    columns = ["studlab", "treat1", "treat2"]
+    assert pairwise[columns].equals(expected[columns])
+    for i in (1, 2, 3):
+        for column in (f"TE{i}", f"seTE{i}"):
+            np.testing.assert_allclose(pairwise[column], expected[column], atol=1e-8)
+    print(f"   ✅ {len(pairwise)} comparisons identical to meta::pairwise")
+
+    # studies 128 and 166 have an arm without events: 0.5 added to the whole study
+    row = pairwise[(pairwise.studlab == 128) & (pairwise.treat1 == "CERTO")].iloc[0]
+    assert (row.event11, row.n11, row.event21, row.n21) == (108, 332, 46, 170)
+    assert np.isclose(row.TE1, np.log(108.5 * 124.5 / (224.5 * 46.5)))
+    print("   ✅ continuity correction applied per study")
+
+    assert {"year", "name", "age"} <= set(pairwise.columns)
+    assert {"treat_class1", "treat_class2"} <= set(pairwise.columns)
+    assert "treat_class" not in pairwise.columns and "r1" not in pairwise.columns
+    print("   ✅ study- and arm-level variables kept")
+    return True
+
+
+def test_continuous_long_and_contrast():
+    long = pd.DataFrame({
+        "studlab": ["A", "A", "A", "B", "B"],
+        "treat": ["X", "Y", "Z", "X", "Z"],
+        "y1": [1.0, 2.5, 3.0, 0.5, 1.5], "sd1": [1.0, 1.2, 0.8, 2.0, 1.0],
+        "n1": [20, 25, 30, 40, 35],
+        "y2": [10.0, 12.0, 11.0, 9.0, 8.0], "sd2": [3.0, 2.0, 2.5, 4.0, 3.5],
+        "n2": [20, 25, 30, 40, 35],
+        "effect_size1": "MD", "effect_size2": "SMD",
+    })
+    pairwise = long_to_pairwise(long, 2)
+    assert list(zip(pairwise.studlab, pairwise.treat1, pairwise.treat2)) == [
+        ("A", "X", "Y"), ("A", "X", "Z"), ("A", "Y", "Z"), ("B", "X", "Z"),
+    ]
+    row = pairwise.iloc[0]
+    assert np.isclose(row.TE1, -1.5)
+    assert np.isclose(row.seTE1, np.sqrt(1.0 / 20 + 1.44 / 25))
+    N = 45
+    g = (10 - 12) / np.sqrt((19 * 9 + 24 * 4) / (N - 2)) * (1 - 3 / (4 * N - 9))
+    assert np.isclose(row.TE2, g)
+    assert np.isclose(row.seTE2, np.sqrt(N / (20 * 25) + g**2 / (2 * (N - 3.94))))
+    assert (row.mean11, row.mean21, row.sd22) == (1.0, 2.5, 2.0)
+    print("   ✅ MD and SMD computed")
+
+    arm1 = long.iloc[[0, 0, 1, 3]].reset_index(drop=True)
+    arm2 = long.iloc[[1, 2, 2, 4]].reset_index(drop=True)
+    contrast = pd.DataFrame({
+        "studlab": arm1.studlab, "treat1": arm1.treat, "treat2": arm2.treat,
+        "effect_size1": "MD", "effect_size2": "SMD", "rob": 1,
+    })
+    for i in (1, 2):
+        for name in ("y", "sd", "n"):
+            contrast[f"{name}1{i}"] = arm1[f"{name}{i}"]
+            contrast[f"{name}2{i}"] = arm2[f"{name}{i}"]
+    converted = contrast_to_pairwise(contrast, 2)
+    for column in ("TE1", "seTE1", "TE2", "seTE2", "n12", "mean22"):
+        np.testing.assert_allclose(converted[column], pairwise[column])
+    assert "rob" in converted.columns and "y11" not in converted.columns
+    print("   ✅ contrast data converted like long data")
+
+    for single_arm in (long.assign(studlab=["A", "B", "C", "D", "E"]), long.iloc[:0]):
+        try:
+            long_to_pairwise(single_arm, 2)
+            raise AssertionError("single-arm studies converted")
+        except ValueError as e:
+            assert "No study has two arms" in str(e)
+    print("   ✅ data without two-arm studies refused")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running pairwise conversion test...")
+    print("=" * 50)
+    test_long_binary_matches_meta_pairwise()
+    test_continuous_long_and_contrast()
+    print("\n✅ Pairwise conversion works")
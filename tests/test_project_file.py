@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test of the .nmastudio project files (tools/project_file.py)
+
+This test performs the following steps:
+1. Loads the legacy JSON demo project (db/psoriasis demo.nmastudio)
+2. Writes it as a version 3 container and reads it back
+3. Loads the container for a browser session with the session store enabled
+4. Reads a damaged file
+
+Expected behavior:
+- The v3 container round-trips every store and is smaller than the JSON file
+- The manifest lists one section per store and the eager stores
+- Eager stores are inline; tables of the other stores become session store
+  handles that resolve to the saved payloads
+- Legacy JSON projects load the same way; damaged files raise ProjectFileError
+"""
+
+import io
+import os
+import sys
+import json
+import zipfile
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from tools import project_file, session_store
+
+DEMO = ROOT / "db" / "psoriasis demo.nmastudio"
+
+
+def test_project_file_round_trip():
+    legacy = DEMO.read_bytes()
+    project = project_file.read_project(legacy)
+    assert project == json.loads(legacy)
+    print("   ✅ legacy JSON project read")
+
+    buffer = io.BytesIO()
+    project_file.write_project(buffer, project)
+    container = buffer.getvalue()
+    assert project_file.is_container(container)
+    assert len(container) < len(legacy) / 2, len(container)
+    assert project_file.read_project(container) == project
+    print(f"   ✅ v3 container round trip: {len(legacy)} -> {len(container)} bytes")
+
+    with zipfile.ZipFile(io.BytesIO(container)) as archive:
+        manifest = json.loads(archive.read(project_file.MANIFEST))
+    assert manifest["version"] == project_file.PROJECT_VERSION
+    assert [s["store"] for s in manifest["sections"]] == list(project)
+    assert "net_data_STORAGE" in manifest["eager"]
+    assert "league_table_data_STORAGE" not in manifest["eager"]
+    print("   ✅ manifest lists the sections")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        session_store.SESSION_STORE_DIR = tmp
+        for data in (container, legacy):
+            loaded = project_file.load_project(data, "session-1")
+            assert loaded["net_data_STORAGE"] == project["net_data_STORAGE"]
+            assert loaded["forest_data_STORAGE"] == project["forest_data_STORAGE"]
+            funnel = loaded["funnel_data_STORAGE"]
+            assert all(session_store.is_handle(h) for h in funnel), funnel
+            assert session_store.resolve_all(loaded) == project
+        print("   ✅ lazy stores loaded as session store handles")
+
+    try:
+        project_file.read_project(container[: len(container) // 2])
+        raise AssertionError("damaged file read")
+    except project_file.ProjectFileError:
+        print("   ✅ damaged file rejected")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running project file test...")
+    print("=" * 50)
+    test_project_file_round_trip()
+    print("\n✅ Project files work")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test of the disk result cache (tools/result_cache.py)
+
+This test performs the following steps:
+1. Points the cache at a temporary directory
+2. Stores a tuple of DataFrames and reads it back
+3. Fills the cache beyond its size bound
+4. Hashes the producing code from another working directory
+
+Expected behavior:
+- Cached values are returned equal to what was stored
+- Keys depend on every part (analysis, outcome, options)
+- The least recently used entries are evicted first
+- The code digest covers the R functions and the Python modules computing
+  the results, read from the repository wherever the server starts
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from tools import result_cache
+
+
+def test_result_cache_roundtrip_and_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        result_cache.RESULT_CACHE_DIR = tmp
+
+        frame = pd.DataFrame({"Treatment": ["A", "B"], "RR": [0.5, 1.5]})
+        key = result_cache.make_key("league_table", "digest", 0, "RR", [])
+        assert result_cache.get(key) is None
+        result_cache.put(key, (frame, frame.T))
+        cached = result_cache.get(key)
+        pd.testing.assert_frame_equal(cached[0], frame)
+        print("   ✅ round trip")
+
+        assert key != result_cache.make_key("league_table", "digest", 1, "RR", [])
+        assert key != result_cache.make_key(
+            "league_table", "digest", 0, "RR", [("backend", "python")]
+        )
+        print("   ✅ keys depend on outcome and options")
+
+        keys = [result_cache.make_key("funnel", "digest", i, "RR", []) for i in range(4)]
+        for k in keys:
+            result_cache.put(k, pd.DataFrame(np.zeros((200, 50))))
+            time.sleep(0.01)
+        result_cache.get(keys[0])  # keys[0] becomes the most recently used
+        size = os.path.getsize(os.path.join(tmp, keys[0] + result_cache.SUFFIX))
+        result_cache.evict(max_bytes=2 * size)
+        remaining = [k for k in keys if result_cache.get(k) is not None]
+        assert remaining == [keys[0], keys[3]], remaining
+        print("   ✅ least recently used entries evicted")
+
+        os.chdir(tmp)
+        try:
+            assert result_cache._code_digest() == result_cache.CODE_DIGEST
+        finally:
+            os.chdir(ROOT)
+        assert "tools/utils.py" in result_cache.CODE_SOURCES
+        print("   ✅ code digest independent of the working directory")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running result cache test...")
+    print("=" * 50)
+    test_result_cache_roundtrip_and_eviction()
+    print("\n✅ Result cache works")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test of the server-side session result store (tools/session_store.py)
+
+This test performs the following steps:
+1. Points the store at a temporary directory
+2. Externalizes a result store value (list of outcome JSON strings) and a
+   league table dict, then resolves them back
+3. Fills the store with several sessions beyond its size bound and TTL
+4. Resolves forged handles (path traversal in the session or the digest)
+
+Expected behavior:
+- The browser value only holds short handles; resolving gives the original JSON
+- Small values and legacy inline JSON pass through unchanged
+- Expired and least recently used sessions are evicted first
+- Forged handles are refused without reading any file
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from tools import session_store
+
+
+def _outcome_json(seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(size=(100, 5)), columns=list("abcde")).to_json(
+        orient="split"
+    )
+
+
+def test_session_store_handles_and_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        session_store.SESSION_STORE_DIR = tmp
+
+        forest = [_outcome_json(0), _outcome_json(1)]
+        league = {
+            "data": forest,
+            "compared_outcomes": {"indices": [0, 1], "names": ["A", "B"], "league_table": forest[0]},
+        }
+        stored = session_store.externalize("session-1", {"forest": forest, "league": league})
+        assert all(session_store.is_handle(h) for h in stored["forest"])
+        assert len(str(stored)) < len(forest[0]) / 10
+        assert stored["league"]["compared_outcomes"]["names"] == ["A", "B"]
+        assert session_store.resolve_all(stored) == {"forest": forest, "league": league}
+        assert session_store.resolve(forest[1]) == forest[1]  # legacy inline JSON
+        print("   ✅ handles resolve to the original JSON")
+
+        for i in range(2, 5):
+            session_store.externalize(f"session-{i}", [_outcome_json(i)])
+            time.sleep(0.01)
+        session_store.resolve(stored["forest"][0])  # session-1 becomes the most recently used
+        size = sum(
+            f.stat().st_size for f in os.scandir(os.path.join(tmp, "session-1"))
+        )
+        session_store.evict(max_bytes=size + 3 * len(_outcome_json(0)) // 2)
+        assert sorted(os.listdir(tmp)) == ["session-1", "session-4"], os.listdir(tmp)
+        print("   ✅ least recently used sessions evicted")
+
+        session_store.evict(ttl_hours=0)
+        assert os.listdir(tmp) == []
+        try:
+            session_store.resolve(stored["forest"][0])
+            raise AssertionError("expired handle resolved")
+        except session_store.SessionDataExpired:
+            print("   ✅ expired sessions dropped")
+
+        secret = os.path.join(tmp, "secret.json")
+        with open(secret, "w") as f:
+            f.write("{}")
+        digest = stored["forest"][0].rpartition("/")[2]
+        for forged in (
+            "session-store:session-1/../secret",
+            "session-store:session-1/../../" + os.path.basename(tmp) + "/secret",
+            "session-store:../session-1/" + digest,
+            "session-store:/" + digest,
+            "session-store:session-1/" + digest.upper(),
+            "session-store:session-1/" + digest + "/../" + digest,
+        ):
+            try:
+                session_store.resolve(forged)
+                raise AssertionError(f"forged handle resolved: {forged}")
+            except ValueError:
+                pass
+        print("   ✅ forged handles refused")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running session store test...")
+    print("=" * 50)
+    test_session_store_handles_and_eviction()
+    print("\n✅ Session store works")
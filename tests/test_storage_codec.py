@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test of the compact store encoding (tools/storage_codec.py)
+
+This test performs the following steps:
+1. Encodes a large numeric result table and a league table with a string index
+2. Decodes them back, and decodes a legacy to_json(orient="split") payload
+3. Compacts a project-file-like dict of stores
+4. Encodes a small table and one with a mixed-type column
+
+Expected behavior:
+- Parquet payloads decode to the original frame (values, dtypes and index)
+- The large table payload is smaller than its JSON
+- Legacy JSON still decodes; compact_all only re-encodes frame payloads
+- Small and mixed-type tables stay JSON
+"""
+
+import io
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from tools import storage_codec
+
+
+def _forest(rows=2000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "Treatment": rng.choice(["ADA", "ETA", "PBO", "SEC"], rows),
+            "Reference": rng.choice(["ADA", "ETA", "PBO", "SEC"], rows),
+            "RR": rng.lognormal(size=rows).round(3),
+            "CI_lower": rng.lognormal(size=rows).round(3),
+            "k": rng.integers(1, 20, rows),
+        }
+    )
+
+
+def test_storage_codec_round_trip():
+    if not storage_codec.compact_encoding_enabled():
+        print("   ⚠️ pyarrow not installed: compact encoding disabled")
+        return True
+
+    forest = _forest()
+    payload = storage_codec.encode_frame(forest)
+    assert storage_codec.is_parquet_payload(payload)
+    assert len(payload) < len(forest.to_json(orient="split")) / 2
+    pd.testing.assert_frame_equal(storage_codec.decode_frame(payload), forest)
+    print("   ✅ result table round trip, size:", len(payload))
+
+    treatments = [f"T{i}" for i in range(60)]
+    league = pd.DataFrame(
+        np.random.default_rng(1).choice(["0.85 (0.61, 1.19)", "1.20 (0.95, 1.52)", ""], (60, 60)),
+        index=pd.Index(treatments, name="Treatment"),
+        columns=treatments,
+    )
+    payload = storage_codec.encode_frame(league)
+    assert storage_codec.is_parquet_payload(payload)
+    pd.testing.assert_frame_equal(storage_codec.decode_frame(payload), league)
+    print("   ✅ league table keeps its index")
+
+    legacy = forest.to_json(orient="split")
+    pd.testing.assert_frame_equal(
+        storage_codec.decode_frame(legacy), pd.read_json(io.StringIO(legacy), orient="split")
+    )
+    assert storage_codec.to_json_payload(legacy) == legacy
+    print("   ✅ legacy JSON payload decodes")
+
+    project = {
+        "forest_data_STORAGE": [legacy, None],
+        "net_data_STORAGE": {"data": legacy, "n_classes": 3},
+        "outcome_names_STORAGE": ["PASI90", "SAE"],
+    }
+    compacted = storage_codec.compact_all(project)
+    assert storage_codec.is_parquet_payload(compacted["forest_data_STORAGE"][0])
+    assert storage_codec.is_parquet_payload(compacted["net_data_STORAGE"]["data"])
+    assert compacted["forest_data_STORAGE"][1] is None
+    assert compacted["net_data_STORAGE"]["n_classes"] == 3
+    assert compacted["outcome_names_STORAGE"] == ["PASI90", "SAE"]
+    print("   ✅ project stores compacted")
+
+    small = pd.DataFrame({"treatment": ["A", "B"], "pscore": [0.2, 0.8]})
+    assert storage_codec.encode_frame(small) == small.to_json(orient="split")
+    mixed = pd.DataFrame({"x": [1, "a", 2.5] * 500})
+    assert not storage_codec.is_parquet_payload(storage_codec.encode_frame(mixed))
+    print("   ✅ small and mixed-type tables stay JSON")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running storage codec test...")
+    print("=" * 50)
+    test_storage_codec_round_trip()
+    print("\n✅ Storage codec works")
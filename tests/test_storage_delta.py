@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test of the delta updates of the storage outputs (assets/storage.py)
+
+This test performs the following steps:
+1. Computes the delta of a store whose content did not change
+2. Changes one outcome of a list store and one key of a dict store
+3. Loads the demo project over itself and over the empty project
+
+Expected behavior:
+- Unchanged stores give no_update
+- Changed list/dict stores give a Patch holding only the changed entries
+- Stores changing type or length are sent whole
+"""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from dash import Patch, no_update
+
+from assets.storage import (
+    EMPTY_STORAGE,
+    STORAGE_KEYS,
+    store_delta,
+    store_version,
+    __load_project as load_project,
+    __storage_delta as storage_delta,
+)
+from assets.psoriasisDemo import PSORIASIS_DATA
+
+
+def _operations(patch):
+    return patch.to_plotly_json()["operations"]
+
+
+def test_store_delta():
+    forest = ["forest-1", "forest-2", "forest-3"]
+    assert store_version(list(forest)) == store_version(forest)
+    assert store_delta(forest, list(forest)) is no_update
+    print("   ✅ unchanged store not sent")
+
+    delta = store_delta(forest, ["forest-1", "forest-2b", "forest-3"])
+    assert isinstance(delta, Patch)
+    operations = _operations(delta)
+    assert [(op["location"], op["params"]["value"]) for op in operations] == [([1], "forest-2b")]
+    print("   ✅ list store patched at the changed outcome")
+
+    league = {"data": forest, "compared_outcomes": {"indices": [0, 1]}}
+    delta = store_delta(league, {"data": forest, "compared_outcomes": {"indices": [0, 2]}})
+    assert [op["location"] for op in _operations(delta)] == [["compared_outcomes"]]
+    print("   ✅ dict store patched at the changed key")
+
+    assert store_delta(forest, forest + ["forest-4"]) == forest + ["forest-4"]
+    assert store_delta(None, forest) == forest
+    print("   ✅ new shapes sent whole")
+
+    demo = load_project(None, PSORIASIS_DATA)
+    assert all(d is no_update for d in storage_delta(demo, demo))
+    reset = storage_delta(demo, load_project(demo, EMPTY_STORAGE))
+    changed = [key for key, d in zip(STORAGE_KEYS, reset) if d is not no_update]
+    assert "net_data_STORAGE" in changed and "nmastudio-version" not in changed, changed
+    print("   ✅ project loads only send the stores that differ")
+    return True
+
+
+if __name__ == "__main__":
+    print("🧪 Running storage delta test...")
+    print("=" * 50)
+    test_store_delta()
+    print("\n✅ Storage deltas work")
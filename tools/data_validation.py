@@ -0,0 +1,175 @@
+"""
+Vectorized checks of contrast-level network data (net_data_STORAGE).
+
+``validate_network_data`` runs every check of the analysis modal in one pass
+over the columns, and per outcome over the TE/seTE columns, without a Python
+call per cell. It catches the data problems that otherwise only surface as
+netmeta errors in R:
+
+    mixed_types       object columns holding both numbers and text
+    missing_columns   studlab / treat1 / treat2 / TE<i> / seTE<i> absent
+    missing_values    comparisons without TE<i> or seTE<i> (left out of outcome i)
+    nonpositive_se    seTE<i> <= 0 (zero: left out; negative: netmeta fails)
+    multiarm          studies whose comparisons are not all k(k-1)/2 pairs of
+                      their k arms: a number of comparisons failing the
+                      iswhole((1 + sqrt(8n + 1)) / 2) rule of fit_netmeta_new is
+                      left out by R (warning); any other mismatch or a
+                      duplicated pair makes netmeta fail (error)
+    disconnected      outcome networks made of several unconnected parts
+
+The report is a plain JSON-serializable dict:
+
+    {"passed": bool,                  # no issue of severity "error"
+     "issues": [{"check", "severity": "error" | "warning", "outcome": int | None,
+                 "message", "items": [column, study or treatment names]}, ...]}
+"""
+
+import numpy as np
+import pandas as pd
+from tools.graph_stats import component_labels
+from tools.meta_engine import iswhole
+
+MAX_LISTED = 10  # items named in a message
+
+
+def _issue(check, severity, message, items=(), outcome=None):
+    items = [str(item) for item in items]
+    listed = ", ".join(items[:MAX_LISTED]) + (", ..." if len(items) > MAX_LISTED else "")
+    prefix = f"Outcome {outcome + 1}: " if outcome is not None else ""
+    return {
+        "check": check,
+        "severity": severity,
+        "outcome": outcome,
+        "message": prefix + message + (f" ({listed})" if listed else ""),
+        "items": items,
+    }
+
+
+def _distinct(keys):
+    # np.unique through one sort (its hash path is slow on large int arrays)
+    keys = np.sort(keys)
+    return keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+
+
+def mixed_type_columns(df):
+    """Object columns whose non-missing values are partly numeric and partly text."""
+    mixed = []
+    for column in df.columns[df.dtypes == object]:
+        values = df[column].dropna()
+        if values.empty:
+            continue
+        numeric = pd.to_numeric(values, errors="coerce").notna().sum()
+        if 0 < numeric < len(values):
+            mixed.append(column)
+    return mixed
+
+
+def _outcome_issues(df, i):
+    TE_col, seTE_col = f"TE{i + 1}", f"seTE{i + 1}"
+    missing = [c for c in (TE_col, seTE_col) if c not in df.columns]
+    if missing:
+        return [
+            _issue("missing_columns", "error", "required columns missing", missing, i)
+        ]
+
+    issues = []
+    TE = pd.to_numeric(df[TE_col], errors="coerce")
+    seTE = pd.to_numeric(df[seTE_col], errors="coerce")
+    studies = df["studlab"]
+
+    absent = TE.isna() | seTE.isna()
+    if absent.any():
+        issues.append(_issue(
+            "missing_values", "warning",
+            f"{int(absent.sum())} comparisons without {TE_col} or {seTE_col} are left out",
+            studies[absent].unique(), i,
+        ))
+
+    negative, zero = seTE < 0, seTE == 0
+    if negative.any():
+        issues.append(_issue(
+            "nonpositive_se", "error", f"negative standard errors in {seTE_col}",
+            studies[negative].unique(), i,
+        ))
+    if zero.any():
+        issues.append(_issue(
+            "nonpositive_se", "warning",
+            f"comparisons with {seTE_col} = 0 are left out", studies[zero].unique(), i,
+        ))
+
+    # comparisons entering the analysis, with the filters of fit_netmeta_new
+    dat = df.loc[~absent & ~zero, ["studlab", "treat1", "treat2"]]
+    if dat.empty:
+        return issues + [
+            _issue("disconnected", "error", "no comparison can be analysed", outcome=i)
+        ]
+    m = len(dat)
+    codes, treatments = pd.factorize(pd.concat([dat["treat1"], dat["treat2"]]))
+    t1, t2 = codes[:m], codes[m:]
+    study, study_names = pd.factorize(dat["studlab"])
+    T, S = len(treatments), len(study_names)
+
+    # multi-arm studies: n comparisons of k arms with n = k(k-1)/2, each pair once
+    n = np.bincount(study, minlength=S)
+    arm_keys = _distinct(np.concatenate([study * T + t1, study * T + t2]))
+    k = np.bincount(arm_keys // T, minlength=S)
+    pair_keys = _distinct((study * T + np.minimum(t1, t2)) * T + np.maximum(t1, t2))
+    distinct = np.bincount(pair_keys // (T * T), minlength=S)
+    dropped = ~iswhole((1 + np.sqrt(8 * n + 1)) / 2)  # left out by fit_netmeta_new
+    inconsistent = ~dropped & ((n != k * (k - 1) // 2) | (distinct != n))
+    if dropped.any():
+        issues.append(_issue(
+            "multiarm", "warning",
+            "studies whose number of comparisons does not fit a multi-arm study "
+            "are left out",
+            study_names[dropped], i,
+        ))
+    if inconsistent.any():
+        issues.append(_issue(
+            "multiarm", "error",
+            "studies with an inconsistent set of comparisons between their arms "
+            "(each pair of arms once)",
+            study_names[inconsistent], i,
+        ))
+
+    # connectivity of the comparisons kept for the analysis
+    keep = ~dropped[study]
+    if not keep.any():
+        return issues + [
+            _issue("disconnected", "error", "no comparison can be analysed", outcome=i)
+        ]
+    used = _distinct(np.concatenate([t1[keep], t2[keep]]))
+    labels = component_labels(t1[keep], t2[keep], T)[used]
+    n_parts = len(_distinct(labels))
+    if n_parts > 1:
+        main = np.bincount(labels).argmax()
+        issues.append(_issue(
+            "disconnected", "error",
+            f"the network has {n_parts} unconnected parts; treatments not connected "
+            "to the main network",
+            treatments[used[labels != main]], i,
+        ))
+    return issues
+
+
+def validate_network_data(df, num_outcomes):
+    """Structured report of every check on net_data (see module docstring)."""
+    issues = []
+    mixed = mixed_type_columns(df)
+    if mixed:
+        issues.append(_issue(
+            "mixed_types", "warning",
+            "Some variables are a mix of numerical and string values. This can create "
+            "issues in data tables. Please use numerical (decimal sep for floats)",
+            mixed,
+        ))
+    missing = [c for c in ("studlab", "treat1", "treat2") if c not in df.columns]
+    if missing:
+        issues.append(_issue("missing_columns", "error", "required columns missing", missing))
+    else:
+        for i in range(int(num_outcomes or 1)):
+            issues += _outcome_issues(df, i)
+    return {
+        "passed": not any(issue["severity"] == "error" for issue in issues),
+        "issues": issues,
+    }
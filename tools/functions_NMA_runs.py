@@ -1,6 +1,20 @@
 from tools.utils import *
 from dash import html
 import traceback
+from tools.storage_codec import encode_frame
+from tools.data_validation import validate_network_data
+
+
+def _data_checks_paragraph(report):
+    """Status line of a validate_network_data report."""
+    if not report["issues"]:
+        return html.P("\u2713" + " All data checks passed.", style={"color": "green"})
+    # errors make netmeta fail: shown in red, warnings in orange
+    return html.P(
+        ["WARNINGS:" if report["passed"] else "ERRORS:"]
+        + sum([[html.Br(), issue["message"]] for issue in report["issues"]], []),
+        style={"color": "orange" if report["passed"] else "red"},
+    )
 
 
 def __modal_submit_checks_DATACHECKS(
@@ -8,28 +22,9 @@ def __modal_submit_checks_DATACHECKS(
 ):
     if modal_data_checks_is_open:
         try:
-            data = pd.read_json(get_net_data_json(net_data_STORAGE), orient="split")
-            passed_checks = data_checks(data, num_outcomes)
-            if all(passed_checks.values()):
-                return html.P(
-                    "\u2713" + " All data checks passed.", style={"color": "green"}
-                ), "__Para_Done__"
-            else:
-                return (
-                    html.P(
-                        ["WARNINGS:"]
-                        + sum(
-                            [
-                                [html.Br(), f"{k}"]
-                                for k, v in passed_checks.items()
-                                if not v
-                            ],
-                            [],
-                        ),
-                        style={"color": "orange"},
-                    ),
-                    "__Para_Done__",
-                )
+            data = get_net_data_frame(net_data_STORAGE)
+            report = validate_network_data(data, num_outcomes)
+            return _data_checks_paragraph(report), "__Para_Done__"
         except Exception as e:
             return html.P(
                 "\u274c" + f" Failed to load or check data: {str(e)}",
@@ -39,99 +34,6 @@ def __modal_submit_checks_DATACHECKS(
         return None, ""
 
 
-def __modal_submit_checks_NMA_new(
-    modal_data_checks_is_open, num_outcome, net_data_STORAGE, forest_data_STORAGE
-):
-    if modal_data_checks_is_open:
-        net_data = pd.read_json(get_net_data_json(net_data_STORAGE), orient="split")
-        num_outcome = int(num_outcome)
-        try:
-            user_elements_STORAGE = [[] for _ in range(num_outcome)]
-            NMA_data = [[] for _ in range(num_outcome)]
-            for i in range(num_outcome):
-                user_elements_STORAGE[i] = get_network_new(df=net_data, i=i)
-                # net_data.to_csv('db/test_net_data.csv', encoding='utf-8')
-                NMA_data[i] = run_network_meta_analysis(net_data, i)
-            forest_data_STORAGE = [df.to_json(orient="split") for df in NMA_data]
-            # user_elements_STORAGE = [df.to_json(orient='split') for df in user_elements_STORAGE]
-
-            return (
-                False,
-                "",
-                html.P(
-                    "\u2713" + " Network meta-analysis run successfully.",
-                    style={"color": "green"},
-                ),
-                "__Para_Done__",
-                forest_data_STORAGE,
-            )
-
-        except Exception as Rconsole_error_nma:
-            return (
-                True,
-                str(Rconsole_error_nma),
-                html.P(
-                    "\u274c"
-                    + " An error occurred when computing analyses in R: check your data",
-                    style={"color": "red"},
-                ),
-                "__Para_Done__",
-                forest_data_STORAGE,
-            )
-
-    else:
-        return False, "", None, "", forest_data_STORAGE
-
-
-def __modal_submit_checks_PAIRWISE_new(
-    nma_data_ts,
-    num_outcome,
-    modal_data_checks_is_open,
-    net_data_STORAGE,
-    forest_data_prws_STORAGE,
-):
-    if modal_data_checks_is_open:
-        data = pd.read_json(get_net_data_json(net_data_STORAGE), orient="split")
-        num_outcome = int(num_outcome)
-
-        try:
-            PAIRWISE_data = [[] for _ in range(num_outcome)]
-
-            for i in range(num_outcome):
-                PAIRWISE_data[i] = run_pairwise_MA(data, i)
-
-            forest_data_prws_STORAGE = [
-                df.to_json(orient="split") for df in PAIRWISE_data
-            ]
-
-            return (
-                False,
-                "",
-                html.P(
-                    "\u2713" + " Pairwise meta-analysis run successfully.",
-                    style={"color": "green"},
-                ),
-                "__Para_Done__",
-                forest_data_prws_STORAGE,
-            )
-
-        except Exception as Rconsole_error_pw:
-            return (
-                True,
-                str(Rconsole_error_pw),
-                html.P(
-                    "\u274c"
-                    + " An error occurred when computing analyses in R: check your data",
-                    style={"color": "red"},
-                ),
-                "__Para_Done__",
-                forest_data_prws_STORAGE,
-            )
-
-    else:
-        return False, "", None, "", forest_data_prws_STORAGE
-
-
 def __modal_submit_checks_LT(
     pw_data_ts,
     modal_data_checks_is_open,
@@ -147,7 +49,7 @@ def __modal_submit_checks_LT(
 ):
     """produce new league table from R"""
     if modal_data_checks_is_open:
-        data = pd.read_json(get_net_data_json(net_data_STORAGE), orient="split")
+        data = get_net_data_frame(net_data_STORAGE)
 
         try:
             LEAGUETABLE_OUTS = (
@@ -238,156 +140,53 @@ def __modal_submit_checks_LT(
         )
 
 
-def __modal_submit_checks_LT_new(
-    pw_data_ts,
-    num_outcome,
-    modal_data_checks_is_open,
-    net_data_STORAGE,
-    LEAGUETABLE_data,
-    ranking_data,
-    consistency_data,
-    net_split_data,
-    netsplit_all,
-    outcome_idx,
-    outcome_names=None,
-):
-    """produce new league table from R
-
-    Args:
-        outcome_names: List of outcome names from outcome_names_STORAGE
-    """
-    if modal_data_checks_is_open:
-        if len(outcome_idx) == 0:
-            # If outcome_idx is None, set default values
-            outcome_idx1 = 0
-            outcome_idx2 = 1
-        elif (
-            len(outcome_idx) > 0
-            and outcome_idx[0] is not None
-            and len(outcome_idx[0]) == 2
-        ):
-            # If outcome_idx exists, is non-empty, and contains two values in its first element
-            outcome_idx1 = outcome_idx[0][0]
-            outcome_idx2 = outcome_idx[0][1]
-        else:
-            outcome_idx1 = 0
-            outcome_idx2 = 0
-
-        # Ensure outcome indices are plain integers (not numpy/pandas types)
-        outcome_idx1 = int(outcome_idx1) if outcome_idx1 is not None else 0
-        outcome_idx2 = int(outcome_idx2) if outcome_idx2 is not None else 0
+def _compared_outcome_indices(outcome_idx):
+    """Outcomes of the two-outcome league table from the outcomeprimary selectors."""
+    if len(outcome_idx) == 0:
+        # If outcome_idx is None, set default values
+        outcome_idx1 = 0
+        outcome_idx2 = 1
+    elif (
+        len(outcome_idx) > 0
+        and outcome_idx[0] is not None
+        and len(outcome_idx[0]) == 2
+    ):
+        # If outcome_idx exists, is non-empty, and contains two values in its first element
+        outcome_idx1 = outcome_idx[0][0]
+        outcome_idx2 = outcome_idx[0][1]
+    else:
+        outcome_idx1 = 0
+        outcome_idx2 = 0
 
-        data = pd.read_json(get_net_data_json(net_data_STORAGE), orient="split")
-        num_outcome = int(num_outcome)
+    # Ensure outcome indices are plain integers (not numpy/pandas types)
+    outcome_idx1 = int(outcome_idx1) if outcome_idx1 is not None else 0
+    outcome_idx2 = int(outcome_idx2) if outcome_idx2 is not None else 0
+    return outcome_idx1, outcome_idx2
 
-        try:
-            LEAGUETABLE_OUTS = [[] for _ in range(num_outcome)]
-            league_table_list = [[] for _ in range(num_outcome + 1)]
-            ranking_data = [[] for _ in range(num_outcome)]
-            consistency_data = [[] for _ in range(num_outcome)]
-            net_split_data = [[] for _ in range(num_outcome)]
-            netsplit_all = [[] for _ in range(num_outcome)]
-
-            for i in range(num_outcome):
-                LEAGUETABLE_OUTS[i] = generate_league_table(data, i)
-                (
-                    league_table_list[i],
-                    ranking_data[i],
-                    consistency_data[i],
-                    net_split_data[i],
-                    netsplit_all[i],
-                ) = [f.to_json(orient="split") for f in LEAGUETABLE_OUTS[i]]
-
-            LEAGUETABLE_both = (
-                generate_league_table_both(data, outcome_idx1, outcome_idx2)
-                if outcome_idx1 != outcome_idx2
-                else pd.DataFrame()
-            )
-            # LEAGUETABLE_both.to_csv('leaguw_test.csv')
-            league_table_both_json = LEAGUETABLE_both.to_json(orient="split")
-
-            # Get compared outcome names from outcome_names_STORAGE
-            compared_outcome_names = []
-            if outcome_names and isinstance(outcome_names, list):
-                if outcome_idx1 < len(outcome_names):
-                    compared_outcome_names.append(outcome_names[outcome_idx1])
-                if outcome_idx2 < len(outcome_names) and outcome_idx1 != outcome_idx2:
-                    compared_outcome_names.append(outcome_names[outcome_idx2])
-
-            # Build league_table_data dict with data and compared_outcomes metadata
-            # The "both outcomes" league table is stored in compared_outcomes, not in data list
-            LEAGUETABLE_data = {
-                "data": league_table_list[:-1],  # Exclude the last item (both outcomes)
-                "compared_outcomes": {
-                    "indices": [outcome_idx1, outcome_idx2]
-                    if outcome_idx1 != outcome_idx2
-                    else [outcome_idx1],
-                    "names": compared_outcome_names,
-                    "league_table": league_table_both_json,
-                },
-            }
-
-            # merged_ranking_data = pd.read_json(ranking_data[0], orient='split')
-            # for i, json_path in enumerate(ranking_data[1:], start=2):
-            #     df = pd.read_json(json_path, orient='split')
-            #     # Rename the pscore column to pscorei, where i is the loop index
-            #     df = df.rename(columns={'pscore': f'pscore{i+1}'})
-            #     merged_ranking_data = pd.merge(merged_ranking_data, df, on='treatment', how='outer')
-
-            # merged_ranking_data = merged_ranking_data.rename(columns={'pscore': 'pscore1'})
-            # merged_ranking_data = merged_ranking_data.to_json(orient='split')
 
-            return (
-                False,
-                "",
-                html.P(
-                    "\u2713"
-                    + " Successfully generated league table, consistency tables, ranking data.",
-                    style={"color": "green"},
-                ),
-                "__Para_Done__",
-                LEAGUETABLE_data,
-                ranking_data,
-                consistency_data,
-                net_split_data,
-                netsplit_all,
-            )
-        except Exception as Rconsole_error_league:
-            # Convert exception to string to avoid JSON serialization issues
-            error_msg = str(Rconsole_error_league)
-            # Print full traceback for debugging
-            print(f"=== LEAGUE TABLE ERROR ===")
-            print(f"Error type: {type(Rconsole_error_league).__name__}")
-            print(f"Error message: {error_msg}")
-            traceback.print_exc()
-            print(f"=== END ERROR ===")
-            return (
-                True,
-                error_msg,
-                html.P(
-                    "\u274c"
-                    + " An error occurred when computing analyses in R: check your data",
-                    style={"color": "red"},
-                ),
-                "__Para_Done__",
-                LEAGUETABLE_data,
-                ranking_data,
-                consistency_data,
-                net_split_data,
-                netsplit_all,
-            )
-    else:
-        return (
-            False,
-            "",
-            None,
-            "",
-            LEAGUETABLE_data,
-            ranking_data,
-            consistency_data,
-            net_split_data,
-            netsplit_all,
-        )
+def _league_table_storage(
+    league_tables, league_table_both_json, outcome_idx1, outcome_idx2, outcome_names
+):
+    """league_table_data_STORAGE value: per-outcome tables and the compared outcomes."""
+    # Get compared outcome names from outcome_names_STORAGE
+    compared_outcome_names = []
+    if outcome_names and isinstance(outcome_names, list):
+        if outcome_idx1 < len(outcome_names):
+            compared_outcome_names.append(outcome_names[outcome_idx1])
+        if outcome_idx2 < len(outcome_names) and outcome_idx1 != outcome_idx2:
+            compared_outcome_names.append(outcome_names[outcome_idx2])
+
+    # The "both outcomes" league table is stored in compared_outcomes, not in data list
+    return {
+        "data": league_tables,
+        "compared_outcomes": {
+            "indices": [outcome_idx1, outcome_idx2]
+            if outcome_idx1 != outcome_idx2
+            else [outcome_idx1],
+            "names": compared_outcome_names,
+            "league_table": league_table_both_json,
+        },
+    }
 
 
 def __modal_submit_checks_FUNNEL(
@@ -395,7 +194,7 @@ def __modal_submit_checks_FUNNEL(
 ):
     if modal_data_checks_is_open:
         try:
-            data = pd.read_json(get_net_data_json(net_data_STORAGE), orient="split")
+            data = get_net_data_frame(net_data_STORAGE)
             FUNNEL_data = generate_funnel_data(data)
             FUNNEL_data = FUNNEL_data.to_json(orient="split")
 
@@ -436,43 +235,187 @@ def __modal_submit_checks_FUNNEL(
         return False, "", None, "", FUNNEL_data, FUNNEL_data2
 
 
-def __modal_submit_checks_FUNNEL_new(
-    lt_data_ts, num_outcome, modal_data_checks_is_open, net_data_STORAGE, FUNNEL_data
-):
-    if modal_data_checks_is_open:
-        num_outcome = int(num_outcome)
+## --------------------------- server-side pipeline: per-outcome subtasks + join --------------------------- ##
+# (stage key, label) in display order; the keys are used in progress reports and results
+PIPELINE_STAGES = [
+    ("checks", "Data check"),
+    ("nma", "Network meta-analysis"),
+    ("pairwise", "Pairwise meta-analysis"),
+    ("league", "League table, Consistency and Ranking"),
+    ("funnel", "Funnel plot"),
+]
+OUTCOME_STAGES = ("nma", "pairwise", "league", "funnel")
+STAGE_SUCCESS = {
+    "nma": " Network meta-analysis run successfully.",
+    "pairwise": " Pairwise meta-analysis run successfully.",
+    "league": " Successfully generated league table, consistency tables, ranking data.",
+    "funnel": " Successfully generated funnel plot data.",
+}
+
+
+def _status_message(paragraph):
+    """html.P status line -> JSON-serializable {"lines": [...], "color": ...}."""
+    children = paragraph.children
+    children = children if isinstance(children, list) else [children]
+    lines, current = [], ""
+    for child in children:
+        if isinstance(child, html.Br):
+            lines.append(current)
+            current = ""
+        else:
+            current += str(child)
+    lines.append(current)
+    return {"lines": lines, "color": (paragraph.style or {}).get("color")}
+
+
+def render_status_message(message):
+    """Inverse of _status_message, for the analysis modal."""
+    if message is None:
+        return None
+    lines = message["lines"]
+    children = sum(([html.Br(), line] for line in lines[1:]), [lines[0]])
+    return html.P(children, style={"color": message["color"]})
+
+
+def run_outcome_analyses(net_data_json, i, on_stage=None):
+    """
+    Every setup analysis of outcome i: one subtask of the fanned-out pipeline.
+
+    The stages share the netmeta fit of the outcome (fit_nma_bundle cache), so
+    the subtask fits once. A failing stage does not stop the others.
+    on_stage(stage keys finished so far) is called after each stage, for
+    progress reports.
+
+    Returns:
+        dict (JSON-serializable):
+            results: {stage key: encode_frame output, league: [lt, ranking, consistency]}
+            errors: {stage key: error message, "" when the stage succeeded}
+    """
+    data = read_storage_frame(net_data_json)
+    stages = {
+        "nma": lambda: encode_frame(run_network_meta_analysis(data, i)),
+        "pairwise": lambda: encode_frame(run_pairwise_MA(data, i)),
+        "league": lambda: [encode_frame(f) for f in generate_league_table(data, i)],
+        "funnel": lambda: encode_frame(generate_funnel_data(data, i)),
+    }
+    results, errors = {}, {}
+    for stage, compute in stages.items():
         try:
-            FUNNEL_data = [[] for _ in range(num_outcome)]
-            data = pd.read_json(get_net_data_json(net_data_STORAGE), orient="split")
+            results[stage], errors[stage] = compute(), ""
+        except Exception as Rconsole_error:
+            print(f"=== {stage.upper()} ERROR (outcome {i + 1}) ===")
+            traceback.print_exc()
+            results[stage], errors[stage] = None, str(Rconsole_error)
+        if on_stage is not None:
+            on_stage(list(results))
+    return {"results": results, "errors": errors}
 
-            for i in range(num_outcome):
-                FUNNEL_data[i] = generate_funnel_data(data, i)
 
-            FUNNEL_data = [df.to_json(orient="split") for df in FUNNEL_data]
+def run_netsplit(net_data_json, i):
+    """
+    Node-splitting tables of outcome i: a background job of its own, dispatched
+    once the setup analyses are joined (slow: one node split per comparison).
 
-            return (
-                False,
-                "",
-                html.P(
-                    "\u2713" + " Successfully generated funnel plot data.",
-                    style={"color": "green"},
-                ),
-                "__Para_Done__",
-                FUNNEL_data,
-            )
+    Returns:
+        list: [netsplit, netsplit_all] as encode_frame output
+    """
+    return [encode_frame(f) for f in generate_netsplit(read_storage_frame(net_data_json), i)]
 
-        except Exception as Rconsole_error_funnel:
-            return (
-                True,
-                str(Rconsole_error_funnel),
+
+def check_pipeline_data(net_data_json, num_outcome):
+    """
+    Data checks of the pipeline, run before any outcome subtask is dispatched.
+
+    Returns:
+        tuple: (status message, passed). passed is False when the report has
+        errors (netmeta would fail on the data) or the data cannot be read.
+    """
+    try:
+        report = validate_network_data(
+            read_storage_frame(net_data_json), int(num_outcome or 1)
+        )
+    except Exception as e:
+        paragraph = html.P(
+            "\u274c" + f" Failed to load or check data: {str(e)}",
+            style={"color": "red"},
+        )
+        return _status_message(paragraph), False
+    return _status_message(_data_checks_paragraph(report)), report["passed"]
+
+
+def assemble_pipeline_results(
+    outcome_results, num_outcome, outcome_idx=None, outcome_names=None
+):
+    """
+    Join step of the pipeline: the storage lists built from the per-outcome
+    subtask results (in outcome order). The data checks ran before the
+    subtasks were dispatched (check_pipeline_data).
+
+    Args:
+        outcome_results: run_outcome_analyses output of every outcome, in outcome order
+        num_outcome: number of outcomes
+        outcome_idx: value of the outcomeprimary selectors ([[i, j]] or [])
+        outcome_names: outcome_names_STORAGE
+
+    Returns:
+        dict (JSON-serializable):
+            stores: {store id: data} for every analysis dcc.Store
+            messages: {stage key: status message} of the OUTCOME_STAGES
+            errors: {stage key: R error message, "" when the stage succeeded}
+    """
+    num_outcome = int(num_outcome or 1)
+    messages, errors = {}, {}
+    stage_data = {}
+    for stage in OUTCOME_STAGES:
+        failed = [
+            f"Outcome {i + 1}: {result['errors'][stage]}"
+            for i, result in enumerate(outcome_results)
+            if result["errors"][stage]
+        ]
+        errors[stage] = "\n".join(failed)
+        if failed:
+            messages[stage] = _status_message(
                 html.P(
                     "\u274c"
                     + " An error occurred when computing analyses in R: check your data",
                     style={"color": "red"},
-                ),
-                "__Para_Done__",
-                FUNNEL_data,
+                )
             )
-
+            stage_data[stage] = None
+        else:
+            messages[stage] = _status_message(
+                html.P("\u2713" + STAGE_SUCCESS[stage], style={"color": "green"})
+            )
+            stage_data[stage] = [result["results"][stage] for result in outcome_results]
+
+    stores = {
+        "forest_data_STORAGE": stage_data["nma"],
+        "forest_data_prws_STORAGE": stage_data["pairwise"],
+        "funnel_data_STORAGE": stage_data["funnel"],
+    }
+    league = stage_data["league"]
+    if league is None:
+        stores.update(dict.fromkeys(
+            ["league_table_data_STORAGE", "ranking_data_STORAGE", "consistency_data_STORAGE",
+             "net_split_data_STORAGE", "net_split_ALL_data_STORAGE"]
+        ))
     else:
-        return False, "", None, "", FUNNEL_data
+        league_tables, ranking_data, consistency_data = (list(t) for t in zip(*league))
+        outcome_idx1, outcome_idx2 = _compared_outcome_indices(outcome_idx or [])
+        league_table_both_json = encode_frame(
+            league_table_both_from_storage({"data": league_tables}, outcome_idx1, outcome_idx2)
+            if outcome_idx1 != outcome_idx2
+            else pd.DataFrame()
+        )
+        stores.update(
+            league_table_data_STORAGE=_league_table_storage(
+                league_tables, league_table_both_json, outcome_idx1, outcome_idx2, outcome_names
+            ),
+            ranking_data_STORAGE=ranking_data,
+            consistency_data_STORAGE=consistency_data,
+            # node-splitting runs in the background (see __poll_netsplit)
+            net_split_data_STORAGE=[None] * num_outcome,
+            net_split_ALL_data_STORAGE=[None] * num_outcome,
+        )
+    return {"stores": stores, "messages": messages, "errors": errors}
+
@@ -1,6 +1,6 @@
 import pandas as pd
 import plotly.graph_objects as go
-from tools.utils import get_net_data_json
+from tools.utils import get_net_data_frame
 
 
 def __update_boxplot(value, edges, net_data):
@@ -9,7 +9,7 @@ def __update_boxplot(value, edges, net_data):
     )
     active, non_active = "#1B58E2", "#313539"  # '#4C5353'
     if value:
-        net_data = pd.read_json(get_net_data_json(net_data), orient="split")
+        net_data = get_net_data_frame(net_data)
         try:
             df = net_data[["treat1", "treat2", value]].copy()
         except:
@@ -153,7 +153,7 @@ def __update_boxplot(value, edges, net_data):
 def __update_scatter(value, edges, net_data):
     active, non_active = "#1B58E2", "#313539"  # '#4C5353'
     if value:
-        net_data = pd.read_json(get_net_data_json(net_data), orient="split")
+        net_data = get_net_data_frame(net_data)
         try:
             if "sample_size" in net_data.columns:
                 df = net_data[["treat1", "treat2", value, "sample_size"]].copy()
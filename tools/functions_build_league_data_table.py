@@ -7,8 +7,11 @@ from tools.utils import (
     get_net_data_json,
     get_raw_data_json,
     get_league_table_data_list,
+    get_outcome_frame,
+    read_storage_frame,
     get_league_table_outcomes,
     get_league_table_both,
+    league_table_both_from_storage,
 )
 from assets.COLORS import *
 
@@ -385,8 +388,8 @@ def __update_output_new(
     # Use helper functions to extract JSON from storage dict
     net_data_json = get_net_data_json(net_data)
     raw_data_json = get_raw_data_json(raw_data)
-    net_data = pd.read_json(net_data_json, orient="split").round(3)
-    raw_data = pd.read_json(raw_data_json, orient="split").round(3)
+    net_data = read_storage_frame(net_data_json).round(3)
+    raw_data = read_storage_frame(raw_data_json).round(3)
 
     # Set up slider values based on year column if it exists
     if "year" in net_data.columns:
@@ -456,7 +459,7 @@ def __update_output_new(
 
     # ranking_data = pd.read_json(ranking_data, orient='split')
     league_data_list = get_league_table_data_list(league_table_data)
-    leaguetable = pd.read_json(league_data_list[outcome_idx], orient="split")
+    leaguetable = read_storage_frame(league_data_list[outcome_idx])
     confidence_map = {k: n for n, k in enumerate(["low", "medium", "high"])}
     treatments = np.unique(net_data[["treat1", "treat2"]].dropna().values.flatten())
 
@@ -481,7 +484,7 @@ def __update_output_new(
 
     if toggle_cinema:
         # print(cinema_net_data)
-        cinema_net_data = pd.read_json(cinema_net_data[outcome_idx], orient="split")
+        cinema_net_data = read_storage_frame(cinema_net_data[outcome_idx])
         # cinema_net_data2 = pd.read_json(cinema_net_data2[0], orient='split')
         confidence_map = {
             k: n for n, k in enumerate(["very low", "low", "moderate", "high"])
@@ -522,8 +525,8 @@ def __update_output_new(
     if store_node and any("id" in nd for nd in store_node):
         slctd_trmnts = [nd["id"] for nd in store_node]
         if len(slctd_trmnts) > 0:
-            forest_data = pd.read_json(forest_data[outcome_idx], orient="split")
-            net_data = pd.read_json(net_storage[0], orient="split")
+            forest_data = get_outcome_frame(forest_data, outcome_idx)
+            net_data = read_storage_frame(net_storage[0])
             # forest_data_out2 =  None
             dataselectors = []
             dataselectors += [
@@ -879,7 +882,7 @@ def __update_output_bothout(
     if "reset_project.n_clicks" in triggered:
         reset_btn_triggered = True
 
-    net_data = pd.read_json(net_storage_data, orient="split").round(3)
+    net_data = read_storage_frame(net_storage_data).round(3)
 
     try:
         triggered = [tr["prop_id"] for tr in dash.callback_context.triggered]
@@ -896,7 +899,20 @@ def __update_output_bothout(
         toggle_cinema_modal = toggle_cinema
 
     league_both_json = get_league_table_both(league_table_data)
-    leaguetable = pd.read_json(league_both_json, orient="split")
+    stored_indices = list(get_league_table_outcomes(league_table_data)["indices"])
+    pair_changed = bool(outcome_idx) and stored_indices != [outcome_idx1, outcome_idx2]
+    if (
+        (league_both_json is None or pair_changed)
+        and outcome_idx1 != outcome_idx2
+        and len(get_league_table_data_list(league_table_data))
+        > max(outcome_idx1, outcome_idx2)
+    ):
+        # compared pair differs from the stored one: compose it from the per-outcome tables
+        leaguetable = league_table_both_from_storage(
+            league_table_data, outcome_idx1, outcome_idx2
+        )
+    else:
+        leaguetable = read_storage_frame(league_both_json)
     confidence_map = {k: n for n, k in enumerate(["low", "medium", "high"])}
     treatments = np.unique(net_data[["treat1", "treat2"]].dropna().values.flatten())
 
@@ -920,8 +936,8 @@ def __update_output_bothout(
     comprs_conf_lt = comprs_conf_ut = None
 
     if toggle_cinema:
-        cinema_net_data1 = pd.read_json(cinema_net_data[0], orient="split")
-        cinema_net_data2 = pd.read_json(cinema_net_data[1], orient="split")
+        cinema_net_data1 = read_storage_frame(cinema_net_data[0])
+        cinema_net_data2 = read_storage_frame(cinema_net_data[1])
         confidence_map = {
             k: n for n, k in enumerate(["very low", "low", "moderate", "high"])
         }
@@ -984,9 +1000,9 @@ def __update_output_bothout(
     if store_node and any("id" in nd for nd in store_node):
         slctd_trmnts = [nd["id"] for nd in store_node]
         if len(slctd_trmnts) > 0:
-            forest_data1 = pd.read_json(forest_data[outcome_idx1], orient="split")
-            net_data = pd.read_json(net_storage_data, orient="split")
-            forest_data_out2 = pd.read_json(forest_data[outcome_idx2], orient="split")
+            forest_data1 = get_outcome_frame(forest_data, outcome_idx1)
+            net_data = read_storage_frame(net_storage_data)
+            forest_data_out2 = get_outcome_frame(forest_data, outcome_idx2)
             dataselectors = []
             dataselectors += [
                 forest_data1.columns[1],
@@ -9,7 +9,7 @@ This module handles:
 
 import pandas as pd
 import numpy as np
-from tools.utils import parse_contents
+from tools.utils import parse_contents, read_storage_frame
 
 
 # Required columns for CINeMA CSV files
@@ -275,7 +275,7 @@ def parse_cinema_data(cinema_json, treatments=None):
             'comprs_conf_ut': Upper triangle comparisons with confidence,
         }
     """
-    cinema_df = pd.read_json(cinema_json, orient="split")
+    cinema_df = read_storage_frame(cinema_json)
     confidence_map = {
         k: n for n, k in enumerate(["very low", "low", "moderate", "high"])
     }
@@ -1,5 +1,6 @@
 import pandas as pd
 import dash
+from tools.utils import get_outcome_frame
 from assets.COLORS import *
 
 
@@ -118,11 +119,16 @@ def __generate_csv_consistency(n_nlicks, outcome_idx, consistencydata_all):
     ):
         return None
 
-    df = pd.read_json(consistencydata_all[outcome_idx], orient="split")
+    df = get_outcome_frame(consistencydata_all, outcome_idx)
 
     if button_trigger:
         if df is not None:
-            comparisons = df.comparison.str.split(":", expand=True)
+            # reindex: an empty table (failed node-splitting) splits into no columns
+            comparisons = (
+                df.comparison.astype(str)
+                .str.split(":", expand=True)
+                .reindex(columns=[0, 1], fill_value="")
+            )
             df["Comparison"] = comparisons[0] + " vs " + comparisons[1]
             df = df.loc[:, ~df.columns.str.contains("comparison")]
             df = df.sort_values(by="Comparison").reset_index()
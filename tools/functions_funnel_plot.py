@@ -1,6 +1,6 @@
 import pandas as pd, numpy as np
 import plotly.express as px
-from tools.utils import get_net_data_json
+from tools.utils import get_net_data_frame, get_outcome_frame
 
 
 def __Tap_funnelplot(node, outcome_idx, funnel_data):
@@ -20,10 +20,7 @@ def __Tap_funnelplot(node, outcome_idx, funnel_data):
     )
     if node:
         treatment = node[0]["label"]
-        funnel_data = pd.read_json(
-            funnel_data[outcome_idx if outcome_idx else 0],
-            orient="split",
-        )
+        funnel_data = get_outcome_frame(funnel_data, outcome_idx if outcome_idx else 0)
         # funnel_data_out2 = pd.read_json(funnel_data_out2, orient='split') if outcome2 else None #TODO: change when include dataselectors for var names
         # df = funnel_data_out2[funnel_data_out2.treat2 == treatment].copy() if outcome2 else funnel_data[funnel_data.treat2 == treatment].copy()
         df = funnel_data[funnel_data.treat2 == treatment].copy()
@@ -206,7 +203,7 @@ def __Tap_funnelplot_normal(edge, outcome_idx, net_data, pw_data):
 
     if edge and len(edge) == 1:
         slctd_edgs = set(e["source"] + e["target"] for e in edge)
-        net_data = pd.read_json(get_net_data_json(net_data), orient="split")
+        net_data = get_net_data_frame(net_data)
 
         df = net_data[(net_data.treat1 + net_data.treat2).isin(slctd_edgs)].copy()
         df["Comparison"] = (df["treat1"] + " vs " + df["treat2"]).astype(str)
@@ -221,7 +218,7 @@ def __Tap_funnelplot_normal(edge, outcome_idx, net_data, pw_data):
             effect_size = df.iloc[0][f"effect_size{outcome_idx}"]
             df = df.sort_values(by=f"seTE{outcome_idx}", ascending=False)
 
-            pw_data = pd.read_json(pw_data[outcome_idx - 1], orient="split")
+            pw_data = get_outcome_frame(pw_data, outcome_idx - 1)
 
             # get the unique treat1-treat2 combination from df
             t1, t2 = df.iloc[0][["treat1", "treat2"]]
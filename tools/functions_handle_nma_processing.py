@@ -1,104 +1,203 @@
-import dash
-from dash import ctx, no_update
-import dash_html_components as html
-from tools.functions_run_nma_task import run_nma_task
-from celery.result import AsyncResult
-from tools.functions_run_nma_task import celery_app
+from dash import html, no_update
 from dash.exceptions import PreventUpdate
-import redis
 
-def __handle_nma_processing__(modal_open, n_intervals, num_outcome, net_data_storage, 
-                         forest_data_storage, task_store_data):
-    ctx = dash.callback_context
-    
-    if not ctx.triggered:
-        raise PreventUpdate
-    
-    trigger_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    
-    if trigger_id == "modal_data_checks":
-        if not modal_open:
-            return False, '', None, '', None, forest_data_storage, True
-        
-        try:
-            # Start the async task
-            task = run_nma_task.delay(net_data_storage[0], num_outcome)
-            return (
-                False,
-                '',
-                html.P("Starting network meta-analysis...", style={"color": "blue"}),
-                '',
-                {'task_id': task.id, 'status': ''},
-                forest_data_storage,
-                False  # Enable polling
-            )
-        except Exception as e:
-            return True, str(e), None, '',None, forest_data_storage, True
-    
-    elif trigger_id == "nma-task-poller":
-        if not task_store_data or 'task_id' not in task_store_data:
-            raise PreventUpdate
-            
-        task_id = task_store_data['task_id']
-        task = AsyncResult(task_id, app=celery_app)
-        if task.state == 'PENDING':
-            return (
-                no_update,
-                no_update,
-                html.P("Task queued, waiting to start...", style={"color": "gray"}),
-                no_update,
-                no_update,
-                no_update,
-                False
-            )
-        
-        elif task.state == 'STARTED':
-            progress_info = task.info
-            progress = progress_info.get('current', 0)
-            total = progress_info.get('total', 1)
-            
-            return (
-                no_update,
-                no_update,
-                html.Div([
-                    html.P(f"Processing outcome {progress} of {total}"),
-                ]),
-                no_update,
-                {'task_id': task_id, 'status': 'PROGRESS'},
-                no_update,
-                False
-            )
-        
-        elif task.state == 'SUCCESS':
-            return (
-                False,
-                '',
-                html.Div([
-                    html.P("✓ Analysis completed successfully!", 
-                          style={"color": "green", "fontWeight": "bold"})
-                ]),
-                '__Para_Done__',
-                {'task_id': task_id, 'status': 'COMPLETED'},
-                task.result.get('result'),
-                True
-            )
-        
-        elif task.state == 'FAILURE':
-            error_info = task.info
-            error_msg = error_info.get('exc_message', 'Unknown error occurred')
-            return (
-                True,
-                error_msg,
-                html.Div([
-                    html.P("❌ Analysis failed", 
-                          style={"color": "red", "fontWeight": "bold"}),
-                    html.P("Please check your data and try again.", 
-                          style={"color": "gray", "fontSize": "0.9em"})
-                ]),
-                '',
-                {'task_id': task_id, 'status': 'FAILED'},
-                forest_data_storage,
-                True
+from tools.functions_run_nma_task import (
+    start_analysis,
+    start_netsplit,
+    get_task_result,
+    get_analysis_progress,
+)
+from tools.functions_NMA_runs import render_status_message, OUTCOME_STAGES
+from tools import session_store
+from assets.storage import store_delta
+from tools.utils import get_net_data_json
+
+# stage key -> (alert key, error key, "done" marker key, modal message key)
+STAGE_OUTPUTS = {
+    "checks": (None, None, "checks_done", "checks_msg"),
+    "nma": ("nma_alert", "nma_error", "nma_done", "nma_msg"),
+    "pairwise": ("pw_alert", "pw_error", "pw_done", "pw_msg"),
+    "league": ("lt_alert", "lt_error", "lt_done", "lt_msg"),
+    "funnel": ("funnel_alert", "funnel_error", "funnel_done", "funnel_msg"),
+}
+STORE_IDS = [
+    "forest_data_STORAGE",
+    "forest_data_prws_STORAGE",
+    "league_table_data_STORAGE",
+    "ranking_data_STORAGE",
+    "consistency_data_STORAGE",
+    "net_split_data_STORAGE",
+    "net_split_ALL_data_STORAGE",
+    "funnel_data_STORAGE",
+]
+OUTPUT_KEYS = (
+    [key for keys in STAGE_OUTPUTS.values() for key in keys if key]
+    + ["task", "completed", "poller_disabled"]
+)
+DONE_KEYS = [done_key for _, _, done_key, _ in STAGE_OUTPUTS.values()]
+
+
+def _outputs(**values):
+    """Every output of the setup analysis callback, no_update unless given."""
+    outputs = dict.fromkeys(OUTPUT_KEYS, no_update)
+    outputs.update(values)
+    return outputs
+
+
+def _stage_messages(messages, statuses=None):
+    """Modal children of every stage: finished ones get their message, running ones their status."""
+    statuses = statuses or {}
+    children = {}
+    for stage, (_, _, _, msg_key) in STAGE_OUTPUTS.items():
+        if stage in messages:
+            children[msg_key] = render_status_message(messages[stage])
+        elif stage in statuses:
+            children[msg_key] = html.P(statuses[stage], style={"color": "gray"})
+        else:
+            children[msg_key] = None
+    return children
+
+
+def _progress_statuses(progress, n_outcomes):
+    """Status of every outcome stage from get_analysis_progress."""
+    if all(progress[stage] == n_outcomes for stage in OUTCOME_STAGES):
+        return {stage: "Assembling results..." for stage in OUTCOME_STAGES}
+    return {
+        stage: f"{progress[stage]} of {n_outcomes} outcomes done..."
+        for stage in OUTCOME_STAGES
+    }
+
+
+def __start_nma_processing__(modal_open, num_outcome, net_data_storage,
+                             outcome_idx, outcome_names, consts):
+    """
+    Start the per-outcome analysis subtasks when the modal opens. The data is
+    kept server-side with the task (for node-splitting once it is joined), so
+    the poller only carries task ids.
+    """
+    if not modal_open:
+        return _outputs(poller_disabled=True)
+
+    reset = dict.fromkeys(DONE_KEYS, '')
+    try:
+        net_data_json = get_net_data_json(net_data_storage)
+        # One subtask per outcome, joined once all of them are done
+        task = start_analysis(net_data_json, num_outcome, outcome_idx, outcome_names)
+        if task['task_id'] is None:
+            # the data checks found errors: nothing was sent to R
+            return _outputs(
+                **reset,
+                **_stage_messages({'checks': task['checks']}),
+                checks_done='__Para_Done__',
+                task=None,
+                poller_disabled=True,
             )
-    
-    return no_update, no_update, no_update, no_update, no_update, no_update, True
\ No newline at end of file
+        task['net_data'] = session_store.put((consts or {}).get('session_ID'), net_data_json)
+        return _outputs(
+            **reset,
+            **_stage_messages({'checks': task['checks']},
+                              {'nma': "Starting analysis..."}),
+            task={**task, 'status': ''},
+            poller_disabled=False,  # Enable polling
+        )
+    except Exception as e:
+        return _outputs(nma_alert=True, nma_error=str(e), task=None, poller_disabled=True)
+
+
+def _start_netsplit(task_store_data, num_outcome):
+    """Node-splitting jobs of the analysed data (their ids), dispatched once the analyses are joined."""
+    try:
+        net_data_json = session_store.get(task_store_data['net_data'])
+    except (KeyError, session_store.SessionDataExpired):
+        return []  # the results page shows empty node-splitting tables
+    return start_netsplit(net_data_json, num_outcome)
+
+
+def __poll_nma_processing__(n_intervals, num_outcome, task_store_data):
+    """
+    Poll the analysis subtasks. Once they are joined, the task id goes to
+    "completed", which lets __apply_nma_results__ fill the stores.
+    """
+    if not task_store_data or not task_store_data.get('task_id'):
+        raise PreventUpdate
+
+    task_id = task_store_data['task_id']
+    task = get_task_result(task_id)
+    if task.state in ('PENDING', 'STARTED', 'PROGRESS'):
+        subtasks = task_store_data.get('subtasks', [])
+        progress = get_analysis_progress(task_id, subtasks)
+        return _outputs(
+            **_stage_messages({'checks': task_store_data.get('checks')},
+                              _progress_statuses(progress, len(subtasks))),
+            task={**task_store_data, 'status': 'PROGRESS'},
+            poller_disabled=False,
+        )
+
+    elif task.state == 'SUCCESS':
+        result = task.result.get('result')
+        outputs = _outputs(
+            **_stage_messages({'checks': task_store_data.get('checks'), **result['messages']}),
+            task={**task_store_data, 'status': 'COMPLETED'},
+            completed={
+                'task_id': task_id,
+                'netsplit': _start_netsplit(task_store_data, num_outcome),
+            },
+            poller_disabled=True,
+        )
+        for stage, (alert_key, error_key, _, _) in STAGE_OUTPUTS.items():
+            if alert_key:
+                outputs[alert_key] = bool(result['errors'][stage])
+                outputs[error_key] = result['errors'][stage]
+        return outputs
+
+    elif task.state == 'FAILURE':
+        error_info = task.info
+        error_msg = (
+            error_info.get('exc_message', 'Unknown error occurred')
+            if isinstance(error_info, dict) else str(error_info)
+        )
+        return _outputs(
+            nma_alert=True,
+            nma_error=error_msg,
+            nma_msg=html.Div([
+                html.P("❌ Analysis failed",
+                       style={"color": "red", "fontWeight": "bold"}),
+                html.P("Please check your data and try again.",
+                       style={"color": "gray", "fontSize": "0.9em"})
+            ]),
+            task={**task_store_data, 'status': 'FAILED'},
+            poller_disabled=True,
+        )
+
+    return _outputs(poller_disabled=True)
+
+
+def __apply_nma_results__(completed, consts, previous_stores):
+    """
+    Stores of a joined analysis, then the "done" markers enabling Submit. The
+    ids of the node-splitting jobs go to netsplit-task-store, for the results
+    page to poll.
+
+    Runs once per analysis, when the poller sets "completed": previous_stores
+    (current values of STORE_IDS) is only sent from the browser then, not on
+    every poll. Results stay on the server, the stores get their handles;
+    handles are content addressed, so a rerun only sends the outcomes that
+    changed.
+    """
+    if not completed or 'task_id' not in completed:
+        raise PreventUpdate
+    result = get_task_result(completed['task_id']).result['result']
+    stores = session_store.externalize(
+        (consts or {}).get('session_ID'),
+        {store_id: result['stores'][store_id] for store_id in STORE_IDS},
+    )
+    if previous_stores is not None:
+        stores = {
+            store_id: store_delta(old, stores[store_id])
+            for store_id, old in zip(STORE_IDS, previous_stores)
+        }
+    return {
+        **stores,
+        **dict.fromkeys(DONE_KEYS, '__Para_Done__'),
+        'netsplit_tasks': completed.get('netsplit', []),
+    }
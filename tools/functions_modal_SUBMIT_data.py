@@ -3,7 +3,8 @@ import os
 import pandas as pd
 import numpy as np
 from assets.storage import EMPTY_STORAGE
-from tools.utils import adjust_data, parse_contents
+from tools.utils import adjust_data, parse_contents, read_storage_frame
+from tools.storage_codec import encode_frame
 from collections import OrderedDict
 from tools.utils import get_network_new
 import secrets
@@ -524,7 +525,7 @@ def __data_modal(
         try:
             data = adjust_data(data_user, search_value_format, search_value_outcome2)
 
-            net_data_STORAGE = {"data": data.to_json(orient="split")}
+            net_data_STORAGE = {"data": encode_frame(data)}
         # except:
         # net_data_STORAGE = {}
         # raise ValueError('Data conversion failed')
@@ -664,7 +665,7 @@ def __data_trans(
 
         try:
             data_user = parse_contents(contents, filename)
-            raw_data_STORAGE = {"data": data_user.to_json(orient="split")}
+            raw_data_STORAGE = {"data": encode_frame(data_user)}
 
         except:
             raise ValueError(
@@ -849,7 +850,7 @@ def __data_trans(
 
         try:
             data = adjust_data(data_user, search_value_format, number_outcomes)
-            net_data_STORAGE = {"data": data.to_json(orient="split")}
+            net_data_STORAGE = {"data": encode_frame(data)}
             # data.to_csv('db/update_dat.csv', encoding='utf-8')
 
         # except:
@@ -1003,7 +1004,7 @@ def __modal_SUBMIT_button_new(
                                 and (type(df_i) != list)
                                 and (type(df_i) != dict)
                             ):
-                                df_i = pd.read_json(df_i, orient="split")
+                                df_i = read_storage_frame(df_i)
                                 df_i.to_csv(f"{path}/{dfname_i}.csv", encoding="utf-8")
                             else:
                                 df_i = pd.DataFrame(dict())
@@ -1,5 +1,17 @@
 import pandas as pd
 from dash import no_update
+from dash.exceptions import PreventUpdate
+
+from tools import session_store
+from tools.storage_codec import encode_frame
+from assets.storage import store_delta
+from tools.utils import get_outcome_frame
+from tools.functions_run_nma_task import get_task_result
+
+NETSPLIT_COMPUTING = "Computing node-splitting…"
+# columns of the netsplit / netsplit_all tables of netsplit_new (R)
+NETSPLIT_COLUMNS = ["comparison", "direct", "indirect", "p-value"]
+NETSPLIT_ALL_COLUMNS = ["comparison", "k", "direct", "nma", "indirect", "p-value"]
 
 
 def __netsplit(edges, outcome_idx, net_split_data, consistency_data):
@@ -7,11 +19,21 @@ def __netsplit(edges, outcome_idx, net_split_data, consistency_data):
     if outcome_idx is None or not net_split_data or not consistency_data:
         return no_update
 
-    df = pd.read_json(net_split_data[outcome_idx], orient="split")
-    consistency_data = pd.read_json(consistency_data[0], orient="split")
+    if net_split_data[outcome_idx] is None:
+        # node-splitting still running in the background (see __poll_netsplit)
+        df = pd.DataFrame({"Comparison": [NETSPLIT_COMPUTING]})
+        edges = None
+    else:
+        df = get_outcome_frame(net_split_data, outcome_idx)
+    consistency_data = get_outcome_frame(consistency_data, 0)
 
-    if df is not None:
-        comparisons = df.comparison.str.split(":", expand=True)
+    if df is not None and "comparison" in df.columns:
+        # reindex: an empty table (failed node-splitting) splits into no columns
+        comparisons = (
+            df.comparison.astype(str)
+            .str.split(":", expand=True)
+            .reindex(columns=[0, 1], fill_value="")
+        )
         df["Comparison"] = comparisons[0] + " vs " + comparisons[1]
         df = df.loc[:, ~df.columns.str.contains("comparison")]
         df = df.sort_values(by="Comparison").reset_index()
@@ -42,3 +64,61 @@ def __netsplit(edges, outcome_idx, net_split_data, consistency_data):
     _out_consistency_table = [data_consistency, consistency_tbl_cols]
 
     return _out_net_split_table + _out_consistency_table
+
+
+def __netsplit_poller_disabled(net_split_data):
+    """Poll only while some outcome is still waiting for its node-splitting tables."""
+    return not net_split_data or all(entry is not None for entry in net_split_data)
+
+
+def _netsplit_tables(netsplit_tasks, i):
+    """
+    [netsplit, netsplit_all] payloads of outcome i from its node-splitting job
+    (see start_netsplit), None while the job runs. A failed job, or an outcome
+    without a job (e.g. a project saved before node-splitting finished), gets
+    empty tables: the consistency tab stays usable rather than polling forever.
+    """
+    netsplit_tasks = netsplit_tasks or []
+    task_id = netsplit_tasks[i] if i < len(netsplit_tasks) else None
+    if task_id is not None:
+        task = get_task_result(task_id)
+        if not task.ready():
+            return None
+        if task.successful():
+            return task.result
+        print(f"=== NETSPLIT ERROR (outcome {i + 1}) ===\n{task.info}")
+    return [
+        encode_frame(pd.DataFrame(columns=NETSPLIT_COLUMNS)),
+        encode_frame(pd.DataFrame(columns=NETSPLIT_ALL_COLUMNS)),
+    ]
+
+
+def __poll_netsplit(n_intervals, net_split_data, netsplit_all, netsplit_tasks, consts=None):
+    """
+    Fill the node-splitting stores as the background jobs finish (as session
+    store handles). Only the job ids are sent by the browser, not the data.
+    """
+    if __netsplit_poller_disabled(net_split_data):
+        raise PreventUpdate
+
+    previous = net_split_data, netsplit_all
+    net_split_data = list(net_split_data)
+    netsplit_all = list(netsplit_all or [])
+    netsplit_all += [None] * (len(net_split_data) - len(netsplit_all))
+
+    updated = False
+    for i, entry in enumerate(net_split_data):
+        if entry is not None:
+            continue
+        tables = _netsplit_tables(netsplit_tasks, i)
+        if tables is None:
+            continue
+        net_split_data[i], netsplit_all[i] = session_store.externalize(
+            (consts or {}).get("session_ID"), list(tables)
+        )
+        updated = True
+
+    if not updated:
+        raise PreventUpdate
+    # only the outcomes that just finished are sent
+    return store_delta(previous[0], net_split_data), store_delta(previous[1], netsplit_all)
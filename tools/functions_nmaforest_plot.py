@@ -1,6 +1,6 @@
 import numpy as np, pandas as pd
 import plotly.express as px, plotly.graph_objects as go
-from tools.utils import get_net_data_json
+from tools.utils import get_net_data_frame, get_outcome_frame
 
 
 def __TapNodeData_fig(
@@ -50,8 +50,8 @@ def __TapNodeData_fig(
 
         # Try to parse the forest data, handle invalid JSON gracefully
         try:
-            forest_data_df = pd.read_json(forest_data[i], orient="split")
-            pw_forest_data_df = pd.read_json(pw_forest_data[i], orient="split")
+            forest_data_df = get_outcome_frame(forest_data, i)
+            pw_forest_data_df = get_outcome_frame(pw_forest_data, i)
         except (ValueError, TypeError, KeyError) as e:
             print(f"[ERROR] Failed to parse forest data: {e}")
             fig = go.Figure()
@@ -104,7 +104,7 @@ def __TapNodeData_fig(
 
         # Guard: Safe access to net_data and outcome direction
         try:
-            net_data = pd.read_json(get_net_data_json(net_storage), orient="split")
+            net_data = get_net_data_frame(net_storage)
             outcome_col = f"outcome{i + 1}_direction"
             if outcome_col in net_data.columns and len(net_data) > 1:
                 outcome_direction_data = net_data[outcome_col].iloc[1]
@@ -575,8 +575,8 @@ def __TapNodeData_fig_bidim(
 
         # Try to parse forest data with error handling
         try:
-            forest_data = pd.read_json(forest_data_store[out_idx1], orient="split")
-            forest_data_out2 = pd.read_json(forest_data_store[out_idx2], orient="split")
+            forest_data = get_outcome_frame(forest_data_store, out_idx1)
+            forest_data_out2 = get_outcome_frame(forest_data_store, out_idx2)
         except (ValueError, TypeError, KeyError) as e:
             print(f"[ERROR] Failed to parse forest data in bidim: {e}")
             fig = go.Figure()
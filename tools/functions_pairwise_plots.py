@@ -1,7 +1,7 @@
 import numpy as np, pandas as pd
 import plotly.express as px, plotly.graph_objects as go
 from pandas.api.types import is_numeric_dtype
-from tools.utils import get_net_data_json
+from tools.utils import get_net_data_json, get_outcome_frame, read_storage_frame
 
 
 def __update_forest_pairwise(
@@ -37,7 +37,7 @@ def __update_forest_pairwise(
 
         # Try to parse forest data with error handling
         try:
-            df = pd.read_json(forest_data_prws[outcome_idx], orient="split")
+            df = get_outcome_frame(forest_data_prws, outcome_idx)
             df = df.reset_index(drop=True)
         except (ValueError, TypeError, KeyError) as e:
             print(f"[ERROR] Failed to parse pairwise forest data: {e}")
@@ -51,11 +51,10 @@ def __update_forest_pairwise(
 
         # Try to get outcome direction with error handling
         try:
-            net_data = pd.read_json(
+            net_data = read_storage_frame(
                 net_storage[0]
                 if isinstance(net_storage, list)
-                else get_net_data_json(net_storage),
-                orient="split",
+                else get_net_data_json(net_storage)
             )
             outcome_col = f"outcome{outcome_idx + 1}_direction"
             if outcome_col in net_data.columns and len(net_data) > 1:
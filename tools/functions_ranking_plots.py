@@ -13,9 +13,8 @@ except (ImportError, TypeError) as e:
     print(f"Warning: sklearn not available: {e}")
 
 from collections import Counter
-from io import StringIO
 from functools import lru_cache
-from tools.utils import get_net_data_json
+from tools.utils import get_net_data_frame, get_outcome_frame
 
 
 
@@ -42,10 +41,10 @@ def __ranking_plot(ranking_data, out_number, out_idx1, options, out_idx2, net_da
         return empty_fig, empty_fig
 
     try:
-        df = pd.read_json(StringIO(ranking_data[0]), orient="split")
+        df = get_outcome_frame(ranking_data, 0)
         # merged_ranking_data = df
-        for i, json_path in enumerate(ranking_data[1:], start=2):
-            df2 = pd.read_json(StringIO(json_path), orient="split")
+        for i in range(2, len(ranking_data) + 1):
+            df2 = get_outcome_frame(ranking_data, i - 1)
             # Rename the pscore column to pscorei, where i is the loop index
             df2 = df2.rename(columns={"pscore": f"pscore{i}"})
             df = pd.merge(df, df2, on="treatment", how="outer")
@@ -61,9 +60,7 @@ def __ranking_plot(ranking_data, out_number, out_idx1, options, out_idx2, net_da
         else:
             outcomes = tuple(f"Outcome {i + 1}" for i in range(out_number))
 
-        net_storage = pd.read_json(
-            StringIO(get_net_data_json(net_data)), orient="split"
-        )
+        net_storage = get_net_data_frame(net_data)
 
         df1 = df.copy(deep=True)
 
@@ -213,9 +210,7 @@ def __ranking_scatter(
         out_idx2: Index of outcome 2 (0-based)
         outcomes: Tuple of (label1, label2) for axis labels
     """
-    net_data = pd.read_json(
-        StringIO(get_net_data_json(net_data_storage)), orient="split"
-    )
+    net_data = get_net_data_frame(net_data_storage)
 
     if out_idx1 != out_idx2:
         df = df.dropna()
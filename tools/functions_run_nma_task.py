@@ -1,55 +1,131 @@
-from celery import Celery
 import os
-import pandas as pd
-from tools.utils import get_network_new, run_network_meta_analysis
-import json
 
-from dotenv import load_dotenv
+from tools import job_backend
+from tools.functions_NMA_runs import (
+    OUTCOME_STAGES,
+    run_outcome_analyses,
+    run_netsplit,
+    assemble_pipeline_results,
+    check_pipeline_data,
+)
 
-load_dotenv()  # loads values from .env if not set
+try:
+    from dotenv import load_dotenv
 
-redis_url = os.environ['REDIS_URL']
-celery_app = Celery('tasks', broker=redis_url, backend=redis_url)
+    load_dotenv()  # loads values from .env if not set
+except ImportError:
+    pass
+
+redis_url = os.environ.get('REDIS_URL')
+
+
+def _run_outcome(self, net_data_json, i):
+    """Subtask: every analysis of one outcome, publishing the stages it finished."""
+    return run_outcome_analyses(
+        net_data_json, i,
+        on_stage=lambda done: self.update_state(state='PROGRESS', meta={'stages_done': done}),
+    )
+
+
+def _join_outcomes(self, outcome_results, num_outcome, outcome_idx=None, outcome_names=None):
+    """Join step: storage lists in outcome order, once every outcome subtask is done."""
+    result = assemble_pipeline_results(outcome_results, num_outcome, outcome_idx, outcome_names)
+    return {'status': 'SUCCESS', 'result': result}
+
+
+def _run_netsplit(self, net_data_json, i):
+    """Background job: node-splitting tables of one outcome."""
+    return run_netsplit(net_data_json, i)
+
+
+if redis_url:
+    from celery import Celery, chord
+    from celery.result import AsyncResult
+
+    celery_app = Celery('tasks', broker=redis_url, backend=redis_url)
+    celery_app.conf.update(
+        result_backend=redis_url,
+        task_track_started=True,
+        task_serializer='json',
+        result_serializer='json',
+        accept_content=['json'],
+        broker_connection_retry_on_startup=True,
+        worker_prefetch_multiplier=1,  # outcome subtasks are long: spread them over the workers
+    )
+    run_outcome_task = celery_app.task(bind=True, name='run_outcome_task')(_run_outcome)
+    join_outcomes_task = celery_app.task(bind=True, name='join_outcomes_task')(_join_outcomes)
+    netsplit_task = celery_app.task(bind=True, name='netsplit_task')(_run_netsplit)
+else:
+    # No broker: jobs run on the local process pool, state kept in SQLite
+    from tools.job_backend import chord
+
+    celery_app = None
+    run_outcome_task = job_backend.task(_run_outcome, name='run_outcome_task')
+    join_outcomes_task = job_backend.task(_join_outcomes, name='join_outcomes_task')
+    netsplit_task = job_backend.task(_run_netsplit, name='netsplit_task')
+
+
+def get_task_result(task_id):
+    """Result handle of a job, whichever backend started it."""
+    if celery_app is not None:
+        return AsyncResult(task_id, app=celery_app)
+    return job_backend.AsyncResult(task_id)
+
+
+def start_analysis(net_data_json, num_outcome, outcome_idx=None, outcome_names=None):
+    """
+    Check the data, then fan the setup analyses out as one subtask per outcome,
+    joined by a chord. Data with errors is not sent to R: no task is started.
+
+    Returns:
+        dict: {'task_id': id of the join task (None when the checks failed),
+               'subtasks': ids of the outcome subtasks,
+               'checks': status message of the data checks}
+    """
+    num_outcome = int(num_outcome or 1)
+    checks, passed = check_pipeline_data(net_data_json, num_outcome)
+    if not passed:
+        return {'task_id': None, 'subtasks': [], 'checks': checks}
+    header = [run_outcome_task.s(net_data_json, i) for i in range(num_outcome)]
+    body = join_outcomes_task.s(num_outcome, outcome_idx, outcome_names)
+    result = chord(header)(body)
+    return {
+        'task_id': result.id,
+        'subtasks': [sub.id for sub in result.parent.results],
+        'checks': checks,
+    }
+
+
+def start_netsplit(net_data_json, num_outcome):
+    """
+    Dispatch the node-splitting of every outcome. Setup does not wait for it:
+    the results page polls the jobs by id (see __poll_netsplit).
+
+    Returns:
+        list: job ids, in outcome order
+    """
+    return [netsplit_task.delay(net_data_json, i).id for i in range(int(num_outcome or 1))]
+
+
+def _stages_done(subtask):
+    if subtask.ready():
+        return OUTCOME_STAGES
+    if subtask.state == 'PROGRESS' and isinstance(subtask.info, dict):
+        return subtask.info.get('stages_done', ())
+    return ()
 
-celery_app.conf.update(
-    task_track_started=True,
-    task_serializer='json',
-    result_serializer='json',
-    accept_content=['json'],
-    result_backend=redis_url,
-    broker_connection_retry_on_startup=True
-)
 
-@celery_app.task(bind=True)
-def run_nma_task(self, net_data_json, num_outcome):
-    try:
-        net_data = pd.read_json(net_data_json, orient='split')
-        results = []
-        
-        for i in range(int(num_outcome)):
-            # Explicit state update
-            self.update_state(
-                state='STARTED',
-                meta={
-                    'current': i + 1,
-                    'total': num_outcome,
-                    'status': f'Processing outcome {i+1}/{num_outcome}'
-                }
-            )
-            
-            # Process data
-            _ = get_network_new(df=net_data, i=i)
-            nma_result = run_network_meta_analysis(net_data, i)
-            results.append(nma_result.to_json(orient='split'))
-        
-        return {'status': 'SUCCESS', 'result': results}
-    
-    except Exception as e:
-        self.update_state(
-            state='FAILURE',
-            meta={
-                'exc_type': type(e).__name__,
-                'exc_message': str(e)
-            }
-        )
-        raise
\ No newline at end of file
+def get_analysis_progress(task_id, subtask_ids):
+    """
+    {stage key: number of outcome subtasks past that stage} for every stage
+    of OUTCOME_STAGES (a finished subtask, even failed, is past all of them).
+    On the local backend, this poll also starts the join once every subtask
+    is done (see job_backend.join_chord).
+    """
+    if celery_app is None:
+        job_backend.join_chord(task_id)
+    progress = dict.fromkeys(OUTCOME_STAGES, 0)
+    for subtask_id in subtask_ids:
+        for stage in _stages_done(get_task_result(subtask_id)):
+            progress[stage] += 1
+    return progress
@@ -0,0 +1,96 @@
+"""
+Topology of a treatment network, on the sparse adjacency matrix of a
+NetworkSummary (tools/network_summary.py).
+
+``network_statistics`` is O(edges) and returns a plain JSON-serializable dict:
+
+    n_studies, n_multiarm     studies, and studies with more than two arms
+    n_treatments              nodes
+    n_direct                  pairs of treatments compared in a study (edges)
+    n_indirect                pairs of treatments never compared directly
+    density                   n_direct / all pairs of treatments
+    components                treatment names of each connected part, largest
+                              first; more than one: netmeta cannot fit the network
+    degree                    {treatment: number of treatments it is compared with}
+
+Closeness needs one breadth-first search per treatment (O(treatments x
+edges)): it is computed on demand by ``network_closeness``, not with the
+statistics.
+"""
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components, shortest_path
+
+
+def adjacency(source, target, n_nodes, weights=None):
+    """Symmetric sparse adjacency matrix (CSR) of the undirected edges source-target."""
+    weights = np.ones(len(source)) if weights is None else np.asarray(weights, dtype=float)
+    matrix = coo_matrix(
+        (np.concatenate([weights, weights]),
+         (np.concatenate([source, target]), np.concatenate([target, source]))),
+        shape=(n_nodes, n_nodes),
+    )
+    return matrix.tocsr()
+
+
+def component_labels(source, target, n_nodes):
+    """Connected part of each node of the undirected graph with edges source-target."""
+    if not n_nodes:
+        return np.zeros(0, dtype=int)
+    _, labels = connected_components(
+        adjacency(source, target, n_nodes), directed=False
+    )
+    return labels
+
+
+def closeness_centrality(matrix):
+    """Closeness of every node of an unweighted graph, scaled by the share of nodes it reaches."""
+    n_nodes = matrix.shape[0]
+    if n_nodes < 2:
+        return np.zeros(n_nodes)
+    distances = shortest_path(matrix, directed=False, unweighted=True)
+    reachable = np.isfinite(distances) & (distances > 0)
+    reached = reachable.sum(axis=1)
+    total = np.where(reachable, distances, 0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        closeness = np.where(total > 0, reached / total * reached / (n_nodes - 1), 0.0)
+    return closeness
+
+
+def network_statistics(summary):
+    """Topology statistics of the network of a NetworkSummary (see module docstring)."""
+    names = summary.treatments.tolist()
+    T = len(names)
+    matrix = adjacency(summary.source, summary.target, T)
+    degree = np.diff(matrix.indptr)
+    labels = component_labels(summary.source, summary.target, T)
+    parts = np.bincount(labels) if T else np.zeros(0, dtype=int)
+    components = [
+        [names[k] for k in np.flatnonzero(labels == label)]
+        for label in np.argsort(-parts, kind="stable")
+    ]
+
+    arms = summary.study_arms if summary.study_arms is not None else np.zeros(0, dtype=int)
+    n_pairs = T * (T - 1) // 2
+    n_direct = len(summary.count)
+    return {
+        "n_studies": int(len(arms)),
+        "n_multiarm": int((arms > 2).sum()),
+        "n_treatments": T,
+        "n_direct": n_direct,
+        "n_indirect": n_pairs - n_direct,
+        "density": n_direct / n_pairs if n_pairs else 0.0,
+        "components": components,
+        "degree": dict(zip(names, degree.tolist())),
+    }
+
+
+def network_closeness(summary):
+    """
+    {treatment: Wasserman-Faust closeness} of the network of a NetworkSummary
+    (parts of a disconnected network count as unreachable).
+    """
+    names = summary.treatments.tolist()
+    matrix = adjacency(summary.source, summary.target, len(names))
+    return dict(zip(names, closeness_centrality(matrix).tolist()))
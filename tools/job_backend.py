@@ -0,0 +1,372 @@
+"""
+Local job backend: background analysis jobs without a message broker.
+
+Used by ``tools/functions_run_nma_task.py`` when REDIS_URL is not set. Jobs
+run on a pool of worker processes and their state lives in a SQLite file,
+so any web worker of the same box can poll a job started by another one.
+The interface mirrors the part of Celery the app uses:
+
+    task = job_backend.task(func)         # like @celery_app.task(bind=True)
+    result = task.delay(*args)            # result.id
+    job_backend.AsyncResult(result.id)    # .state, .info, .result
+    job_backend.chord([task.s(a) for a in items])(join.s(b))
+                                          # parallel jobs, then join(results, b)
+    job_backend.join_chord(result.id)     # from the poller: start the join once
+                                          # the parallel jobs are done
+
+``func`` receives a context as first argument whose ``update_state(state,
+meta)`` publishes progress, exactly like a bound Celery task.
+
+A pending chord join is a row of the job database, not a thread of the web
+process that started it: whichever web worker polls the chord next starts
+the join, so it still runs after that process restarted.
+
+Configuration (environment):
+    JOB_DB: SQLite file holding job states (default: ./__jobs/jobs.sqlite3)
+    JOB_WORKERS: number of job processes (default: 2, at least 1: jobs embed R,
+                 which cannot run in a thread next to the request threads)
+    JOB_TTL_HOURS: jobs not updated for this long are deleted (default: 24);
+                   unfinished ones died with the process that ran them
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+JOB_DB = os.environ.get("JOB_DB", "./__jobs/jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+JOB_TTL_HOURS = float(os.environ.get("JOB_TTL_HOURS", 24))
+
+READY_STATES = ("SUCCESS", "FAILURE")
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+_TASKS = {}  # task name -> LocalTask, to start chord joins by name
+
+
+def _connect():
+    directory = os.path.dirname(JOB_DB)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(JOB_DB, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS jobs ("
+        " id TEXT PRIMARY KEY, name TEXT, state TEXT, info TEXT, updated REAL)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS chords ("
+        " id TEXT PRIMARY KEY, header TEXT, name TEXT, args TEXT, kwargs TEXT,"
+        " updated REAL)"
+    )
+    return conn
+
+
+def _write(task_id, state, info=None, name=None):
+    conn = _connect()
+    try:
+        with conn:
+            if name is None:
+                conn.execute(
+                    "UPDATE jobs SET state=?, info=?, updated=? WHERE id=?",
+                    (state, json.dumps(info), time.time(), task_id),
+                )
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?)",
+                    (task_id, name, state, json.dumps(info), time.time()),
+                )
+    finally:
+        conn.close()
+
+
+def _read(task_id):
+    conn = _connect()
+    try:
+        return conn.execute(
+            "SELECT state, info FROM jobs WHERE id=?", (task_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+
+
+def purge(max_age_hours=None):
+    """
+    Delete the jobs and never joined chords not updated for ``max_age_hours``,
+    finished or not: a running job publishes its state when it starts and
+    finishes, so a PENDING or STARTED row that old belongs to a lost job.
+    """
+    max_age_hours = JOB_TTL_HOURS if max_age_hours is None else max_age_hours
+    expired_before = time.time() - max_age_hours * 3600
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM jobs WHERE updated < ?", (expired_before,))
+            conn.execute("DELETE FROM chords WHERE updated < ?", (expired_before,))
+    finally:
+        conn.close()
+
+
+def get_executor():
+    """Return the shared job executor, creating it on first use."""
+    global _EXECUTOR
+    if JOB_WORKERS < 1:
+        # embedded R is not thread-safe and request threads of the web process call it
+        raise ValueError(
+            "JOB_WORKERS must be at least 1: analysis jobs cannot run in a thread "
+            "of the web process"
+        )
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            # Jobs embed R: never fork
+            _EXECUTOR = ProcessPoolExecutor(
+                max_workers=JOB_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _EXECUTOR
+
+
+def reset_executor():
+    """Drop a broken pool; the next job recreates it."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+        _EXECUTOR = None
+
+
+class _Request:
+    def __init__(self, task_id):
+        self.id = task_id
+
+
+class JobContext:
+    """First argument of a running job, standing in for a bound Celery task."""
+
+    def __init__(self, task_id):
+        self.request = _Request(task_id)
+
+    def update_state(self, state=None, meta=None):
+        _write(self.request.id, state or "STARTED", meta)
+
+
+def _failure_info(e):
+    return {
+        "exc_type": type(e).__name__,
+        "exc_message": str(e),
+        "traceback": traceback.format_exc(),
+    }
+
+
+def _execute(func, task_id, args, kwargs):
+    """Body of a job in the worker: run ``func`` and record its outcome."""
+    _write(task_id, "STARTED")
+    try:
+        result = func(JobContext(task_id), *args, **kwargs)
+    except Exception as e:
+        _write(task_id, "FAILURE", _failure_info(e))
+        return
+    _write(task_id, "SUCCESS", result)
+
+
+def _on_done(task_id, future):
+    """Record jobs that died before reaching ``_execute`` (unpicklable args, killed worker)."""
+    e = future.exception()
+    if e is None:
+        return
+    if isinstance(e, BrokenProcessPool):
+        reset_executor()
+    row = _read(task_id)
+    if row is None or row[0] not in READY_STATES:
+        _write(task_id, "FAILURE", {"exc_type": type(e).__name__, "exc_message": str(e)})
+
+
+class AsyncResult:
+    """State of a job, read from the job database (Celery ``AsyncResult`` subset)."""
+
+    def __init__(self, task_id):
+        self.id = task_id
+
+    def _row(self):
+        return _read(self.id) or ("PENDING", "null")
+
+    @property
+    def state(self):
+        return self._row()[0]
+
+    status = state
+
+    @property
+    def info(self):
+        """Progress meta while running, return value on success, error dict on failure."""
+        return json.loads(self._row()[1])
+
+    result = info
+
+    def ready(self):
+        return self.state in READY_STATES
+
+    def successful(self):
+        return self.state == "SUCCESS"
+
+    def failed(self):
+        return self.state == "FAILURE"
+
+
+class LocalTask:
+    """Callable job definition with Celery's ``delay``/``apply_async``."""
+
+    def __init__(self, func, name=None):
+        self.func = func
+        self.name = name or f"{func.__module__}.{func.__name__}"
+        _TASKS[self.name] = self
+
+    def __call__(self, *args, **kwargs):
+        return self.func(JobContext(str(uuid.uuid4())), *args, **kwargs)
+
+    def apply_async(self, args=(), kwargs=None, task_id=None):
+        task_id = task_id or str(uuid.uuid4())
+        _write(task_id, "PENDING", name=self.name)
+        self._submit(task_id, args, kwargs)
+        purge()
+        return AsyncResult(task_id)
+
+    def _submit(self, task_id, args=(), kwargs=None):
+        job = (_execute, self.func, task_id, tuple(args), kwargs or {})
+        try:
+            try:
+                future = get_executor().submit(*job)
+            except BrokenProcessPool:
+                reset_executor()
+                future = get_executor().submit(*job)
+        except Exception as e:
+            # the job never reached a worker: its row would stay PENDING
+            _write(task_id, "FAILURE", _failure_info(e))
+            raise
+        future.add_done_callback(lambda f: _on_done(task_id, f))
+        return future
+
+    def s(self, *args, **kwargs):
+        """Signature of a call, for chord()."""
+        return Signature(self, args, kwargs)
+
+    def delay(self, *args, **kwargs):
+        return self.apply_async(args, kwargs)
+
+
+class Signature:
+    def __init__(self, task, args=(), kwargs=None):
+        self.task, self.args, self.kwargs = task, tuple(args), kwargs or {}
+
+
+class GroupResult:
+    def __init__(self, results):
+        self.results = results
+
+    def completed_count(self):
+        return sum(result.ready() for result in self.results)
+
+
+def chord(header):
+    """
+    Celery-style chord: ``chord(header)(body)`` runs the ``header`` signatures
+    in parallel, then ``body`` with the list of their return values (in header
+    order) prepended to its arguments. Returns the AsyncResult of ``body``,
+    whose ``parent`` holds the results of the header jobs.
+
+    The body is recorded in the job database (JSON arguments) and started by
+    ``join_chord``, called by the poller of the chord.
+    A failing header job fails the body without running it.
+    """
+    header = list(header)
+
+    def apply(body):
+        get_executor()  # refuse a misconfigured backend before any row is written
+        body_id = str(uuid.uuid4())
+        _write(body_id, "PENDING", name=body.task.name)
+        ids = [str(uuid.uuid4()) for _ in header]
+        for sig, task_id in zip(header, ids):
+            _write(task_id, "PENDING", name=sig.task.name)
+        conn = _connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO chords VALUES (?, ?, ?, ?, ?, ?)",
+                    (body_id, json.dumps(ids), body.task.name, json.dumps(body.args),
+                     json.dumps(body.kwargs), time.time()),
+                )
+        finally:
+            conn.close()
+        for k, (sig, task_id) in enumerate(zip(header, ids)):
+            try:
+                sig.task._submit(task_id, sig.args, sig.kwargs)
+            except Exception as e:
+                # the jobs not submitted fail too, then the join fails the body
+                for later in ids[k + 1:]:
+                    _write(later, "FAILURE", _failure_info(e))
+                join_chord(body_id)
+                raise
+        join_chord(body_id)  # an empty header joins at once
+        purge()
+        result = AsyncResult(body_id)
+        result.parent = GroupResult([AsyncResult(task_id) for task_id in ids])
+        return result
+
+    return apply
+
+
+def join_chord(body_id):
+    """
+    Start the body of chord ``body_id`` once all its header jobs are done.
+
+    Safe to call on every poll and from several web workers: the chord row is
+    claimed (deleted) by exactly one caller. No-op for a chord already joined,
+    still running, or whose body task is not declared in this process.
+    """
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT header, name, args, kwargs FROM chords WHERE id=?", (body_id,)
+        ).fetchone()
+        if row is None or row[1] not in _TASKS:
+            return
+        results = [AsyncResult(task_id) for task_id in json.loads(row[0])]
+        if not all(result.ready() for result in results):
+            return
+        with conn:
+            claimed = conn.execute("DELETE FROM chords WHERE id=?", (body_id,)).rowcount
+    finally:
+        conn.close()
+    if not claimed:
+        return  # joined by another poller
+
+    failed = [result for result in results if result.failed()]
+    if failed:
+        info = failed[0].info
+        _write(body_id, "FAILURE", {
+            "exc_type": "ChordError",
+            "exc_message": f"{info['exc_type']}: {info['exc_message']}",
+        })
+        return
+    args = ([result.result for result in results],) + tuple(json.loads(row[2]))
+    try:
+        _TASKS[row[1]]._submit(body_id, args, json.loads(row[3]))
+    except Exception:
+        traceback.print_exc()  # recorded as the FAILURE of the body, seen by its poller
+
+
+def task(func=None, name=None):
+    """
+    Declare a job. ``func`` must be a module-level function (it is pickled by
+    reference) taking the job context as first argument.
+    """
+    if func is None:
+        return lambda f: LocalTask(f, name)
+    return LocalTask(func, name)
@@ -0,0 +1,29 @@
+"""
+League tables of two outcomes, composed from the league table of each outcome
+(league_rank_new in R_Codes/all_R_functions.R).
+
+The tables are the netleague output of netmeta: treatments (sorted) as index
+and columns, a "TE\n(lower, upper)" string per comparison and the treatment
+name on the diagonal.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def compose_league_table_both(leaguetable1, leaguetable2):
+    """
+    Two-outcome league table from the league tables of each outcome.
+
+    Lower triangle (and diagonal) from outcome 1, upper triangle from the
+    transposed outcome 2, over the sorted union of both treatment sets;
+    treatments missing from one outcome get empty cells on its side.
+    """
+    treatments = sorted(set(leaguetable1.index) | set(leaguetable2.index))
+    lt1 = leaguetable1.reindex(index=treatments, columns=treatments)
+    lt2 = leaguetable2.reindex(index=treatments, columns=treatments).T
+    lower = np.tril(np.ones((len(treatments), len(treatments)), dtype=bool))
+    values = np.where(lower, lt1.values, lt2.values).astype(object)
+    values[pd.isna(values)] = ""
+    np.fill_diagonal(values, treatments)
+    return pd.DataFrame(values, index=treatments, columns=treatments)
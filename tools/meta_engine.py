@@ -0,0 +1,395 @@
+"""
+Native NumPy/SciPy network meta-analysis engine.
+
+Frequentist graph-theoretical NMA (Rücker 2012, as implemented in R netmeta):
+multi-arm studies are handled by reconstructing adjusted pairwise weights
+from the pseudoinverse of the study variance matrix, the network is pooled
+through the pseudoinverse of the weighted Laplacian, and the heterogeneity
+variance tau² is the generalised DerSimonian–Laird estimator.
+
+``run_NetMeta_py`` returns the same long-format table as ``run_NetMeta_new``
+in R_Codes/all_R_functions.R, so it can be used as a drop-in backend by
+``tools.utils.run_network_meta_analysis`` without an embedded R.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+Z_975 = 1.96  # normal quantile used by the R functions for confidence intervals
+
+
+def iswhole(x, tol=np.finfo(float).eps ** 0.5):
+    return np.abs(x - np.round(x)) < tol
+
+
+def prepare_outcome_data(df, i):
+    """
+    Rows usable for outcome i, with the same filters as fit_netmeta_new in R.
+
+    Drops missing/zero standard errors and whole studies whose number of rows
+    is not k(k-1)/2 for an integer number of arms k.
+    """
+    TE_col, seTE_col = f"TE{i + 1}", f"seTE{i + 1}"
+    dat = df.dropna(subset=[TE_col, seTE_col])
+    dat = dat[dat[seTE_col] != 0]
+    nrows = dat.groupby("studlab")["studlab"].transform("size")
+    dat = dat[iswhole((1 + np.sqrt(8 * nrows + 1)) / 2)]
+    return dat.reset_index(drop=True)
+
+
+def _multiarm_weights(variances, t1, t2, study):
+    """
+    Adjusted inverse-variance weights of every pairwise row.
+
+    For a k-arm study the k(k-1)/2 pairwise variances are not independent;
+    following Rücker the arm-level Laplacian is recovered as the pseudoinverse
+    of -1/2 C R C (R: matrix of pairwise variances, C: centring matrix) and the
+    adjusted weight of comparison (a, b) is -L[a, b].
+    """
+    w = 1.0 / variances
+    # only studies with more than one row need the adjustment
+    _, first, counts = np.unique(study, return_index=True, return_counts=True)
+    for start, size in zip(first, counts):
+        if size == 1:
+            continue
+        rows = np.flatnonzero(study == study[start])
+        arms, local = np.unique(np.concatenate([t1[rows], t2[rows]]), return_inverse=True)
+        k = len(arms)
+        a, b = local[: len(rows)], local[len(rows):]
+        R = np.zeros((k, k))
+        R[a, b] = variances[rows]
+        R[b, a] = variances[rows]
+        C = np.eye(k) - 1.0 / k
+        L = np.linalg.pinv(-0.5 * C @ R @ C)
+        w[rows] = -L[a, b]
+    return w
+
+
+def _laplacian_pinv(B, w):
+    n = B.shape[1]
+    L = B.T @ (w[:, None] * B)
+    return np.linalg.inv(L - 1.0 / n) + 1.0 / n
+
+
+def netmeta_fit(TE, seTE, treat1, treat2, studlab):
+    """
+    Fit the common and random effects network meta-analysis.
+
+    Returns:
+        dict with keys
+            trts: sorted treatment labels
+            TE_fixed, seTE_fixed, TE_random, seTE_random: (n x n) matrices,
+                entry [a, b] = effect of treatment a versus b
+            w_fixed, w_random: adjusted weights of every row
+            Q, df_Q, tau2
+    """
+    TE = np.asarray(TE, dtype=float)
+    seTE = np.asarray(seTE, dtype=float)
+    treat1 = np.asarray(treat1).astype(str)
+    treat2 = np.asarray(treat2).astype(str)
+    studlab = np.asarray(studlab).astype(str)
+
+    trts = np.array(sorted(set(treat1) | set(treat2)))
+    n, m = len(trts), len(TE)
+    pos1, pos2 = np.searchsorted(trts, treat1), np.searchsorted(trts, treat2)
+
+    B = np.zeros((m, n))
+    B[np.arange(m), pos1] = 1.0
+    B[np.arange(m), pos2] = -1.0
+
+    adjacency = (B.T @ B) != 0
+    n_reached = len(_component(adjacency, 0))
+    if n_reached != n:
+        raise ValueError(
+            "Network is not connected: "
+            f"{n - n_reached} of {n} treatments cannot be reached from '{trts[0]}'."
+        )
+
+    # common effect model
+    w_fixed = _multiarm_weights(seTE**2, pos1, pos2, studlab)
+    Lplus = _laplacian_pinv(B, w_fixed)
+    H = B @ Lplus @ B.T * w_fixed[None, :]
+    resid = TE - H @ TE
+    Q = float(resid @ (w_fixed * resid))
+
+    _, study_idx, rows_per_study = np.unique(
+        studlab, return_inverse=True, return_counts=True
+    )
+    narms = (1 + np.sqrt(8 * rows_per_study + 1)) / 2
+    df_Q = int(round(np.sum(narms - 1) - (n - 1)))
+
+    # generalised DerSimonian-Laird heterogeneity variance
+    if df_Q > 0:
+        E = study_idx[:, None] == study_idx[None, :]
+        P = (B @ B.T) * E / 2
+        denom = np.trace((np.eye(m) - H) @ P * w_fixed[None, :])
+        tau2 = max(0.0, (Q - df_Q) / denom)
+    else:
+        tau2 = np.nan
+
+    # random effects model
+    w_random = _multiarm_weights(
+        seTE**2 + (0.0 if np.isnan(tau2) else tau2), pos1, pos2, studlab
+    )
+    Lplus_r = _laplacian_pinv(B, w_random)
+
+    def _matrices(Lp, w):
+        theta = Lp @ (B.T @ (w * TE))
+        diff = theta[:, None] - theta[None, :]
+        d = np.diag(Lp)
+        var = np.clip(d[:, None] + d[None, :] - 2 * Lp, 0, None)
+        return diff, np.sqrt(var)
+
+    TE_fixed, seTE_fixed = _matrices(Lplus, w_fixed)
+    TE_random, seTE_random = _matrices(Lplus_r, w_random)
+
+    return {
+        "trts": trts,
+        "TE_fixed": TE_fixed,
+        "seTE_fixed": seTE_fixed,
+        "TE_random": TE_random,
+        "seTE_random": seTE_random,
+        "w_fixed": w_fixed,
+        "w_random": w_random,
+        "Q": Q,
+        "df_Q": df_Q,
+        "tau2": tau2,
+    }
+
+
+def _component(adjacency, start):
+    """Nodes reachable from ``start`` (breadth-first over a dense adjacency matrix)."""
+    seen = np.zeros(len(adjacency), dtype=bool)
+    seen[start] = True
+    frontier = np.array([start])
+    while frontier.size:
+        nxt = adjacency[frontier].any(axis=0) & ~seen
+        seen |= nxt
+        frontier = np.flatnonzero(nxt)
+    return np.flatnonzero(seen)
+
+
+def run_NetMeta_py(df, i):
+    """
+    Long-format NMA table of outcome i, matching run_NetMeta_new in R.
+
+    Columns: Treatment, <sm>, CI_lower, CI_upper, pre_lower, pre_upper,
+             WEIGHT, tau2, Reference
+    """
+    sm = df[f"effect_size{i + 1}"].iloc[0]
+    dat = prepare_outcome_data(df, i)
+    fit = netmeta_fit(
+        dat[f"TE{i + 1}"], dat[f"seTE{i + 1}"], dat.treat1, dat.treat2, dat.studlab
+    )
+    trts, tau2 = fit["trts"], fit["tau2"]
+    treatments = pd.unique(pd.concat([dat.treat1, dat.treat2]).astype(str))
+
+    df_Q = fit["df_Q"]
+    q_pred = stats.t.ppf(0.975, df_Q) if df_Q > 0 else np.nan
+    tau2_pred = 0.0 if np.isnan(tau2) else tau2
+
+    ALL_DFs = []
+    for treatment in treatments:
+        ref = np.searchsorted(trts, treatment)
+        others = np.arange(len(trts)) != ref
+        TE = fit["TE_random"][others, ref]
+        se = fit["seTE_random"][others, ref]
+        se_pred = np.sqrt(se**2 + tau2_pred)
+        columns = [
+            TE,
+            TE - Z_975 * se,
+            TE + Z_975 * se,
+            TE - q_pred * se_pred,
+            TE + q_pred * se_pred,
+        ]
+        if sm not in ("MD", "SMD"):
+            columns = [np.exp(c) for c in columns]
+        ALL_DFs.append(
+            pd.DataFrame(
+                {
+                    "Treatment": trts[others],
+                    sm: columns[0],
+                    "CI_lower": columns[1],
+                    "CI_upper": columns[2],
+                    "pre_lower": columns[3],
+                    "pre_upper": columns[4],
+                    "WEIGHT": 1 / se,
+                    "tau2": tau2,
+                    "Reference": treatment,
+                }
+            )
+        )
+    return pd.concat(ALL_DFs, ignore_index=True)
+
+
+Z_QNORM = stats.norm.ppf(0.975)
+
+
+def _group_sum(values, groups, ngroups):
+    return np.bincount(groups, weights=values, minlength=ngroups)
+
+
+def _reml_tau2(y, v, groups, ngroups, k, max_iter=100, tol=1e-5):
+    """
+    REML heterogeneity variance of every comparison at once (Fisher scoring).
+
+    Mirrors metafor/meta: DerSimonian-Laird start, step truncated at zero,
+    stop when every comparison moved less than ``tol``.
+    """
+    w = 1 / v
+    sw = _group_sum(w, groups, ngroups)
+    mu = _group_sum(w * y, groups, ngroups) / sw
+    Q = _group_sum(w * (y - mu[groups]) ** 2, groups, ngroups)
+    C = sw - _group_sum(w**2, groups, ngroups) / sw
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tau2 = np.where(k > 1, np.maximum(0, (Q - (k - 1)) / C), 0.0)
+
+    active = k > 1
+    for _ in range(max_iter):
+        w = 1 / (v + tau2[groups])
+        sw = _group_sum(w, groups, ngroups)
+        sw2 = _group_sum(w**2, groups, ngroups)
+        sw3 = _group_sum(w**3, groups, ngroups)
+        mu = _group_sum(w * y, groups, ngroups) / sw
+        yPPy = _group_sum(w**2 * (y - mu[groups]) ** 2, groups, ngroups)
+        trP = sw - sw2 / sw
+        trPP = sw2 - 2 * sw3 / sw + (sw2 / sw) ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            new = np.maximum(0, tau2 + (yPPy - trP) / trPP)
+        step = np.where(active, np.abs(new - tau2), 0)
+        tau2 = np.where(active, new, tau2)
+        if np.all(step < tol):
+            break
+    return np.where(k > 1, tau2, np.nan)
+
+
+def run_pairwise_py(df, i):
+    """
+    Random-effects pairwise meta-analysis of every comparison of outcome i at once.
+
+    Returns the same columns as pairwise_forest_new in R (metagen with REML tau2,
+    prediction interval on k-1 degrees of freedom), one row per study:
+        <sm>, TE_diamond, id, studlab, treat1, treat2, CI_lower, CI_upper,
+        CI_lower_diamond, CI_upper_diamond, Predict_lo, Predict_up, WEIGHT, tau2, I2
+    """
+    sm = df[f"effect_size{i + 1}"].iloc[0]
+    TE_col, seTE_col = f"TE{i + 1}", f"seTE{i + 1}"
+    dat = df.dropna(subset=[TE_col, seTE_col])
+    dat = dat[dat[seTE_col] != 0]
+
+    # orient every comparison alphabetically
+    t1, t2 = dat.treat1.astype(str).values, dat.treat2.astype(str).values
+    swap = t1 > t2
+    y = np.where(swap, -dat[TE_col].values, dat[TE_col].values).astype(float)
+    se = dat[seTE_col].values.astype(float)
+    treat1, treat2 = np.where(swap, t2, t1), np.where(swap, t1, t2)
+
+    comparisons = pd.MultiIndex.from_arrays([treat1, treat2])
+    codes, uniques = pd.factorize(comparisons, sort=True)
+    G = len(uniques)
+    v = se**2
+    k = np.bincount(codes, minlength=G)
+
+    # common effect (for Q and I2)
+    w_f = 1 / v
+    mu_f = _group_sum(w_f * y, codes, G) / _group_sum(w_f, codes, G)
+    Q = _group_sum(w_f * (y - mu_f[codes]) ** 2, codes, G)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        I2 = np.where(k > 1, np.maximum(0, (Q - (k - 1)) / Q), np.nan)
+        I2 = np.where((k > 1) & (Q == 0), 0.0, I2)
+
+    # random effects
+    tau2 = _reml_tau2(y, v, codes, G, k)
+    w_r = 1 / (v + np.nan_to_num(tau2)[codes])
+    sw_r = _group_sum(w_r, codes, G)
+    mu_r = _group_sum(w_r * y, codes, G) / sw_r
+    se_r = np.sqrt(1 / sw_r)
+    q_pred = np.where(k > 1, stats.t.ppf(0.975, np.maximum(k - 1, 1)), np.nan)
+    se_pred = np.sqrt(se_r**2 + np.nan_to_num(tau2))
+
+    columns = {
+        sm: y,
+        "TE_diamond": mu_r[codes],
+        "CI_lower": y - Z_QNORM * se,
+        "CI_upper": y + Z_QNORM * se,
+        "CI_lower_diamond": (mu_r - Z_QNORM * se_r)[codes],
+        "CI_upper_diamond": (mu_r + Z_QNORM * se_r)[codes],
+        "Predict_lo": (mu_r - q_pred * se_pred)[codes],
+        "Predict_up": (mu_r + q_pred * se_pred)[codes],
+    }
+    if sm not in ("MD", "SMD"):
+        columns = {name: np.exp(col) for name, col in columns.items()}
+
+    out = pd.DataFrame(
+        {
+            sm: columns[sm],
+            "TE_diamond": columns["TE_diamond"],
+            "id": codes + 1,
+            "studlab": dat.studlab.values,
+            "treat1": treat1,
+            "treat2": treat2,
+            "CI_lower": columns["CI_lower"],
+            "CI_upper": columns["CI_upper"],
+            "CI_lower_diamond": columns["CI_lower_diamond"],
+            "CI_upper_diamond": columns["CI_upper_diamond"],
+            "Predict_lo": columns["Predict_lo"],
+            "Predict_up": columns["Predict_up"],
+            "WEIGHT": w_r,
+            "tau2": tau2[codes],
+            "I2": I2[codes],
+        }
+    )
+    return out.sort_values(["id", "studlab"], kind="mergesort").reset_index(drop=True)
+
+
+def run_funnel_py(df, i):
+    """
+    Comparison-adjusted funnel data of outcome i for every reference at once,
+    matching nma_funnel_table in R.
+
+    Each contrast is listed once per arm acting as reference (treat2), with the
+    effect oriented as treat1 versus the reference; TE_direct is the common
+    effect direct estimate of that comparison (inverse-variance mean of its
+    contrasts, as netmeta's TE.direct.fixed) and TE_adj = TE - TE_direct.
+
+    Columns: studlab, treat1, treat2, <sm>, TE_direct, TE_adj, seTE
+    """
+    sm = df[f"effect_size{i + 1}"].iloc[0]
+    dat = prepare_outcome_data(df, i)
+    TE = dat[f"TE{i + 1}"].values.astype(float)
+    seTE = dat[f"seTE{i + 1}"].values.astype(float)
+    t1, t2 = dat.treat1.astype(str).values, dat.treat2.astype(str).values
+    treatments = pd.unique(np.concatenate([t1, t2]))
+    n, m = len(treatments), len(TE)
+    pos1 = pd.Index(treatments).get_indexer(t1)
+    pos2 = pd.Index(treatments).get_indexer(t2)
+
+    # direct estimates of every observed comparison, as an antisymmetric (n x n) matrix
+    w = 1 / seTE**2
+    pair = np.minimum(pos1, pos2) * n + np.maximum(pos1, pos2)
+    sign = np.where(pos1 < pos2, 1.0, -1.0)
+    sw = np.bincount(pair, weights=w, minlength=n * n)
+    with np.errstate(invalid="ignore"):
+        direct = (np.bincount(pair, weights=w * TE * sign, minlength=n * n) / sw).reshape(n, n)
+    direct = np.where(np.isnan(direct), -direct.T, direct)
+
+    row = np.concatenate([np.arange(m), np.arange(m)])
+    other = np.concatenate([pos1, pos2])
+    ref = np.concatenate([pos2, pos1])
+    TE_oriented = np.concatenate([TE, -TE])
+    # references in treatment order, then other arms in treatment order, then data order
+    o = np.lexsort((row, other, ref))
+    TE_direct = direct[other[o], ref[o]]
+
+    return pd.DataFrame(
+        {
+            "studlab": dat.studlab.values[row[o]],
+            "treat1": treatments[other[o]],
+            "treat2": treatments[ref[o]],
+            sm: TE_oriented[o],
+            "TE_direct": TE_direct,
+            "TE_adj": TE_oriented[o] - TE_direct,
+            "seTE": seTE[row[o]],
+        }
+    )
@@ -0,0 +1,94 @@
+"""
+Server-side layout of treatment networks: stress majorization in NumPy.
+
+Cytoscape lays the network out in the browser, which stalls the results page
+for networks of many treatments. ``stress_layout`` places the nodes once on
+the server so that the distance between two treatments follows the number of
+comparisons separating them (graph distance), like the force-directed layouts
+of Cytoscape but deterministic:
+
+    1. graph distances d_ij by breadth-first search (scipy csgraph); parts of
+       a disconnected network are placed one step further than the largest
+       distance
+    2. start from classical multidimensional scaling of d
+    3. localized stress majorization (Gansner, Koren & North 2004) with
+       weights d_ij^-2, until the stress stops decreasing
+
+The positions feed the Cytoscape "preset" layout (see get_network_layout in
+tools/utils.py). They are computed on every comparison of the dataset, so a
+treatment keeps its place across outcomes and years of the year slider.
+"""
+
+import numpy as np
+from scipy.sparse.csgraph import shortest_path
+
+from tools.graph_stats import adjacency
+
+SCALE = 100  # px per comparison step
+MAX_ITERATIONS = 300
+TOLERANCE = 1e-4
+
+
+def graph_distances(source, target, n_nodes):
+    """Graph distances between all nodes; unreachable pairs one step beyond the largest distance."""
+    distances = shortest_path(
+        adjacency(source, target, n_nodes), directed=False, unweighted=True
+    )
+    finite = np.isfinite(distances)
+    distances[~finite] = (distances[finite].max() if finite.any() else 0) + 1
+    return distances
+
+
+def _classical_mds(distances):
+    n_nodes = len(distances)
+    centering = np.eye(n_nodes) - 1 / n_nodes
+    gram = -0.5 * centering @ (distances**2) @ centering
+    values, vectors = np.linalg.eigh(gram)
+    top = np.argsort(values)[::-1][:2]
+    X = vectors[:, top] * np.sqrt(np.maximum(values[top], 0))
+    # eigenvector signs are arbitrary: fix them for stable positions
+    signs = np.sign(X[np.argmax(np.abs(X), axis=0), [0, 1]])
+    X *= np.where(signs == 0, 1, signs)
+    # nodes at the same place (symmetric graphs) are spread on a small circle
+    angles = 2 * np.pi * np.arange(n_nodes) / n_nodes
+    return X + 1e-3 * np.column_stack([np.cos(angles), np.sin(angles)])
+
+
+def _lengths(X):
+    squared = (X**2).sum(axis=1)
+    return np.sqrt(np.maximum(squared[:, None] + squared[None, :] - 2 * X @ X.T, 0))
+
+
+def stress_layout(source, target, n_nodes, max_iterations=MAX_ITERATIONS, tol=TOLERANCE):
+    """(n_nodes, 2) positions, in units of graph distance, of the undirected graph source-target."""
+    if n_nodes < 2:
+        return np.zeros((n_nodes, 2))
+    distances = graph_distances(source, target, n_nodes)
+    with np.errstate(divide="ignore"):
+        weights = np.where(distances > 0, distances**-2.0, 0.0)
+    total_weight = weights.sum(axis=1)[:, None]
+    weighted_distances = weights * distances
+
+    X = _classical_mds(distances)
+    stress = np.inf
+    for _ in range(max_iterations):
+        lengths = _lengths(X)
+        new_stress = (weights * (lengths - distances) ** 2).sum() / 2
+        if stress - new_stress <= tol * new_stress:
+            break
+        stress = new_stress
+        # x_i <- sum_j w_ij (x_j + d_ij (x_i - x_j) / |x_i - x_j|) / sum_j w_ij
+        pull = np.divide(
+            weighted_distances, lengths, out=np.zeros_like(lengths), where=lengths > 0
+        )
+        X = (weights @ X + pull.sum(axis=1)[:, None] * X - pull @ X) / total_weight
+    return X - X.mean(axis=0)
+
+
+def layout_positions(summary, scale=SCALE):
+    """{treatment: {"x", "y"}} Cytoscape positions of the network of a NetworkSummary."""
+    X = stress_layout(summary.source, summary.target, len(summary.treatments)) * scale
+    return {
+        name: {"x": round(x, 1), "y": round(y, 1)}
+        for name, (x, y) in zip(summary.treatments.tolist(), X.tolist())
+    }
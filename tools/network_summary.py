@@ -0,0 +1,181 @@
+"""
+Network of one outcome of net_data as arrays, and its Cytoscape elements.
+
+``summarize_network`` reduces the comparisons of an outcome to a
+``NetworkSummary`` in a few NumPy passes (factorized treatment codes and
+bincounts, no groupby per column):
+
+    treatments    node names, sorted
+    n             patients per node: n1<i> of its treat1 rows + n2<i> of its treat2 rows
+    rob           (nodes, 3) counts of low / medium / high risk of bias
+                  comparisons, None without a rob column
+    classes       treatment class code per node (-1: unknown), None without
+                  treat_class1 / treat_class2
+    source, target, count
+                  edges (node codes, source < target) and their number of
+                  comparisons
+    study_arms    number of arms (distinct treatments) per study
+
+``NetworkSummary.elements()`` gives the elements of get_network_new: edges
+sorted by node names, then the nodes, sized between 20 and 80 px from n.
+"""
+
+import numpy as np
+import pandas as pd
+
+CMAP = [
+    "bisque",
+    "gold",
+    "light blue",
+    "tomato",
+    "orange",
+    "olivedrab",
+    "darkslategray",
+    "orchid",
+    "brown",
+    "navy",
+    "palegreen",
+]
+ROB_LEVELS = (1, 2, 3)
+
+
+class NetworkSummary:
+    """Node and edge arrays of an outcome network (see module docstring)."""
+
+    def __init__(
+        self, treatments, n, source, target, count, rob=None, classes=None, study_arms=None
+    ):
+        self.treatments = treatments
+        self.n = n
+        self.source = source
+        self.target = target
+        self.count = count
+        self.rob = rob
+        self.classes = classes
+        self.study_arms = study_arms
+
+    @property
+    def n_classes(self):
+        if self.classes is None or not len(self.classes):
+            return None
+        return int(self.classes.max()) + 1
+
+    def node_sizes(self):
+        """Node diameters in px: n scaled to 20-80 (80 for all when n is constant)."""
+        if not len(self.n):
+            return np.zeros(0, dtype=int)
+        size_range = self.n.max() - self.n.min()
+        if size_range == 0:
+            normalized = np.ones(len(self.n))
+        else:
+            normalized = (self.n - self.n.min()) / size_range
+        return (normalized * 60).astype(int) + 20
+
+    def edge_weights(self):
+        """Edge widths: the number of comparisons, thinner for small and large networks."""
+        n_edges = len(self.count)
+        if 13 < n_edges < 100:
+            return self.count.tolist()
+        return (self.count * (0.75 if n_edges < 13 else 0.7)).tolist()
+
+    def elements(self, positions=None):
+        """
+        Cytoscape elements: edges, then nodes. positions ({name: {"x", "y"}},
+        see tools/network_layout.py) are set on the nodes for a preset layout.
+        """
+        names = self.treatments.tolist()
+        cy_edges = [
+            {"data": {"source": names[s], "target": names[t], "weight": w, "weight_lab": c}}
+            for s, t, w, c in zip(
+                self.source.tolist(), self.target.tolist(),
+                self.edge_weights(), self.count.tolist(),
+            )
+        ]
+
+        nodes = [
+            {"id": name, "label": name, "size": size}
+            for name, size in zip(names, self.node_sizes().tolist())
+        ]
+        if self.rob is not None:
+            total = self.rob.sum(axis=1, keepdims=True)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pies = np.where(total > 0, self.rob / total, np.nan)
+            for data, row in zip(nodes, pies.tolist()):
+                for k, fraction in enumerate(row, start=1):
+                    data[f"pie{k}"] = None if fraction != fraction else fraction
+        if self.classes is None:
+            for data in nodes:
+                data["classes"] = "genesis"
+            cy_nodes = [{"data": data} for data in nodes]
+        else:
+            n_classes = self.n_classes
+            cy_nodes = [
+                {"data": {**data, "n_class": n_classes}, "classes": CMAP[cls % len(CMAP)]}
+                for data, cls in zip(nodes, self.classes.tolist())
+            ]
+        if positions:
+            for node, name in zip(cy_nodes, names):
+                if name in positions:
+                    node["position"] = positions[name]
+        return cy_edges + cy_nodes
+
+
+def _numeric(df, column):
+    if column not in df.columns:
+        return np.zeros(len(df))
+    return pd.to_numeric(df[column], errors="coerce").fillna(0).to_numpy(dtype=float)
+
+
+def summarize_network(df, i):
+    """
+    NetworkSummary of outcome i (0-based) of a pairwise net_data DataFrame;
+    i=None: every comparison of the data, whatever its outcomes. Comparisons
+    without treat1 or treat2 are left out.
+    """
+    df = df.dropna(subset=["treat1", "treat2"])
+    if i is not None:
+        df = df.dropna(subset=[f"TE{i + 1}", f"seTE{i + 1}"])
+    m = len(df)
+    codes, treatments = pd.factorize(
+        np.concatenate([df["treat1"].to_numpy(), df["treat2"].to_numpy()]), sort=True
+    )
+    c1, c2 = codes[:m], codes[m:]
+    T = len(treatments)
+    treatments = np.asarray(treatments, dtype=object)
+
+    n = np.zeros(T)
+    if i is not None:
+        n += np.bincount(c1, _numeric(df, f"n1{i + 1}"), minlength=T)
+        n += np.bincount(c2, _numeric(df, f"n2{i + 1}"), minlength=T)
+
+    lo, hi = np.minimum(c1, c2), np.maximum(c1, c2)
+    keys, count = np.unique(lo.astype(np.int64) * T + hi, return_counts=True)
+    source, target = keys // T, keys % T
+
+    rob = None
+    if "rob" in df.columns and df["rob"].notna().any():
+        levels = pd.to_numeric(df["rob"], errors="coerce").to_numpy()
+        rob = np.column_stack([
+            np.bincount(c1[levels == level], minlength=T)
+            + np.bincount(c2[levels == level], minlength=T)
+            for level in ROB_LEVELS
+        ])
+
+    classes = None
+    if "treat_class1" in df.columns and "treat_class2" in df.columns:
+        class_codes, _ = pd.factorize(
+            pd.concat([df["treat_class1"], df["treat_class2"]], ignore_index=True),
+            sort=True,
+        )
+        # class of the first row of each treatment
+        classes = np.full(T, -1)
+        classes[codes[::-1]] = class_codes[::-1]
+
+    study_arms = None
+    if "studlab" in df.columns:
+        study, names = pd.factorize(df["studlab"])  # -1: no study label
+        arms = np.concatenate([study * T + c1, study * T + c2]).astype(np.int64)
+        arms = np.unique(arms[np.concatenate([study, study]) >= 0])
+        study_arms = np.bincount(arms // max(T, 1), minlength=len(names))
+
+    return NetworkSummary(treatments, n, source, target, count, rob, classes, study_arms)
@@ -0,0 +1,214 @@
+"""
+Arm-level (long) and contrast-level uploads to the pairwise net_data table.
+
+Native replacement of get_pairwise_data_long_new / get_pairwise_data_contrast_new
+in R_Codes/all_R_functions.R (meta::pairwise per outcome, then full_join).
+Every outcome is computed at once on NumPy arrays with the conventions of
+meta::pairwise / metabin / metacont:
+
+    OR, RR    0.5 added to every cell of the studies with a zero cell in
+              any arm (zero events for RR); comparisons with no or only
+              events in both arms get no estimate
+    MD        mean1 - mean2, se = sqrt(sd1²/n1 + sd2²/n2)
+    SMD       Hedges' g with the approximate variance of metacont
+
+Output columns: studlab, treat1, treat2, then per outcome i
+
+    binary      TE<i>, seTE<i>, event1<i>, n1<i>, event2<i>, n2<i>
+    continuous  TE<i>, seTE<i>, n1<i>, mean1<i>, sd1<i>, n2<i>, mean2<i>, sd2<i>
+
+then the other columns of the upload. For long data, variables constant
+within every study are kept once and the others get the suffixes 1 and 2 of
+the two arms (treat_class -> treat_class1, treat_class2), as meta::pairwise does.
+"""
+
+import numpy as np
+import pandas as pd
+
+BINARY_MEASURES = ("OR", "RR")
+INCR = 0.5
+
+
+def _numeric(*columns):
+    return (pd.to_numeric(pd.Series(c), errors="coerce").to_numpy(dtype=float) for c in columns)
+
+
+def zero_cells(sm, event, n):
+    """Arms whose 2x2 table has a zero cell for sm (RR: zero events only)."""
+    event, n = _numeric(event, n)
+    return (event == 0) | (event == n) if sm == "OR" else event == 0
+
+
+def binary_contrasts(sm, event1, n1, event2, n2, zero=None, incr=INCR):
+    """
+    TE and seTE (log scale) of arm 1 vs arm 2 for OR or RR. ``zero`` flags the
+    comparisons getting the continuity correction (default: a zero cell in one
+    of their two arms).
+    """
+    e1, n1, e2, n2 = _numeric(event1, n1, event2, n2)
+    if zero is None:
+        zero = zero_cells(sm, e1, n1) | zero_cells(sm, e2, n2)
+    inc = np.where(zero, incr, 0.0)
+    a, c = e1 + inc, e2 + inc
+    m1, m2 = n1 + 2 * inc, n2 + 2 * inc
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if sm == "OR":
+            b, d = m1 - a, m2 - c
+            TE = np.log((a * d) / (b * c))
+            seTE = np.sqrt(1 / a + 1 / b + 1 / c + 1 / d)
+        else:
+            TE = np.log((a / m1) / (c / m2))
+            seTE = np.sqrt(1 / a - 1 / m1 + 1 / c - 1 / m2)
+    excluded = ((e1 == 0) & (e2 == 0)) | ((e1 == n1) & (e2 == n2))
+    TE[excluded] = seTE[excluded] = np.nan
+    return TE, seTE
+
+
+def continuous_contrasts(sm, n1, mean1, sd1, n2, mean2, sd2):
+    """TE and seTE of arm 1 vs arm 2 for MD or SMD (Hedges' g)."""
+    n1, mean1, sd1, n2, mean2, sd2 = _numeric(n1, mean1, sd1, n2, mean2, sd2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if sm == "SMD":
+            N = n1 + n2
+            sd_pooled = np.sqrt(((n1 - 1) * sd1**2 + (n2 - 1) * sd2**2) / (N - 2))
+            TE = (mean1 - mean2) / sd_pooled * (1 - 3 / (4 * N - 9))
+            seTE = np.sqrt(N / (n1 * n2) + TE**2 / (2 * (N - 3.94)))
+        else:
+            TE = mean1 - mean2
+            seTE = np.sqrt(sd1**2 / n1 + sd2**2 / n2)
+    return TE, seTE
+
+
+def _study_any(flags, studlab):
+    """Per row: whether any row of the same study is flagged."""
+    study, _ = pd.factorize(studlab)
+    return np.bincount(study, weights=flags, minlength=study.max() + 1)[study] > 0
+
+
+def _outcome_columns(sm, i, arm1, arm2, zero=None):
+    """Output columns of outcome i from the two arms' input columns ({"r", "n"} or {"y", "sd", "n"})."""
+    if sm in BINARY_MEASURES:
+        TE, seTE = binary_contrasts(
+            sm, arm1["r"], arm1["n"], arm2["r"], arm2["n"], zero=zero
+        )
+        return {
+            f"TE{i}": TE, f"seTE{i}": seTE,
+            f"event1{i}": arm1["r"], f"n1{i}": arm1["n"],
+            f"event2{i}": arm2["r"], f"n2{i}": arm2["n"],
+        }
+    TE, seTE = continuous_contrasts(
+        sm, arm1["n"], arm1["y"], arm1["sd"], arm2["n"], arm2["y"], arm2["sd"]
+    )
+    return {
+        f"TE{i}": TE, f"seTE{i}": seTE,
+        f"n1{i}": arm1["n"], f"mean1{i}": arm1["y"], f"sd1{i}": arm1["sd"],
+        f"n2{i}": arm2["n"], f"mean2{i}": arm2["y"], f"sd2{i}": arm2["sd"],
+    }
+
+
+def _measure(df, i):
+    return df[f"effect_size{i}"].iloc[0]
+
+
+def _arm_pairs(studlab):
+    """
+    Row positions (arm1, arm2) of every pair of arms of every study: studies in
+    order of appearance, arms in data order (i < j), like meta::pairwise.
+    Raises ValueError when no study has two arms.
+    """
+    study, _ = pd.factorize(studlab)
+    order = np.argsort(study, kind="stable")
+    counts = np.bincount(study)
+    if not len(counts) or counts.max() < 2:
+        raise ValueError(
+            "No study has two arms to compare: check that the study column "
+            "identifies the studies (one row per study arm in long format)"
+        )
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    blocks = []
+    for a in range(counts.max() - 1):
+        for b in range(a + 1, counts.max()):
+            s = np.flatnonzero(counts > b)
+            blocks.append((s, starts[s] + a, starts[s] + b, a, b))
+    s, p1, p2, a, b = (
+        np.concatenate([np.broadcast_to(block[k], block[0].shape) for block in blocks])
+        for k in range(5)
+    )
+    sort = np.lexsort((b, a, s))
+    return order[p1[sort]], order[p2[sort]]
+
+
+def long_to_pairwise(df, num_outcomes=1):
+    """Pairwise table of arm-level data (one row per study arm, see module docstring)."""
+    df = df.reset_index(drop=True)
+    num_outcomes = int(num_outcomes or 1)
+    i1, i2 = _arm_pairs(df["studlab"].values)
+    arm1, arm2 = df.iloc[i1].reset_index(drop=True), df.iloc[i2].reset_index(drop=True)
+
+    out = {
+        "studlab": arm1["studlab"].values,
+        "treat1": arm1["treat"].values,
+        "treat2": arm2["treat"].values,
+    }
+    used = {"studlab", "treat"}
+    for i in range(1, num_outcomes + 1):
+        sm = _measure(df, i)
+        names = ("r", "n") if sm in BINARY_MEASURES else ("y", "sd", "n")
+        used.update(f"{name}{i}" for name in names)
+        zero = None
+        if sm in BINARY_MEASURES:
+            zero = _study_any(zero_cells(sm, df[f"r{i}"], df[f"n{i}"]), df["studlab"])[i1]
+        out.update(_outcome_columns(
+            sm, i,
+            {name: arm1[f"{name}{i}"].values for name in names},
+            {name: arm2[f"{name}{i}"].values for name in names},
+            zero,
+        ))
+
+    # other variables: once if constant within every study, else per arm
+    extra = [c for c in df.columns if c not in used]
+    varying = (
+        df.groupby("studlab", sort=False)[extra].nunique(dropna=False).gt(1).any()
+        if extra else pd.Series(dtype=bool)
+    )
+    for column in extra:
+        if varying[column]:
+            out[f"{column}1"] = arm1[column].values
+            out[f"{column}2"] = arm2[column].values
+        else:
+            out[column] = arm1[column].values
+    return pd.DataFrame(out)
+
+
+def contrast_to_pairwise(df, num_outcomes=1):
+    """Pairwise table of contrast-level data (one row per comparison, see module docstring)."""
+    df = df.reset_index(drop=True)
+    num_outcomes = int(num_outcomes or 1)
+    out = {
+        "studlab": df["studlab"].values,
+        "treat1": df["treat1"].values,
+        "treat2": df["treat2"].values,
+    }
+    used = {"studlab", "treat1", "treat2"}
+    for i in range(1, num_outcomes + 1):
+        sm = _measure(df, i)
+        names = ("r", "n") if sm in BINARY_MEASURES else ("y", "sd", "n")
+        columns = [f"{name}{arm}{i}" for arm in (1, 2) for name in names]
+        used.update(columns)
+        zero = None
+        if sm in BINARY_MEASURES:
+            zero = _study_any(
+                zero_cells(sm, df[f"r1{i}"], df[f"n1{i}"])
+                | zero_cells(sm, df[f"r2{i}"], df[f"n2{i}"]),
+                df["studlab"],
+            )
+        out.update(_outcome_columns(
+            sm, i,
+            {name: df[f"{name}1{i}"].values for name in names},
+            {name: df[f"{name}2{i}"].values for name in names},
+            zero,
+        ))
+    for column in df.columns:
+        if column not in used and column not in out:
+            out[column] = df[column].values
+    return pd.DataFrame(out)
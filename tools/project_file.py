@@ -0,0 +1,119 @@
+"""
+Reading and writing .nmastudio project files.
+
+Version 3 files are ZIP containers (deflate) with a manifest and one section
+per store:
+
+    manifest.json              {"format": "nmastudio", "version": 3,
+                                "sections": [{"store": id, "path": ..., "bytes": n}, ...],
+                                "eager": [store ids needed by the landing results tab]}
+    stores/<store id>.json     JSON value of the store
+
+Sections are serialized and compressed one after the other straight into the
+archive, so the project is never held as one big JSON string. Tables inside
+the sections use the compact encoding of tools/storage_codec.py.
+
+On load, the stores needed by the landing results tab (EAGER_STORES) go to the
+browser inline. The tables of every other store are moved to the session
+store (tools/session_store.py) and the browser only gets handles: they are
+read and decoded when a tab first asks for them.
+
+Version 1/2 files (one JSON document) still load, with the same split.
+"""
+
+import io
+import json
+import zipfile
+
+from tools import session_store
+
+PROJECT_VERSION = 3
+MANIFEST = "manifest.json"
+ZIP_MAGIC = b"PK\x03\x04"
+
+# stores read by the data tab and forest plot shown after a project is loaded;
+# scalar stores (version, flags, names) are tiny and always inline
+EAGER_STORES = (
+    "nmastudio-version",
+    "raw_data_STORAGE",
+    "net_data_STORAGE",
+    "forest_data_STORAGE",
+    "results_ready_STORAGE",
+    "effect_modifiers_STORAGE",
+    "R_errors_STORAGE",
+    "number_outcomes_STORAGE",
+    "outcome_names_STORAGE",
+    "protocol_link_STORAGE",
+    "project_title_STORAGE",
+)
+
+
+class ProjectFileError(ValueError):
+    """The uploaded file is not a project this version of NMAstudio can read."""
+
+
+def is_container(data):
+    return data[:4] == ZIP_MAGIC
+
+
+def write_project(fileobj, project):
+    """Write ``project`` ({store id: value}) to the binary file object as a v3 container."""
+    sections = []
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for store, value in project.items():
+            path = f"stores/{store}.json"
+            with archive.open(path, "w") as raw:
+                with io.TextIOWrapper(raw, encoding="utf-8") as section:
+                    json.dump(value, section)
+            sections.append(
+                {"store": store, "path": path, "bytes": archive.getinfo(path).file_size}
+            )
+        manifest = {
+            "format": "nmastudio",
+            "version": PROJECT_VERSION,
+            "sections": sections,
+            "eager": [store for store in project if store in EAGER_STORES],
+        }
+        archive.writestr(MANIFEST, json.dumps(manifest, indent=4))
+
+
+def read_project(data):
+    """Project dict ({store id: value}) of the bytes of a .nmastudio file of any version."""
+    if not is_container(data):
+        try:
+            return json.loads(data.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ProjectFileError(f"Not a .nmastudio project file: {e}") from None
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            manifest = json.loads(archive.read(MANIFEST))
+            if manifest.get("format") != "nmastudio":
+                raise ProjectFileError("Not a .nmastudio project file")
+            if manifest.get("version", 0) > PROJECT_VERSION:
+                raise ProjectFileError(
+                    f"Project file version {manifest['version']} is newer than this NMAstudio "
+                    f"(reads up to version {PROJECT_VERSION})"
+                )
+            project = {}
+            for section in manifest["sections"]:
+                with archive.open(section["path"]) as f:
+                    project[section["store"]] = json.load(f)
+            return project
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ProjectFileError(f"Damaged .nmastudio project file: {e}") from None
+
+
+def load_project(data, session_id=None):
+    """
+    Store values of an uploaded project for the browser: eager stores inline,
+    the tables of the others in the session store of ``session_id``.
+    """
+    project = read_project(data)
+    return {
+        store: (
+            value
+            if store in EAGER_STORES
+            else session_store.externalize(session_id, value)
+        )
+        for store, value in project.items()
+    }
@@ -0,0 +1,83 @@
+"""
+Python <-> R data frame transport.
+
+When pyarrow, rpy2-arrow and the R ``arrow`` package are installed, data
+frames cross the boundary as Arrow tables: the column buffers are handed
+over as a whole (numeric columns are exposed to R as ALTREP vectors) instead
+of being copied and type-sniffed column by column by pandas2ri. Any frame
+Arrow cannot represent (e.g. object columns mixing strings and numbers) and
+any non data.frame R result fall back to the pandas2ri converter.
+"""
+
+import pandas as pd
+import rpy2.robjects as ro
+from rpy2.robjects import pandas2ri
+from rpy2.robjects.conversion import localconverter
+
+# Monkey patch for pandas 2.0+ compatibility with rpy2
+# rpy2's pandas2ri uses iteritems() which was removed in pandas 2.0
+# (only needed by the pandas2ri fallback below)
+if not hasattr(pd.DataFrame, "iteritems"):
+    pd.DataFrame.iteritems = pd.DataFrame.items
+if not hasattr(pd.Series, "iteritems"):
+    pd.Series.iteritems = pd.Series.items
+
+try:
+    import pyarrow as pa
+    import rpy2_arrow.arrow as pyra
+
+    ro.r("suppressMessages(library(arrow))")
+    _r_as_data_frame = ro.r("function(tbl) as.data.frame(tbl)")
+    _r_as_arrow_table = ro.r("function(df) arrow::Table$create(df)")
+    ARROW_TRANSPORT = True
+except Exception:  # pyarrow / rpy2-arrow / R arrow not installed
+    ARROW_TRANSPORT = False
+
+
+def is_r_data_frame(robj):
+    return isinstance(robj, ro.vectors.DataFrame)
+
+
+def is_r_list(robj):
+    return isinstance(robj, ro.vectors.ListVector) and not is_r_data_frame(robj)
+
+
+def _pandas2ri_py2r(df):
+    with localconverter(ro.default_converter + pandas2ri.converter):
+        return ro.conversion.py2rpy(df)
+
+
+def _pandas2ri_r2py(robj):
+    with localconverter(ro.default_converter + pandas2ri.converter):
+        return ro.conversion.rpy2py(robj)
+
+
+def py2r_frame(df):
+    """pandas DataFrame -> R data.frame."""
+    if ARROW_TRANSPORT:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            return _r_as_data_frame(pyra.pyarrow_table_to_r_table(table))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            pass
+    return _pandas2ri_py2r(df)
+
+
+def r2py_frame(robj):
+    """R data.frame -> pandas DataFrame (other R objects go through pandas2ri)."""
+    if ARROW_TRANSPORT and is_r_data_frame(robj):
+        try:
+            return pyra.rarrow_to_py_table(_r_as_arrow_table(robj)).to_pandas()
+        except Exception:
+            pass
+    return _pandas2ri_r2py(robj)
+
+
+def r2py_list(robj):
+    """R list of data.frames -> list of pandas DataFrames."""
+    return [r2py_frame(element) for element in robj]
+
+
+def r2py_named_list(robj):
+    """Named R list of data.frames -> dict of pandas DataFrames."""
+    return {name: r2py_frame(element) for name, element in zip(robj.names, robj)}
@@ -0,0 +1,123 @@
+"""
+Content-addressed cache of analysis results on local disk.
+
+Entries are keyed by a hash of the analysis name, the normalized net_data
+frame, the outcome index, the effect measure and the analysis options, so an
+identical analysis is computed once and then served to every session and
+every worker process of the server. The source of the code producing the
+results (CODE_SOURCES: the R functions, the NumPy engine and the Python
+post-processing of tools/utils.py) is part of the key: editing any of it
+invalidates old entries.
+
+Values (DataFrames or tuples of DataFrames) are pickled one file per entry;
+the directory is kept under its size bound by deleting the least recently
+used files first.
+
+Configuration (environment):
+    RESULT_CACHE_DIR: cache directory (default: ./__result_cache)
+    RESULT_CACHE_MB: size bound in megabytes (default: 512). 0 disables the cache.
+"""
+
+import os
+import pickle
+import hashlib
+import tempfile
+
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", "./__result_cache")
+RESULT_CACHE_MB = float(os.environ.get("RESULT_CACHE_MB", 512))
+SUFFIX = ".pkl"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# repository files whose code computes the cached results
+CODE_SOURCES = ("R_Codes/all_R_functions.R", "tools/meta_engine.py", "tools/utils.py")
+
+
+def _code_digest():
+    """Hash of the code producing the cached results, whatever the working directory."""
+    sha = hashlib.sha1()
+    for path in CODE_SOURCES:
+        with open(os.path.join(ROOT, path), "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+CODE_DIGEST = _code_digest()
+
+
+def cache_enabled():
+    return RESULT_CACHE_MB > 0
+
+
+def make_key(*parts):
+    """Stable key of an analysis: hash of its parts (strings, numbers, sorted options)."""
+    return hashlib.sha256(repr((CODE_DIGEST,) + parts).encode()).hexdigest()
+
+
+def _path(key):
+    return os.path.join(RESULT_CACHE_DIR, key + SUFFIX)
+
+
+def get(key):
+    """Cached value of ``key``, or None. A hit marks the entry as recently used."""
+    if not cache_enabled():
+        return None
+    path = _path(key)
+    try:
+        with open(path, "rb") as f:
+            value = pickle.load(f)
+        os.utime(path)
+        return value
+    except FileNotFoundError:
+        return None
+    except Exception:  # truncated or unreadable entry: drop it
+        _remove(path)
+        return None
+
+
+def put(key, value):
+    """Store ``value`` under ``key`` (atomic rename, safe across processes)."""
+    if not cache_enabled():
+        return
+    os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=RESULT_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, _path(key))
+    except Exception:
+        _remove(tmp)
+        raise
+    evict()
+
+
+def evict(max_bytes=None):
+    """Delete least recently used entries until the cache fits in ``max_bytes``."""
+    max_bytes = RESULT_CACHE_MB * 1024**2 if max_bytes is None else max_bytes
+    entries = []
+    try:
+        with os.scandir(RESULT_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+
+
+def clear():
+    evict(max_bytes=0)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,191 @@
+"""
+Server-side store of session results, referenced from the browser by handles.
+
+Analysis results used to travel as to_json(orient="split") strings inside the
+localStorage-backed dcc.Stores, so every callback taking a result store as
+Input/State uploaded megabytes. Result payloads are now written here, under
+the session_ID of consts_STORAGE, and the stores only hold small handles:
+
+    "session-store:<session_ID>/<sha1 of the payload>"
+
+Handles can replace any JSON string or compact Parquet payload (see
+tools/storage_codec.py) of a store (list entries, dict values).
+``resolve`` turns a handle back into its payload and passes every other
+value through, so legacy stores and project files with inline JSON still work.
+
+Sessions live one directory each on local disk, shared by all worker
+processes. Sessions not used for SESSION_STORE_TTL_HOURS are dropped, and the
+least recently used sessions are dropped first when the store exceeds its
+size bound.
+
+Configuration (environment):
+    SESSION_STORE_DIR: store directory (default: ./__session_store)
+    SESSION_STORE_MB: size bound in megabytes (default: 2048). 0 disables the
+                      store: results stay inline in the browser stores.
+    SESSION_STORE_TTL_HOURS: lifetime of an unused session (default: 168)
+"""
+
+import os
+import re
+import time
+import shutil
+import hashlib
+import tempfile
+
+from tools.storage_codec import is_parquet_payload
+
+SESSION_STORE_DIR = os.environ.get("SESSION_STORE_DIR", "./__session_store")
+SESSION_STORE_MB = float(os.environ.get("SESSION_STORE_MB", 2048))
+SESSION_STORE_TTL_HOURS = float(os.environ.get("SESSION_STORE_TTL_HOURS", 168))
+HANDLE_PREFIX = "session-store:"
+MIN_EXTERNAL_BYTES = 1024  # smaller payloads stay inline: a handle would not save much
+_SESSION_RE = re.compile(r"[A-Za-z0-9-]+")  # ids as written by _safe_session
+_DIGEST_RE = re.compile(r"[0-9a-f]{40}")  # sha1 hexdigest
+
+
+class SessionDataExpired(KeyError):
+    """The payload behind a handle was evicted; the analysis has to be run again."""
+
+
+def store_enabled():
+    return SESSION_STORE_MB > 0
+
+
+def is_handle(value):
+    return isinstance(value, str) and value.startswith(HANDLE_PREFIX)
+
+
+def _safe_session(session_id):
+    return "".join(c for c in str(session_id) if c.isalnum() or c == "-") or "anonymous"
+
+
+def _session_dir(session_id):
+    return os.path.join(SESSION_STORE_DIR, _safe_session(session_id))
+
+
+def _handle_path(handle):
+    """
+    Session directory and payload file of ``handle``. Handles come back from
+    the browser, so anything but a session id and a sha1 digest is refused
+    before a path is built, and the path has to stay inside the store.
+    """
+    session, _, digest = handle[len(HANDLE_PREFIX):].partition("/")
+    if not (_SESSION_RE.fullmatch(session) and _DIGEST_RE.fullmatch(digest)):
+        raise ValueError(f"Invalid session store handle: {handle[:100]!r}")
+    directory = _session_dir(session)
+    path = os.path.join(directory, digest + ".json")
+    root = os.path.realpath(SESSION_STORE_DIR)
+    if os.path.commonpath([root, os.path.realpath(path)]) != root:
+        raise ValueError(f"Invalid session store handle: {handle[:100]!r}")
+    return directory, path
+
+
+def put(session_id, payload):
+    """Store a JSON string for ``session_id`` and return its handle."""
+    digest = hashlib.sha1(payload.encode()).hexdigest()
+    directory = _session_dir(session_id)
+    path = os.path.join(directory, digest + ".json")
+    os.makedirs(directory, exist_ok=True)
+    if not os.path.exists(path):
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except Exception:
+            _remove(tmp)
+            raise
+    os.utime(directory)
+    return f"{HANDLE_PREFIX}{_safe_session(session_id)}/{digest}"
+
+
+def get(handle):
+    """JSON string behind ``handle``; raises SessionDataExpired once it was evicted."""
+    directory, path = _handle_path(handle)
+    try:
+        with open(path, encoding="utf-8") as f:
+            payload = f.read()
+    except FileNotFoundError:
+        raise SessionDataExpired(
+            "The stored analysis results have expired. Please run the analysis again."
+        ) from None
+    os.utime(directory)  # the session is in use
+    return payload
+
+
+def resolve(value):
+    """JSON string of a store entry: handles are read back, anything else is returned as is."""
+    return get(value) if is_handle(value) else value
+
+
+def resolve_all(value):
+    """``value`` with every handle inside (nested lists and dicts) replaced by its JSON string."""
+    if isinstance(value, list):
+        return [resolve_all(v) for v in value]
+    if isinstance(value, dict):
+        return {k: resolve_all(v) for k, v in value.items()}
+    return resolve(value)
+
+
+def externalize(session_id, value):
+    """
+    Store value for the browser: every JSON payload inside (nested lists and
+    dicts) is written to the session store and replaced by its handle.
+    """
+    if not store_enabled() or not session_id:
+        return value
+    value = _externalize(session_id, value)
+    evict()
+    return value
+
+
+def _externalize(session_id, value):
+    if isinstance(value, list):
+        return [_externalize(session_id, v) for v in value]
+    if isinstance(value, dict):
+        return {k: _externalize(session_id, v) for k, v in value.items()}
+    if (
+        isinstance(value, str)
+        and len(value) >= MIN_EXTERNAL_BYTES
+        and (value[:1] in "{[" or is_parquet_payload(value))
+    ):
+        return put(session_id, value)
+    return value
+
+
+def evict(max_bytes=None, ttl_hours=None):
+    """Drop expired sessions, then least recently used ones until the store fits in ``max_bytes``."""
+    max_bytes = SESSION_STORE_MB * 1024**2 if max_bytes is None else max_bytes
+    ttl_hours = SESSION_STORE_TTL_HOURS if ttl_hours is None else ttl_hours
+    sessions = []
+    try:
+        with os.scandir(SESSION_STORE_DIR) as it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                try:
+                    with os.scandir(entry.path) as files:
+                        size = sum(f.stat().st_size for f in files)
+                    sessions.append((entry.stat().st_mtime, size, entry.path))
+                except FileNotFoundError:
+                    continue
+    except FileNotFoundError:
+        return
+    expired_before = time.time() - ttl_hours * 3600
+    total = sum(size for _, size, _ in sessions)
+    for mtime, size, path in sorted(sessions):
+        if total <= max_bytes and mtime >= expired_before:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+def clear():
+    evict(max_bytes=0)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -7,8 +7,13 @@ This replaces the hardcoded CSV file loading with dynamic data from the user's p
 
 import pandas as pd
 import numpy as np
-from io import StringIO
-from tools.utils import get_net_data_json, get_league_table_data_list
+from tools.utils import (
+    get_net_data_json,
+    get_league_table_data_list,
+    get_outcome_json,
+    get_outcome_frame,
+    read_storage_frame,
+)
 
 
 def get_skt_final_data(forest_data_storage, net_split_data_storage, outcome_idx=0):
@@ -30,23 +35,26 @@ def get_skt_final_data(forest_data_storage, net_split_data_storage, outcome_idx=
         return pd.DataFrame()
 
     # Load forest data for the outcome
-    forest_json = forest_data_storage[outcome_idx]
+    forest_json = get_outcome_json(forest_data_storage, outcome_idx)
     if not forest_json:
         return pd.DataFrame()
 
-    forest_df = pd.read_json(StringIO(forest_json), orient="split")
+    forest_df = read_storage_frame(forest_json)
 
     # Load netsplit data if available
     if net_split_data_storage and len(net_split_data_storage) > outcome_idx:
-        netsplit_json = net_split_data_storage[outcome_idx]
+        netsplit_json = get_outcome_json(net_split_data_storage, outcome_idx)
         if netsplit_json:
-            netsplit_df = pd.read_json(StringIO(netsplit_json), orient="split")
+            netsplit_df = read_storage_frame(netsplit_json)
 
             # Parse comparison column to get Treatment and Reference
             if "comparison" in netsplit_df.columns:
-                netsplit_df[["Treatment", "Reference"]] = netsplit_df[
-                    "comparison"
-                ].str.split(":", expand=True)
+                netsplit_df[["Treatment", "Reference"]] = (
+                    netsplit_df["comparison"]
+                    .astype(str)
+                    .str.split(":", expand=True)
+                    .reindex(columns=[0, 1], fill_value="")
+                )
 
             # Helper function to parse CI strings like "0.6 (0.51, 0.71)"
             def parse_ci_string(s):
@@ -133,11 +141,11 @@ def get_skt_pairwise_data(forest_data_prws_storage, outcome_idx=0):
     if not forest_data_prws_storage or len(forest_data_prws_storage) <= outcome_idx:
         return pd.DataFrame()
 
-    prws_json = forest_data_prws_storage[outcome_idx]
+    prws_json = get_outcome_json(forest_data_prws_storage, outcome_idx)
     if not prws_json:
         return pd.DataFrame()
 
-    return pd.read_json(StringIO(prws_json), orient="split")
+    return read_storage_frame(prws_json)
 
 
 def get_skt_ranking_data(ranking_data_storage, outcome_idx=0):
@@ -154,11 +162,11 @@ def get_skt_ranking_data(ranking_data_storage, outcome_idx=0):
     if not ranking_data_storage or len(ranking_data_storage) <= outcome_idx:
         return pd.DataFrame()
 
-    ranking_json = ranking_data_storage[outcome_idx]
+    ranking_json = get_outcome_json(ranking_data_storage, outcome_idx)
     if not ranking_json:
         return pd.DataFrame()
 
-    return pd.read_json(StringIO(ranking_json), orient="split")
+    return read_storage_frame(ranking_json)
 
 
 def get_skt_cinema_data(cinema_net_data_storage, outcome_idx=0):
@@ -179,7 +187,7 @@ def get_skt_cinema_data(cinema_net_data_storage, outcome_idx=0):
     if not cinema_json:
         return pd.DataFrame()
 
-    return pd.read_json(StringIO(cinema_json), orient="split")
+    return read_storage_frame(cinema_json)
 
 
 def get_skt_network_data(net_data_storage):
@@ -199,7 +207,7 @@ def get_skt_network_data(net_data_storage):
     if not json_str:
         return pd.DataFrame()
 
-    return pd.read_json(StringIO(json_str), orient="split")
+    return read_storage_frame(json_str)
 
 
 def get_skt_league_table(league_table_data_storage, outcome_idx=0):
@@ -225,7 +233,7 @@ def get_skt_league_table(league_table_data_storage, outcome_idx=0):
     if not league_json:
         return pd.DataFrame()
 
-    return pd.read_json(StringIO(league_json), orient="split")
+    return read_storage_frame(league_json)
 
 
 def get_skt_two_outcome_data(
@@ -251,11 +259,11 @@ def get_skt_two_outcome_data(
         return pd.DataFrame()
 
     # Load first outcome forest data
-    forest1_json = forest_data_storage[0]
+    forest1_json = get_outcome_json(forest_data_storage, 0)
     if not forest1_json:
         return pd.DataFrame()
 
-    df1 = pd.read_json(StringIO(forest1_json), orient="split")
+    df1 = read_storage_frame(forest1_json)
 
     # Ensure required columns exist
     required_cols = ["Treatment", "Reference", "RR", "CI_lower", "CI_upper"]
@@ -268,7 +276,7 @@ def get_skt_two_outcome_data(
 
     # Add second outcome if available
     if len(forest_data_storage) >= 2 and forest_data_storage[1]:
-        df2 = pd.read_json(StringIO(forest_data_storage[1]), orient="split")
+        df2 = get_outcome_frame(forest_data_storage, 1)
         if "treat1" in df2.columns:
             df2 = df2.rename(columns={"treat1": "Treatment", "treat2": "Reference"})
 
@@ -292,7 +300,7 @@ def get_skt_two_outcome_data(
     if cinema_net_data_storage:
         for i, cinema_json in enumerate(cinema_net_data_storage[:2]):
             if cinema_json:
-                cinema_df = pd.read_json(StringIO(cinema_json), orient="split")
+                cinema_df = read_storage_frame(cinema_json)
                 suffix = "" if i == 0 else "_out2"
                 col_name = f"Certainty_out{i + 1}"
 
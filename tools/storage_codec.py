@@ -0,0 +1,101 @@
+"""
+Encoding of DataFrames kept in the dcc.Stores and in .nmastudio project files.
+
+Two payload formats are understood:
+
+    '{"columns": [...], "index": [...], "data": [...]}'   to_json(orient="split"), legacy
+    'parquet+b64:<base64 of a zstd-compressed Parquet file>'
+
+New payloads use Parquet when pyarrow is installed and the Parquet payload is
+the smaller one: large numeric result tables (forest, funnel, netsplit) shrink
+and keep their dtypes and index exactly, while small tables, where the Parquet
+footer outweighs the data, stay JSON. Frames Parquet cannot hold (mixed-type
+object columns, non-string column names) also stay JSON. Decoding accepts both,
+so stores and project files written before stay valid.
+
+Configuration (environment):
+    STORE_ENCODING: "parquet" (default) or "json"
+"""
+
+import os
+import io
+import base64
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+STORE_ENCODING = os.environ.get("STORE_ENCODING", "parquet").lower()
+PARQUET_PREFIX = "parquet+b64:"
+
+
+def compact_encoding_enabled():
+    return STORE_ENCODING == "parquet" and PARQUET_AVAILABLE
+
+
+def is_parquet_payload(value):
+    return isinstance(value, str) and value.startswith(PARQUET_PREFIX)
+
+
+def is_frame_payload(value):
+    """True for strings holding an encoded DataFrame (either format)."""
+    return is_parquet_payload(value) or (
+        isinstance(value, str) and value.startswith('{"columns":')
+    )
+
+
+def encode_frame(df):
+    """Store payload of ``df``: the smaller of compact Parquet (when enabled) and to_json(orient="split")."""
+    payload = df.to_json(orient="split")
+    if compact_encoding_enabled():
+        try:
+            buffer = io.BytesIO()
+            df.to_parquet(buffer, engine="pyarrow", compression="zstd")
+            compact = PARQUET_PREFIX + base64.b64encode(buffer.getvalue()).decode("ascii")
+        except Exception as e:  # ValueError, pyarrow.ArrowInvalid, ...
+            print(f"Parquet store encoding failed, using JSON: {e}")
+        else:
+            if len(compact) < len(payload):
+                return compact
+    return payload
+
+
+def decode_frame(payload):
+    """DataFrame of a store payload in either format."""
+    if is_parquet_payload(payload):
+        raw = base64.b64decode(payload[len(PARQUET_PREFIX):])
+        return pd.read_parquet(io.BytesIO(raw), engine="pyarrow")
+    return pd.read_json(io.StringIO(payload), orient="split")
+
+
+def to_json_payload(payload):
+    """to_json(orient="split") string of a payload (for code that needs the JSON itself)."""
+    if is_parquet_payload(payload):
+        return decode_frame(payload).to_json(orient="split")
+    return payload
+
+
+def compact_payload(payload):
+    """Re-encode a legacy JSON payload compactly; anything else is returned unchanged."""
+    if not compact_encoding_enabled() or not is_frame_payload(payload) or is_parquet_payload(payload):
+        return payload
+    try:
+        frame = decode_frame(payload)
+    except ValueError:
+        return payload
+    compact = encode_frame(frame)
+    return compact if is_parquet_payload(compact) else payload
+
+
+def compact_all(value):
+    """``value`` with every JSON frame payload inside (nested lists and dicts) re-encoded compactly."""
+    if isinstance(value, list):
+        return [compact_all(v) for v in value]
+    if isinstance(value, dict):
+        return {k: compact_all(v) for k, v in value.items()}
+    return compact_payload(value)
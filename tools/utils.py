@@ -1,16 +1,12 @@
 import os, shutil, pickle, base64, io
 import string
 import random
+import hashlib
+import threading
+from collections import OrderedDict
 from pandas.api.types import is_numeric_dtype
 import pandas as pd
 
-# Monkey patch for pandas 2.0+ compatibility with rpy2
-# rpy2's pandas2ri uses iteritems() which was removed in pandas 2.0
-if not hasattr(pd.DataFrame, "iteritems"):
-    pd.DataFrame.iteritems = pd.DataFrame.items
-if not hasattr(pd.Series, "iteritems"):
-    pd.Series.iteritems = pd.Series.items
-
 # from tools.PATHS import __SESSIONS_FOLDER, YESTERDAY
 from assets.effect_sizes import *
 
@@ -28,6 +24,21 @@ from rpy2.robjects.conversion import localconverter
 
 import rpy2.robjects.packages as rpackages
 from rpy2.robjects.vectors import StrVector
+from tools import result_cache
+from tools.session_store import resolve as resolve_store_entry, is_handle as is_store_handle
+from tools.storage_codec import decode_frame
+from tools.pairwise_conversion import long_to_pairwise, contrast_to_pairwise
+from tools.network_summary import CMAP, summarize_network
+from tools.graph_stats import network_statistics
+from tools.league_tables import compose_league_table_both
+from tools.network_layout import layout_positions
+from tools.r_transport import (
+    py2r_frame,
+    r2py_frame,
+    r2py_list,
+    r2py_named_list,
+    is_r_list,
+)
 
 
 # utils = rpackages.importr('base')
@@ -55,15 +66,10 @@ r = ro.r
 r["source"]("R_Codes/all_R_functions.R")  # Loading the function we have defined in R.
 run_NetMeta_r = ro.globalenv["run_NetMeta_new"]  # Get run_NetMeta from R
 league_table_r = ro.globalenv["league_rank_new"]  # Get league_table from R
-league_table_r_both = ro.globalenv["league_both"]  # Get league_table_both from R
 pairwise_forest_r = ro.globalenv["pairwise_forest_new"]  # Get pairwise_forest from R
 funnel_plot_r = ro.globalenv["funnel_funct_new"]  # Get pairwise_forest from R
-run_pairwise_data_long_r = ro.globalenv[
-    "get_pairwise_data_long_new"
-]  # Get pairwise data from long format from R
-run_pairwise_data_contrast_r = ro.globalenv[
-    "get_pairwise_data_contrast_new"
-]  # Get pairwise data from contrast format from R
+nma_bundle_r = ro.globalenv["nma_bundle_new"]  # Get the single-fit NMA bundle from R
+netsplit_r = ro.globalenv["netsplit_new"]  # Get the node-splitting tables from R
 
 
 ## read R console for printing errors
@@ -98,87 +104,73 @@ def _process_rob_column(df):
     return df
 
 
+def _r_result_to_py(func_r_res):
+    """R data.frame -> DataFrame with a clean index; R lists are returned as is."""
+    if is_r_list(func_r_res):
+        return func_r_res
+    r_result = r2py_frame(func_r_res)
+    if hasattr(r_result, "reset_index"):
+        return r_result.reset_index(drop=True)
+    return r_result
+
+
 def apply_r_func(func, df):
     """Apply R function with proper conversion context for threading."""
     df = _process_rob_column(df)
 
-    # Convert DataFrame to R object
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        df_r = ro.conversion.py2rpy(df.reset_index(drop=True))
+    # Convert DataFrame to R object (Arrow when available, pandas2ri otherwise)
+    df_r = py2r_frame(df.reset_index(drop=True))
 
-    # Call R function (outside converter context to avoid recursion issues)
     func_r_res = func(dat=df_r)
-    r_result = pandas2ri.rpy2py(func_r_res)
 
-    if isinstance(r_result, ro.vectors.ListVector):
-        # Convert list elements with proper converter context
-        with localconverter(ro.default_converter + pandas2ri.converter):
-            leaguetable, pscores, consist, netsplit, netsplit_all = (
-                ro.conversion.rpy2py(rf) for rf in r_result
-            )
+    if is_r_list(func_r_res):
+        leaguetable, pscores, consist, netsplit, netsplit_all = r2py_list(func_r_res)
         return leaguetable, pscores, consist, netsplit, netsplit_all
-    else:
-        # r_result should be a pandas DataFrame after conversion
-        if hasattr(r_result, "reset_index"):
-            return r_result.reset_index(drop=True)
-        else:
-            return r_result
+    return _r_result_to_py(func_r_res)
 
 
 def apply_r_func_new(func, df, i):
     """Apply R function with outcome index and proper conversion context."""
     df = _process_rob_column(df)
 
-    # Convert DataFrame to R object
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        df_r = ro.conversion.py2rpy(df.reset_index(drop=True))
+    # Convert DataFrame to R object (Arrow when available, pandas2ri otherwise)
+    df_r = py2r_frame(df.reset_index(drop=True))
 
-    # Call R function (outside converter context to avoid recursion issues)
     func_r_res = func(dat=df_r, i=i)
-    r_result = pandas2ri.rpy2py(func_r_res)
 
-    if isinstance(r_result, ro.vectors.ListVector):
-        # Convert list elements with proper converter context
-        with localconverter(ro.default_converter + pandas2ri.converter):
-            leaguetable, pscores, consist, netsplit, netsplit_all = (
-                ro.conversion.rpy2py(rf) for rf in r_result
-            )
+    if is_r_list(func_r_res):
+        leaguetable, pscores, consist, netsplit, netsplit_all = r2py_list(func_r_res)
         return leaguetable, pscores, consist, netsplit, netsplit_all
-    else:
-        # r_result should be a pandas DataFrame after conversion
-        if hasattr(r_result, "reset_index"):
-            return r_result.reset_index(drop=True)
-        else:
-            return r_result
+    return _r_result_to_py(func_r_res)
 
 
 def apply_r_func_new_lt(func, df, i, j):
     """Apply R function for league table with proper conversion context."""
     df = _process_rob_column(df)
 
-    # Convert DataFrame to R object
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        df_r = ro.conversion.py2rpy(df.reset_index(drop=True))
+    # Convert DataFrame to R object (Arrow when available, pandas2ri otherwise)
+    df_r = py2r_frame(df.reset_index(drop=True))
 
-    # Call R function (outside converter context to avoid recursion issues)
     func_r_res = func(dat=df_r, i=i, j=j)
-    r_result = pandas2ri.rpy2py(func_r_res)
 
-    if isinstance(r_result, ro.vectors.ListVector):
-        # Convert list elements with proper converter context
-        with localconverter(ro.default_converter + pandas2ri.converter):
-            leaguetable = [ro.conversion.rpy2py(rf) for rf in r_result]
+    if is_r_list(func_r_res):
+        leaguetable = r2py_list(func_r_res)
         # If it's a list of DataFrames, ensure they're properly converted
         if len(leaguetable) > 0 and isinstance(leaguetable[0], pd.DataFrame):
             # For league table with 2 outcomes, return the combined table (usually the last one)
             return leaguetable[-1]
         return leaguetable
-    else:
-        # r_result should be a pandas DataFrame after conversion
-        if hasattr(r_result, "reset_index"):
-            return r_result.reset_index(drop=True)
-        else:
-            return r_result
+    return _r_result_to_py(func_r_res)
+
+
+def apply_r_func_new_bundle(func, df, i):
+    """Apply R function returning a named list of data frames (one netmeta fit)."""
+    df = _process_rob_column(df)
+
+    # Convert DataFrame to R object (Arrow when available, pandas2ri otherwise)
+    df_r = py2r_frame(df.reset_index(drop=True))
+
+    return r2py_named_list(func(dat=df_r, i=i))
 
 
 # def apply_r_func_two_outcomes(func, df):
@@ -204,40 +196,33 @@ def apply_r_func_new_lt(func, df, i, j):
 def apply_r_func_two_outcomes(func, df, num_outcomes):
     """
     Apply R function with proper conversion context for threading.
-    Ensures pandas2ri conversion works in Dash callback threads.
+    Ensures the R <-> pandas conversion works in Dash callback threads.
     """
     df = _process_rob_column(df)
 
-    # Use localconverter for thread-safe conversion
-    with localconverter(ro.default_converter + pandas2ri.converter):
-        df_r = ro.conversion.py2rpy(df.reset_index(drop=True))
-        func_r_res = func(dat=df_r, num_outcome=num_outcomes)
-        r_result = ro.conversion.rpy2py(func_r_res)
-
-        if isinstance(r_result, ro.vectors.ListVector):
-            # Convert all list elements while still in context
-            leaguetable = ro.conversion.rpy2py(r_result[0])
-            pscores = ro.conversion.rpy2py(r_result[1])
-            consist = ro.conversion.rpy2py(r_result[2])
-            netsplit = ro.conversion.rpy2py(r_result[3])
-            netsplit2 = ro.conversion.rpy2py(r_result[4])
-            netsplit_all = ro.conversion.rpy2py(r_result[5])
-            netsplit_all2 = ro.conversion.rpy2py(r_result[6])
-            return (
-                leaguetable,
-                pscores,
-                consist,
-                netsplit,
-                netsplit2,
-                netsplit_all,
-                netsplit_all2,
-            )
-        else:
-            # r_result should be a pandas DataFrame after conversion
-            if hasattr(r_result, "reset_index"):
-                return r_result.reset_index(drop=True)
-            else:
-                return r_result
+    df_r = py2r_frame(df.reset_index(drop=True))
+    func_r_res = func(dat=df_r, num_outcome=num_outcomes)
+
+    if is_r_list(func_r_res):
+        (
+            leaguetable,
+            pscores,
+            consist,
+            netsplit,
+            netsplit2,
+            netsplit_all,
+            netsplit_all2,
+        ) = r2py_list(func_r_res)[:7]
+        return (
+            leaguetable,
+            pscores,
+            consist,
+            netsplit,
+            netsplit2,
+            netsplit_all,
+            netsplit_all2,
+        )
+    return _r_result_to_py(func_r_res)
 
 
 # ----------------------------------------------------------------------------------
@@ -281,19 +266,6 @@ def set_slider_marks(y_min, y_max, years):
 
 
 ## ----------------------------  NETWORK FUNCTION --------------------------------- ##
-CMAP = [
-    "bisque",
-    "gold",
-    "light blue",
-    "tomato",
-    "orange",
-    "olivedrab",
-    "darkslategray",
-    "orchid",
-    "brown",
-    "navy",
-    "palegreen",
-]
 # CMAP = px.colors.qualitative.Light24
 
 
@@ -443,247 +415,226 @@ def get_network(df):
     return cy_edges + cy_nodes
 
 
-def get_network_new(df, i):
-    num_classes = None
-    df = df.dropna(subset=[f"TE{i + 1}", f"seTE{i + 1}"])
-    # print(df.columns)
-    treat1_class = "treat_class1"
-    treat2_class = "treat_class2"
+def get_network_new(df, i, positions=None):
+    """Cytoscape elements of the network of outcome i (see tools/network_summary.py)."""
+    return summarize_network(df, i).elements(positions)
 
-    if treat1_class and treat2_class in df.columns:
-        df_treat = pd.concat(
-            [df.treat1.dropna(), df.treat2.dropna()], ignore_index=True
-        )
-        df_class = pd.concat(
-            [df.treat_class1.dropna(), df.treat_class2.dropna()], ignore_index=True
-        )
-        long_df_class = pd.concat([df_treat, df_class], axis=1).reset_index(drop=True)
-        long_df_class = long_df_class.rename(
-            {long_df_class.columns[0]: "treat", long_df_class.columns[1]: "class"},
-            axis="columns",
-        )
-        if not is_numeric_dtype(long_df_class.columns[1]):
-            long_df_class["class_codes"] = (
-                long_df_class["class"].astype("category").cat.codes
-            )
-            long_df_class = long_df_class.rename(
-                {
-                    long_df_class.columns[0]: "treat",
-                    long_df_class.columns[1]: "class_names",
-                    long_df_class.columns[2]: "class",
-                },
-                axis="columns",
-            )
-        all_nodes_class = (
-            long_df_class.drop_duplicates()
-            .sort_values(by="treat")
-            .reset_index(drop=True)
-        )
-        num_classes = all_nodes_class["class"].max() + 1
-    sorted_edges = np.sort(df[["treat1", "treat2"]], axis=1)  ## removes directionality
-    df.loc[:, ["treat1", "treat2"]] = sorted_edges
-    edges = df.groupby(["treat1", "treat2"])[f"TE{i + 1}"].count().reset_index()
-    df_n1g = df.rename(columns={"treat1": "treat", f"n1{i + 1}": "n"}).groupby(
-        ["treat"]
-    )
-    df_n2g = df.rename(columns={"treat2": "treat", f"n2{i + 1}": "n"}).groupby(
-        ["treat"]
+
+## networks of a dataset: built once per (net_data payload, outcome) for all callbacks
+NETWORK_CACHE_SIZE = int(os.environ.get("NETWORK_CACHE_SIZE", 16))
+# networks of at least this many treatments are laid out on the server (0 = never)
+NETWORK_LAYOUT_MIN_NODES = int(os.environ.get("NETWORK_LAYOUT_MIN_NODES", 40))
+_NETWORK_CACHE = OrderedDict()
+_NETWORK_CACHE_LOCK = threading.Lock()
+
+
+def _cached_network(net_data_storage, i, kind, build):
+    # build(df) on the net_data frame of the store, kept in a bounded LRU shared by all sessions
+    payload = get_net_data_json(net_data_storage)
+    key = (_frame_cache_key(payload), i, kind) if isinstance(payload, str) else None
+    if key is not None:
+        with _NETWORK_CACHE_LOCK:
+            value = _NETWORK_CACHE.get(key)
+            if value is not None:
+                _NETWORK_CACHE.move_to_end(key)
+                return value
+
+    value = build(read_storage_frame(payload))
+    if key is not None and NETWORK_CACHE_SIZE > 0:
+        with _NETWORK_CACHE_LOCK:
+            _NETWORK_CACHE[key] = value
+            while len(_NETWORK_CACHE) > NETWORK_CACHE_SIZE:
+                _NETWORK_CACHE.popitem(last=False)
+    return value
+
+
+def get_network_summary(net_data_storage, i):
+    """NetworkSummary of outcome i of net_data_STORAGE (see tools/network_summary.py), cached."""
+    return _cached_network(
+        net_data_storage, i, "summary", lambda df: summarize_network(df, i)
     )
-    df_n1, df_n2 = df_n1g.n.sum(), df_n2g.n.sum()
-    all_nodes_sized = df_n1.add(df_n2, fill_value=0)
 
-    # Handle rob column - only process if it exists and has non-NaN values
-    if "rob" in df.columns and not df["rob"].isna().all():
-        df_n1, df_n2 = df_n1g.rob.value_counts(), df_n2g.rob.value_counts()
-        all_nodes_robs = (
-            df_n1.add(df_n2, fill_value=0)
-            .rename(("count"))
-            .unstack("rob", fill_value=0)
-        )
-        all_nodes_sized = pd.concat(
-            [all_nodes_sized, all_nodes_robs], axis=1
-        ).reset_index()
-    else:
-        all_nodes_sized = all_nodes_sized.reset_index()
 
-    if treat1_class and treat2_class in df.columns:
-        all_nodes_sized = pd.concat(
-            [all_nodes_sized, all_nodes_class["class"]], axis=1
-        ).reset_index(drop=True)
+def get_network_statistics(net_data_storage, i=None):
+    """
+    Topology statistics of the network of outcome i of net_data_STORAGE
+    (see tools/graph_stats.py); i=None: every comparison. Cached like get_network_summary.
+    """
+    return _cached_network(
+        net_data_storage, i, "statistics",
+        lambda df: network_statistics(summarize_network(df, i)),
+    )
 
-    # Only process rob columns if rob data exists
-    has_rob_data = "rob" in df.columns and not df["rob"].isna().all()
-
-    if has_rob_data and len(all_nodes_sized.columns) > 2:
-        if isinstance(all_nodes_sized.columns[2], str):
-            for c in {"1", "2", "3"}.difference(all_nodes_sized):
-                all_nodes_sized[c] = 0
-        elif all_nodes_sized.columns[2] in {1, 2, 3}:
-            for c in {1, 2, 3}.difference(all_nodes_sized):
-                all_nodes_sized[c] = 0
-        elif all_nodes_sized.columns[2] in {1.0, 2.0, 3.0}:
-            for c in {1.0, 2.0, 3.0}.difference(all_nodes_sized):
-                all_nodes_sized[c] = 0
-
-        # all_nodes_robs was only created if has_rob_data is True
-        all_nodes_robs.drop(
-            columns=[
-                col
-                for col in all_nodes_robs
-                if col not in [1.0, 2.0, 3.0, 1, 2, 3, "1", "2", "3"]
-            ],
-            inplace=True,
-        )
 
-    all_nodes_sized.drop(
-        columns=[
-            col
-            for col in all_nodes_sized
-            if col not in ["treat", "n", "class", 1.0, 2.0, 3.0, 1, 2, 3, "1", "2", "3"]
-        ],
-        inplace=True,
+def get_network_layout(net_data_storage):
+    """
+    Preset node positions {treatment: {"x", "y"}} of the network of all
+    comparisons of net_data_STORAGE (see tools/network_layout.py), or None
+    below NETWORK_LAYOUT_MIN_NODES treatments. Cached like get_network_summary.
+    """
+    summary = get_network_summary(net_data_storage, None)
+    if not NETWORK_LAYOUT_MIN_NODES or len(summary.treatments) < NETWORK_LAYOUT_MIN_NODES:
+        return None
+    return _cached_network(
+        net_data_storage, None, "layout", lambda df: layout_positions(summary)
     )
-    # all_nodes_sized['n_2'] = all_nodes_sized['n']
-    min_size = min(all_nodes_sized["n"])
-    max_size = max(all_nodes_sized["n"])
 
-    # Calculate the range of 'size'
-    size_range = max_size - min_size
 
-    # Normalize the values in 'size' to the range of 10 to 60
-    if size_range == 0:
-        # Assign a default normalized size if all values are identical
-        normalized_size = [
-            1.0 for _ in all_nodes_sized.n
-        ]  # or any other constant value
-    else:
-        # Perform normalization
-        normalized_size = [(s - min_size) / size_range for s in all_nodes_sized.n]
+def network_year_snapshots(net_data_storage, i):
+    """
+    Cumulative network of outcome i for every distinct study year:
+    (years, elements) with elements[k] the get_network_new elements of the
+    studies published up to years[k]. Without a year column there is a single
+    snapshot of all studies, for year inf. Nodes keep the positions of
+    get_network_layout in every snapshot. Cached like get_network_summary.
+    """
+    positions = get_network_layout(net_data_storage)
+
+    def build(df):
+        df = df.dropna(subset=[f"TE{i + 1}", f"seTE{i + 1}"])
+        if "year" not in df.columns:
+            return (np.inf,), [get_network_new(df=df, i=i, positions=positions)]
+        year = pd.to_numeric(df["year"], errors="coerce")
+        years = tuple(np.sort(year.dropna().unique()).tolist())
+        return years, [
+            get_network_new(df=df[year <= y], i=i, positions=positions) for y in years
+        ]
 
-    number = [int(n * 60) + 20 for n in normalized_size]
-    all_nodes_sized["n_2"] = number
+    return _cached_network(net_data_storage, i, "years", build)
 
-    cy_edges = [
-        {
-            "data": {
-                "source": source,
-                "target": target,
-                "weight": weight * 1
-                if (len(edges) < 100 and len(edges) > 13)
-                else weight * 0.75
-                if len(edges) < 13
-                else weight * 0.7,
-                "weight_lab": weight,
-            }
-        }
-        for source, target, weight in edges.values
-    ]
-    # max_trsfrmd_size_nodes = np.sqrt(all_nodes_sized.iloc[:,1].max()) / 70
-    # node_size = float(node_size) if node_size is not None else 0
 
-    # Create cy_nodes with or without rob data
-    has_rob_data = "rob" in df.columns and not df["rob"].isna().all()
+def _element_key(element):
+    data = element["data"]
+    return data["id"] if "id" in data else (data["source"], data["target"])
 
-    if treat1_class and treat2_class in df.columns:
-        if has_rob_data:
-            cy_nodes = [
-                {
-                    "data": {
-                        "id": target,
-                        "label": target,
-                        "n_class": num_classes,
-                        "size": n2,
-                        "pie1": r1 / (r1 + r2 + r3) if not r1 + r2 + r3 == 0 else None,
-                        "pie2": r2 / (r1 + r2 + r3) if not r1 + r2 + r3 == 0 else None,
-                        "pie3": r3 / (r1 + r2 + r3) if not r1 + r2 + r3 == 0 else None,
-                    },
-                    "classes": f"{CMAP[cls]}",
-                }
-                for target, size, r1, r2, r3, cls, n2 in all_nodes_sized.values
-            ]
-        else:
-            cy_nodes = [
-                {
-                    "data": {
-                        "id": target,
-                        "label": target,
-                        "n_class": num_classes,
-                        "size": n2,
-                    },
-                    "classes": f"{CMAP[cls]}",
-                }
-                for target, size, cls, n2 in all_nodes_sized.values
-            ]
-    else:
-        if has_rob_data:
-            cy_nodes = [
-                {
-                    "data": {
-                        "id": target,
-                        "label": target,
-                        "classes": "genesis",
-                        "size": n2,
-                        "pie1": r1 / (r1 + r2 + r3) if not r1 + r2 + r3 == 0 else None,
-                        "pie2": r2 / (r1 + r2 + r3) if not r1 + r2 + r3 == 0 else None,
-                        "pie3": r3 / (r1 + r2 + r3) if not r1 + r2 + r3 == 0 else None,
-                    },
-                }
-                for target, size, r1, r2, r3, n2 in all_nodes_sized.values
-            ]
-        else:
-            cy_nodes = [
-                {
-                    "data": {
-                        "id": target,
-                        "label": target,
-                        "classes": "genesis",
-                        "size": n2,
-                    },
-                }
-                for target, size, n2 in all_nodes_sized.values
-            ]
 
-    return cy_edges + cy_nodes
+def get_network_timeline(net_data_storage, i):
+    """
+    Year slider data of outcome i, sent to the browser once per dataset and
+    outcome: [{"year", "rank", "element"}] in year order, one entry per
+    element of network_year_snapshots each time it appears or changes (year
+    None without a year column: always shown). Keeping the last version of
+    every element up to a year, ordered by rank, gives the snapshot of that
+    year (networkUpToYear in assets/clientside.js). Cached like get_network_summary.
+    """
+    def build(df):
+        years, snapshots = network_year_snapshots(net_data_storage, i)
+        if not snapshots:
+            return []
+        rank = {_element_key(el): r for r, el in enumerate(snapshots[-1])}
+        timeline, current = [], {}
+        for year, elements in zip(years, snapshots):
+            for el in elements:
+                key = _element_key(el)
+                if current.get(key) != el:
+                    current[key] = el
+                    timeline.append({
+                        "year": None if year == np.inf else year,
+                        "rank": rank[key],
+                        "element": el,
+                    })
+        return timeline
+
+    return _cached_network(net_data_storage, i, "timeline", build)
 
 
 ## ---------------------------  Parse DATA  -------------------------------- ##
 
 
+## parsed uploads: each uploaded file is parsed once for all setup callbacks
+UPLOAD_CACHE_SIZE = int(os.environ.get("UPLOAD_CACHE_SIZE", 8))
+_UPLOAD_CACHE = OrderedDict()
+_UPLOAD_CACHE_LOCK = threading.Lock()
+CSV_MISSING_VALUES = ["n/a", "na", "--", ".", "missing", "NA", "NAN", "None", "", " "]
+CSV_DELIMITERS = [",", ";", "\t"]  # comma, semicolon, tab
+CSV_SNIFF_BYTES = 64 * 1024
+
+
 def parse_contents(contents, filename):
-    content_type, content_string = contents.split(",")
-    decoded = base64.b64decode(content_string)
-    missing_values = ["n/a", "na", "--", ".", "missing", "NA", "NAN", "None", "", " "]
-    if "csv" in filename:  # Assume that the user uploaded a CSV file
-        # Try different encodings and delimiters
-        encodings = ["utf-8", "unicode-escape", "ISO-8859-1"]
-        delimiters = [",", ";", "\t"]  # comma, semicolon, tab
-
-        for encoding in encodings:
-            for delimiter in delimiters:
-                try:
-                    df = pd.read_csv(
-                        io.StringIO(decoded.decode(encoding, errors="ignore")),
-                        na_values=missing_values,
-                        sep=delimiter,
-                    )
-                    # Check if parsing was successful (more than 1 column usually means correct delimiter)
-                    if len(df.columns) > 1:
-                        return df
-                except Exception:
-                    continue
-
-        # Fallback: try with default settings
+    """
+    DataFrame of an uploaded file (dcc.Upload contents).
+
+    The setup wizard parses the same upload from many callbacks, so parsed
+    files are kept in a small LRU keyed by the content. A copy is returned.
+    """
+    if "csv" in filename:
+        kind = "csv"
+    elif "xls" in filename:
+        kind = "xls"
+    else:
+        return None
+    key = (kind, len(contents), hash(contents))
+    with _UPLOAD_CACHE_LOCK:
+        df = _UPLOAD_CACHE.get(key)
+        if df is not None:
+            _UPLOAD_CACHE.move_to_end(key)
+    if df is None:
+        decoded = base64.b64decode(contents.split(",")[1])
+        if kind == "csv":  # Assume that the user uploaded a CSV file
+            df = _read_csv_upload(decoded)
+        else:  # TODO: add xls options: so far this is not working
+            df = pd.read_excel(io.BytesIO(decoded))
+        if UPLOAD_CACHE_SIZE > 0:
+            with _UPLOAD_CACHE_LOCK:
+                _UPLOAD_CACHE[key] = df
+                while len(_UPLOAD_CACHE) > UPLOAD_CACHE_SIZE:
+                    _UPLOAD_CACHE.popitem(last=False)
+    return df.copy()
+
+
+def _decode_upload(decoded):
+    # UTF-8 (with or without BOM), else Latin-1, which decodes any byte
+    try:
+        return decoded.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return decoded.decode("ISO-8859-1")
+
+
+def _sniff_delimiter(sample):
+    """First delimiter splitting the header of the sample into columns and parsing the sample."""
+    lines = sample.splitlines()[:-1] or sample.splitlines()  # last line may be cut
+    header = next((line for line in lines if line.strip()), "")
+    for delimiter in CSV_DELIMITERS:
+        if delimiter not in header:
+            continue
+        try:
+            pd.read_csv(io.StringIO("\n".join(lines)), sep=delimiter)
+        except Exception:
+            continue
+        return delimiter
+    return None
+
+
+def _read_csv_upload(decoded):
+    """Detect encoding and delimiter from a sample, then parse the file once."""
+    text = _decode_upload(decoded)
+    delimiter = _sniff_delimiter(text[:CSV_SNIFF_BYTES])
+    if delimiter is not None:
         try:
             df = pd.read_csv(
-                io.StringIO(decoded.decode("utf-8", errors="ignore")),
-                na_values=missing_values,
+                io.StringIO(text), na_values=CSV_MISSING_VALUES, sep=delimiter
             )
-            return df
-        except Exception as e:
-            raise ValueError(f"Could not parse CSV file: {str(e)}")
+            if len(df.columns) > 1:
+                return df
+        except Exception:
+            pass
+    # Sniffing failed (e.g. a bad row past the sample): try every delimiter
+    for delimiter in CSV_DELIMITERS:
+        try:
+            df = pd.read_csv(
+                io.StringIO(text), na_values=CSV_MISSING_VALUES, sep=delimiter
+            )
+            # more than 1 column usually means correct delimiter
+            if len(df.columns) > 1:
+                return df
+        except Exception:
+            continue
 
-    elif "xls" in filename:  # TODO: add xls options: so far this is not working
-        return pd.read_excel(io.BytesIO(decoded))
+    # Fallback: try with default settings
+    try:
+        return pd.read_csv(io.StringIO(text), na_values=CSV_MISSING_VALUES)
+    except Exception as e:
+        raise ValueError(f"Could not parse CSV file: {str(e)}")
 
 
 ## ----------------------  Reshape pd data from long to wide  --------------------------- ##
@@ -733,28 +684,9 @@ def adjust_data(data, value_format, number_outcomes):
     if value_format == "long":
         if is_numeric_dtype(data["treat"]):
             data["treat"] = data["treat"].astype(str) + "_"
-        try:
-            for c in data.columns:
-                if data[c].dtype == object:
-                    data[c].fillna("__NONE__", inplace=True)
-        except:
-            pass
-
-        data = apply_r_func_two_outcomes(
-            func=run_pairwise_data_long_r, df=data, num_outcomes=number_outcomes
-        )
-
-        data[data == "__NONE__"] = np.nan
+        data = long_to_pairwise(data, num_outcomes=number_outcomes)
     if value_format == "contrast":
-        for c in data.columns:
-            if data[c].dtype == object:
-                data[c].fillna("__NONE__", inplace=True)
-
-        data = apply_r_func_two_outcomes(
-            func=run_pairwise_data_contrast_r, df=data, num_outcomes=number_outcomes
-        )
-
-        data[data == "__NONE__"] = np.nan
+        data = contrast_to_pairwise(data, num_outcomes=number_outcomes)
 
     if value_format == "iv":
         data = data
@@ -764,34 +696,121 @@ def adjust_data(data, value_format, number_outcomes):
 ## ----------------------  FUNCTIONS for Running data analysis in R  --------------------------- ##
 
 
-def data_checks(df, num_outcomes):
-    # df = df.infer_objects()
-    # types = df.applymap(type).apply(set)
-    # types_sets = types[types.apply(len) > 1]
-    indict3 = 0
+## one netmeta fit per (dataset, outcome), shared by forest, league table and funnel
+NMA_BUNDLE_CACHE_SIZE = 16
+_NMA_BUNDLE_CACHE = OrderedDict()
+_NMA_BUNDLE_LOCK = threading.Lock()
 
-    # for i in range(int(num_outcomes)):
-    #     if df[f'seTE{i+1}'] > 0:
-    #         indict3 += 1
 
-    return {
-        #   'Some columns contain a mix of string and numeric characters. This can create issues in data tables. Please use numbers (with decimal separator for floats) for a numeric variable': len(types_sets) > 0,
-        "Some variables are a mix of numerical and string values. This can create issues in data tables. Please use numerical (decimal sep for floats)": all(
-            df.applymap(type).nunique() > 1
-        ),
-        "Missing values present": df.isnull().sum().sum() < 1,
-        "Negative variances present": df.isnull().sum().sum() < 1,
+def frame_digest(df):
+    """Stable content hash of a DataFrame (values, column names and dtypes)."""
+    h = hashlib.sha1()
+    h.update(repr(list(zip(df.columns, map(str, df.dtypes)))).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def _cached_bundle(key):
+    with _NMA_BUNDLE_LOCK:
+        if key in _NMA_BUNDLE_CACHE:
+            _NMA_BUNDLE_CACHE.move_to_end(key)
+            return _NMA_BUNDLE_CACHE[key]
+    return None
+
+
+def _store_bundle(key, bundle):
+    with _NMA_BUNDLE_LOCK:
+        _NMA_BUNDLE_CACHE[key] = bundle
+        while len(_NMA_BUNDLE_CACHE) > NMA_BUNDLE_CACHE_SIZE:
+            _NMA_BUNDLE_CACHE.popitem(last=False)
+
+
+def fit_nma_bundle(df, i):
+    """
+    Fit netmeta once for outcome i and return every table derived from that fit.
+
+    Node-splitting is not part of the bundle (see generate_netsplit).
+
+    Returns:
+        dict: {"forest", "league", "ranking", "consistency", "funnel"} -> DataFrame
+    """
+    df = _process_rob_column(df.copy())
+    key = (frame_digest(df), int(i))
+    bundle = _cached_bundle(key)
+    if bundle is not None:
+        return bundle
+
+    bundle = apply_r_func_new_bundle(func=nma_bundle_r, df=df, i=i)
+    bundle = {
+        name: frame.reset_index(drop=True) if name in ("forest", "funnel") else frame
+        for name, frame in bundle.items()
     }
+    _store_bundle(key, bundle)
+    return bundle
+
+
+def analysis_key(name, df, i, **options):
+    """Content address of an analysis: data, outcome, effect measure and options."""
+    df = _process_rob_column(df.copy())
+    sm_col = f"effect_size{int(i) + 1}"
+    sm = str(df[sm_col].iloc[0]) if sm_col in df.columns and len(df) else None
+    return result_cache.make_key(
+        name, frame_digest(df), int(i), sm, sorted(options.items())
+    )
+
+
+def is_analysis_cached(name, df, i, **options):
+    return result_cache.get(analysis_key(name, df, i, **options)) is not None
+
+
+def cached_analysis(name, df, i, compute, **options):
+    """
+    ``compute(df, i, **options)`` through the disk result cache, shared by every
+    session and worker process (see tools/result_cache.py).
+    """
+    key = analysis_key(name, df, i, **options)
+    result = result_cache.get(key)
+    if result is None:
+        result = compute(df, i, **options)
+        try:
+            result_cache.put(key, result)
+        except OSError as e:  # full or read-only disk: serve the result uncached
+            print(f"Result cache write failed: {e}")
+    return result
+
+
+## NMA backend: "r" (netmeta through rpy2) or "python" (tools.meta_engine, no R round trip)
+NMA_BACKEND = os.environ.get("NMA_BACKEND", "r").lower()
 
 
 ## run netmeta for nma forest plots
-def run_network_meta_analysis(df, i):
-    data_forest = apply_r_func_new(func=run_NetMeta_r, df=df, i=i)
+def run_network_meta_analysis(df, i, backend=None):
+    return cached_analysis(
+        "nma_forest", df, i, _run_network_meta_analysis, backend=backend or NMA_BACKEND
+    )
+
+
+def _run_network_meta_analysis(df, i, backend):
+    if backend == "python":
+        from tools.meta_engine import run_NetMeta_py
+
+        return run_NetMeta_py(_process_rob_column(df.copy()), i)
+    data_forest = fit_nma_bundle(df, i)["forest"].copy()
     return data_forest
 
 
 ## run metagen for pairwise forest plots
-def run_pairwise_MA(df, i):
+def run_pairwise_MA(df, i, backend=None):
+    return cached_analysis(
+        "pairwise", df, i, _run_pairwise_MA, backend=backend or NMA_BACKEND
+    )
+
+
+def _run_pairwise_MA(df, i, backend):
+    if backend == "python":
+        from tools.meta_engine import run_pairwise_py
+
+        return run_pairwise_py(_process_rob_column(df.copy()), i)
     forest_MA = apply_r_func_new(func=pairwise_forest_r, df=df, i=i)
     return forest_MA
 
@@ -818,8 +837,13 @@ def run_pairwise_MA(df, i):
 #     else:
 #         return leaguetable, pscores, consist, netsplit, netsplit_all
 def generate_league_table(df, i):
-    leaguetable, pscores, consist, netsplit, netsplit_all = apply_r_func_new(
-        func=league_table_r, df=df, i=i
+    return cached_analysis("league_table", df, i, _generate_league_table)
+
+
+def _generate_league_table(df, i):
+    bundle = fit_nma_bundle(df, i)
+    leaguetable, pscores, consist = (
+        bundle[name].copy() for name in ("league", "ranking", "consistency")
     )
 
     replace_and_strip = lambda x: x.replace(" (", "\n(").strip()
@@ -837,32 +861,39 @@ def generate_league_table(df, i):
 
     leaguetable.columns = leaguetable.index = leaguetable.values.diagonal()
 
-    return leaguetable, pscores, consist, netsplit, netsplit_all
+    return leaguetable, pscores, consist
 
 
-def generate_league_table_both(df, i, j):
-    leaguetable = apply_r_func_new_lt(func=league_table_r_both, df=df, i=i, j=j)
-    replace_and_strip = lambda x: x.replace(" (", "\n(").strip()
+## run netsplit for the consistency tables (slow: one node split per comparison)
+def generate_netsplit(df, i):
+    return cached_analysis("netsplit", df, i, _generate_netsplit)
 
-    leaguetable = leaguetable.fillna("")
 
-    leaguetable = pd.DataFrame(
-        [
-            [replace_and_strip(col) for col in list(row)]
-            for idx, row in leaguetable.iterrows()
-        ],
-        columns=leaguetable.columns,
-        index=leaguetable.index,
-    )
+def _generate_netsplit(df, i):
+    tables = apply_r_func_new_bundle(func=netsplit_r, df=df, i=i)
+    return tables["netsplit"], tables["netsplit_all"]
 
-    leaguetable.columns = leaguetable.index = leaguetable.values.diagonal()
 
-    return leaguetable
+def league_table_both_from_storage(league_table_storage, i, j):
+    """Two-outcome league table of outcomes i and j from league_table_data_STORAGE["data"]."""
+    tables = get_league_table_data_list(league_table_storage)
+    leaguetable1, leaguetable2 = (read_storage_frame(tables[k]) for k in (i, j))
+    return compose_league_table_both(leaguetable1, leaguetable2)
 
 
 ## run netmeta for funnel plots
-def generate_funnel_data(df, i):
-    funnel = apply_r_func_new(func=funnel_plot_r, df=df, i=i)
+def generate_funnel_data(df, i, backend=None):
+    return cached_analysis(
+        "funnel", df, i, _generate_funnel_data, backend=backend or NMA_BACKEND
+    )
+
+
+def _generate_funnel_data(df, i, backend):
+    if backend == "python":
+        from tools.meta_engine import run_funnel_py
+
+        return run_funnel_py(_process_rob_column(df.copy()), i)
+    funnel = fit_nma_bundle(df, i)["funnel"].copy()
     return funnel
 
 
@@ -882,13 +913,64 @@ def generate_funnel_data(df, i):
 # shutil.rmtree(f'{__TEMP_LOGS_AND_GLOBALS}/{dir}', ignore_errors=True)
 
 
+## parsed storage frames: each JSON payload of a store is parsed once per process
+FRAME_CACHE_SIZE = int(os.environ.get("FRAME_CACHE_SIZE", 64))
+_FRAME_CACHE = OrderedDict()
+_FRAME_CACHE_LOCK = threading.Lock()
+
+
+def _frame_cache_key(value):
+    # handles are content addressed; JSON strings are keyed by length and hash
+    return value if is_store_handle(value) else (len(value), hash(value))
+
+
+def read_storage_frame(value):
+    """
+    DataFrame of a storage entry: a to_json(orient="split") string, a compact
+    Parquet payload (see tools/storage_codec.py) or a session store handle.
+
+    Parsed frames are kept in a bounded LRU keyed by a hash of the entry, so
+    the callbacks triggered by one click do not each parse the same JSON again.
+    A copy is returned: callers are free to modify it.
+    """
+    if not isinstance(value, str) or FRAME_CACHE_SIZE <= 0:
+        return decode_frame(resolve_store_entry(value))
+    key = _frame_cache_key(value)
+    with _FRAME_CACHE_LOCK:
+        frame = _FRAME_CACHE.get(key)
+        if frame is not None:
+            _FRAME_CACHE.move_to_end(key)
+    if frame is None:
+        frame = decode_frame(resolve_store_entry(value))
+        with _FRAME_CACHE_LOCK:
+            _FRAME_CACHE[key] = frame
+            while len(_FRAME_CACHE) > FRAME_CACHE_SIZE:
+                _FRAME_CACHE.popitem(last=False)
+    return frame.copy()
+
+
+def get_net_data_frame(net_data_storage):
+    """net_data DataFrame of net_data_STORAGE (see get_net_data_json)."""
+    return read_storage_frame(get_net_data_json(net_data_storage))
+
+
+def get_raw_data_frame(raw_data_storage):
+    """raw_data DataFrame of raw_data_STORAGE (see get_raw_data_json)."""
+    return read_storage_frame(get_raw_data_json(raw_data_storage))
+
+
+def get_outcome_frame(storage_list, outcome_idx):
+    """DataFrame of one outcome in a multi-outcome storage list (see get_outcome_json)."""
+    return read_storage_frame(storage_list[outcome_idx])
+
+
 def get_net_data_json(net_data_storage):
     """
     Extract the JSON string from net_data_STORAGE dict.
 
     REQUIRED FORMAT (as per STORAGE_SCHEMA):
     {
-        "data": "<json_string>",       # Required: DataFrame.to_json(orient="split")
+        "data": "<json_string>",       # Required: DataFrame.to_json(orient="split") or compact payload
         "elements_out1": [...],         # Optional: Network elements for outcome 1
         "elements_out2": [...],         # Optional: Network elements for outcome 2
         "n_classes": <int>              # Optional: Number of RoB classes
@@ -898,7 +980,7 @@ def get_net_data_json(net_data_storage):
         net_data_storage: Dict from net_data_STORAGE (must be dict with "data" key)
 
     Returns:
-        str: The JSON string to be parsed with pd.read_json()
+        str: The stored payload (JSON or compact Parquet) to be read with read_storage_frame()
 
     Raises:
         TypeError: If net_data_storage is not a dict
@@ -924,7 +1006,7 @@ def get_net_data_json(net_data_storage):
             "net_data_STORAGE['data'] is empty or None. Cannot proceed with analysis."
         )
 
-    return json_data
+    return resolve_store_entry(json_data)
 
 
 def get_raw_data_json(raw_data_storage):
@@ -940,7 +1022,7 @@ def get_raw_data_json(raw_data_storage):
         raw_data_storage: Dict from raw_data_STORAGE (must be dict with "data" key)
 
     Returns:
-        str: The JSON string to be parsed with pd.read_json()
+        str: The stored payload (JSON or compact Parquet) to be read with read_storage_frame()
 
     Raises:
         TypeError: If raw_data_storage is not a dict
@@ -966,7 +1048,7 @@ def get_raw_data_json(raw_data_storage):
             "raw_data_STORAGE['data'] is empty or None. Cannot proceed with analysis."
         )
 
-    return json_data
+    return resolve_store_entry(json_data)
 
 
 def get_outcome_key(outcome_idx, key_prefix="outcome"):
@@ -996,7 +1078,7 @@ def get_multi_outcome_json(storage_dict, outcome_idx, key_prefix="outcome"):
         key_prefix: Prefix for keys (default "outcome")
 
     Returns:
-        str: JSON string for the specified outcome
+        str: Stored payload for the specified outcome (decode with read_storage_frame)
 
     Raises:
         TypeError: If storage_dict is not a dict
@@ -1015,7 +1097,29 @@ def get_multi_outcome_json(storage_dict, outcome_idx, key_prefix="outcome"):
             f"Available keys: {list(storage_dict.keys())}"
         )
 
-    return storage_dict[outcome_key]
+    return resolve_store_entry(storage_dict[outcome_key])
+
+
+def get_outcome_json(storage_list, outcome_idx):
+    """
+    JSON string of one outcome in a multi-outcome storage list.
+
+    Used for: forest_data_STORAGE, forest_data_prws_STORAGE, ranking_data_STORAGE,
+              consistency_data_STORAGE, net_split_data_STORAGE,
+              net_split_ALL_data_STORAGE, funnel_data_STORAGE
+
+    Entries may be server-side session store handles (see tools/session_store.py)
+    or inline payloads: compact Parquet (see tools/storage_codec.py) or JSON
+    (legacy stores, loaded project files). read_storage_frame decodes them all.
+
+    Args:
+        storage_list: list with one entry per outcome
+        outcome_idx: Integer index (0 = first outcome)
+
+    Returns:
+        str: JSON string for the specified outcome (None for an empty entry)
+    """
+    return resolve_store_entry(storage_list[outcome_idx])
 
 
 def get_league_table_json(league_table_storage, outcome_idx):
@@ -1054,7 +1158,7 @@ def get_league_table_data_list(league_table_storage):
     if league_table_storage is None:
         return []
     if isinstance(league_table_storage, dict):
-        return league_table_storage.get("data", [])
+        return [resolve_store_entry(t) for t in league_table_storage.get("data", [])]
     if isinstance(league_table_storage, list):
         # Legacy format - return all except last item (which is "both")
         # But only if there are more than 1 items
@@ -1100,7 +1204,7 @@ def get_league_table_both(league_table_storage):
         return None
     if isinstance(league_table_storage, dict):
         compared = league_table_storage.get("compared_outcomes", {})
-        return compared.get("league_table")
+        return resolve_store_entry(compared.get("league_table"))
     if isinstance(league_table_storage, list) and len(league_table_storage) > 0:
         # Legacy format - "both" is at index -1
         return league_table_storage[-1]